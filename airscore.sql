@@ -1002,7 +1002,8 @@ CREATE TABLE `tblTaskResult` (
   `departure_score` double DEFAULT NULL,
   `score` double DEFAULT NULL,
   `lead_coeff` double DEFAULT NULL,
-  `fixed_LC` double DEFAULT NULL
+  `fixed_LC` double DEFAULT NULL,
+  `fingerprint` char(64) DEFAULT NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- --------------------------------------------------------
@@ -89,6 +89,7 @@ DATABASE = dev.get('db', {}).get('Name') or env.str('DATABASE')  # mysql db name
 XC_LOGIN = dev.get('xcontest', {}).get('User') or env.str('XCONTEST_USER')
 XC_password = dev.get('xcontest', {}).get('Pass') or env.str('XCONTEST_PASS')
 G_Record_validation_Server = config['g_record_validation_server']
+G_RECORD_VALIDATION_THREADS = config.get('g_record_validation_threads', 8)  # parallel requests in bulk import
 
 '''Competition options'''
 SANCTIONS = config['sanctions']
@@ -121,5 +122,13 @@ TELEGRAM_CHANNEL = dev.get('telegram', {}).get('channel') or env.str('TELEGRAM_C
 LADDERS = config['ladders']
 
 
+'''Scoring'''
+TRACK_CHECK_WORKERS = config.get('track_check_workers', 1)  # processes used to check tracks when scoring a task
+ROUTE_CACHE_SIZE = config.get('route_cache', {}).get('size', 128)  # optimised routes kept in memory
+ROUTE_CACHE_REDIS = config.get('route_cache', {}).get('redis')  # Redis url to share optimised routes among processes
+MAP_FILE_COMPRESSION = config.get('map_files', {}).get('compression')  # none, gzip or brotli
+MAP_TRACK_TOLERANCE = config.get('map_files', {}).get('track_tolerance')  # meters, simplifies map tracklogs if set
+
+
 '''FAI Sphere'''
 FAI_SPHERE = config['FAI_sphere']
@@ -1,6 +1,7 @@
+from collections import defaultdict
 from dataclasses import dataclass, asdict
 from functools import partial
-from math import log, pow, sqrt
+from math import floor, log, pow, sqrt
 
 import geopy
 import pyproj
@@ -10,6 +11,7 @@ from route import Turnpoint, distance
 from shapely import ops
 from shapely.geometry import Point
 from shapely.geometry.polygon import Polygon
+from shapely.prepared import prep
 
 
 @dataclass(frozen=True)
@@ -89,11 +91,66 @@ class CheckParams:
             return round(pow(((outer_limit - distance) / total_band), log(10, 2)), 5) * max_penalty
 
 
+class AirspaceIndex(object):
+    """Grid index of airspace bounding boxes, used to get the spaces a fix could infringe
+    without checking every space of the control area.
+    Also stores altitude limits of notification band and prepared geometries of polygons."""
+
+    cell_size = 0.1  # degrees
+    max_cells = 400  # spaces covering more cells are checked for every fix
+
+    def __init__(self, spaces, notification_band):
+        self.lower = [space['floor'] - notification_band for space in spaces]
+        self.upper = [space['ceiling'] + notification_band for space in spaces]
+        self.exteriors = [
+            space['object'].exterior if space['shape'] == 'polygon' else None for space in spaces
+        ]
+        self.prepared = [prep(space['object']) if space['shape'] == 'polygon' else None for space in spaces]
+        self.cells = defaultdict(list)
+        self.large = []
+        for i, space in enumerate(spaces):
+            (lat1, lon1), (lat2, lon2) = space['bbox']
+            rows = range(self.cell(lat1), self.cell(lat2) + 1)
+            cols = range(self.cell(lon1), self.cell(lon2) + 1)
+            if len(rows) * len(cols) > self.max_cells:
+                self.large.append(i)
+            else:
+                for row in rows:
+                    for col in cols:
+                        self.cells[(row, col)].append(i)
+        self._candidates = {}
+
+    def cell(self, coord):
+        return floor(coord / self.cell_size)
+
+    def candidates(self, lat, lon):
+        """returns indexes of spaces whose bbox could contain the position, in control area order"""
+        key = (self.cell(lat), self.cell(lon))
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = tuple(sorted(self.cells.get(key, []) + self.large))
+            self._candidates[key] = candidates
+        return candidates
+
+
 class AirspaceCheck(object):
     def __init__(self, control_area=None, params=None, geo=None):
         self.control_area = control_area  # igc_lib openair reader control zones
         self.params = params  # AirspaceCheck object
         self.geo = geo  # Geo object
+        self._index = None  # AirspaceIndex object
+
+    def __getstate__(self):
+        """prepared geometries cannot be pickled, index is created again when needed"""
+        state = self.__dict__.copy()
+        state['_index'] = None
+        return state
+
+    @property
+    def index(self):
+        if self._index is None and self.control_area:
+            self._index = AirspaceIndex(self.spaces, self.params.notification_distance)
+        return self._index
 
     @property
     def bounding_box(self):
@@ -173,6 +230,8 @@ class AirspaceCheck(object):
                 pt1 = geopy.distance.distance(meters=dist).destination(pmin, 225)
                 pt2 = geopy.distance.distance(meters=dist).destination(pmax, 45)
                 space['bbox'] = [[pt1[0], pt1[1]], [pt2[0], pt2[1]]]
+            '''create spatial index'''
+            self._index = AirspaceIndex(self.spaces, self.params.notification_distance)
 
     def reproject(self, space):
         """get polygon from space"""
@@ -191,76 +250,82 @@ class AirspaceCheck(object):
             plot - list, details of airspace infringed
             penalty - the penalty for this infringement
         """
+        alt = fix.gnss_alt if not alt else alt
+        return self._worst_infringement(self._fix_violations(fix, alt))
+
+    def _fix_violations(self, fix, alt):
+        """yields (space, vertical distance, horizontal distance) for each space in which fix is at least
+        inside proximity band, in control area order"""
         from airspaceUtils import in_bbox
 
         notification_band = self.params.notification_distance
-        alt = fix.gnss_alt if not alt else alt
-        infringement = 0
-        penalty = 0
-        plot = None
-
-        '''Check if fix is actually in Airspace bounding box'''
-        for space in self.spaces:
-            violation = 0
+        index = self.index
+        point = None
+        '''Check only spaces whose bounding box could contain the fix'''
+        for i in index.candidates(fix.lat, fix.lon):
             '''check if in altitude range'''
-            if space['floor'] - notification_band < alt < space['ceiling'] + notification_band:
+            if index.lower[i] < alt < index.upper[i]:
                 # we are at same alt as the airspace
+                space = self.spaces[i]
                 '''check if fix is inside bbox'''
                 if in_bbox(space['bbox'], fix):
                     '''Check if fix is inside proximity warning area'''
                     if space['shape'] == 'circle':
                         if space['object'].in_radius(fix, 0, notification_band):
                             # fix is inside proximity band (at least)
-                            # print(f" in circle --- ")
-                            # start_time = tt.time()
-                            dist_floor = space['floor'] - alt
-                            dist_ceiling = alt - space['ceiling']
-                            vert_distance = max(dist_floor, dist_ceiling)
+                            vert_distance = max(space['floor'] - alt, alt - space['ceiling'])
                             horiz_distance = distance(fix, space['object']) - space['object'].radius
-                            violation = 1
+                            yield space, vert_distance, horiz_distance
                     elif space['shape'] == 'polygon':
-                        # start_time = tt.time()
-                        x, y = self.geo.convert(fix.lon, fix.lat)
-                        point = Point(x, y)
-                        horiz_distance = space['object'].exterior.distance(point)
-                        if point.within(space['object']):
+                        if point is None:
+                            x, y = self.geo.convert(fix.lon, fix.lat)
+                            point = Point(x, y)
+                        horiz_distance = index.exteriors[i].distance(point)
+                        if index.prepared[i].contains(point):
                             '''fix is inside the area'''
                             horiz_distance *= -1
                         if horiz_distance <= notification_band:
-                            # print(f" {space['name']}: in polygon --- ")
-                            dist_floor = space['floor'] - alt
-                            dist_ceiling = alt - space['ceiling']
-                            vert_distance = max(dist_floor, dist_ceiling)
-                            violation = 1
-                    if violation:
-                        '''sorting list to retrieve correct value case penalty is equal'''
-                        sorted_list = sorted(
-                            [
-                                (vert_distance, self.params.penalty(vert_distance, 'v'), 'vert'),
-                                (horiz_distance, self.params.penalty(horiz_distance, 'h'), 'horiz'),
-                            ],
-                            key=lambda p: p[0],
-                            reverse=True,
-                        )
-                        result = min(sorted_list, key=lambda p: p[1])
-                        pen = result[1]
-                        if pen >= penalty:
-                            '''new worse infringement'''
-                            infringement_space = space
-                            separation = result[2]
-                            if pen == 0:
-                                dist = max(vert_distance, horiz_distance)
-                                infringement = 'warning'
-                            else:
-                                if pen > penalty:
-                                    penalty = pen
-                                    dist = result[0]
-                                    if pen < max(self.params.h_max_penalty, self.params.v_max_penalty):
-                                        infringement = 'penalty'
-                                    else:
-                                        '''do not need to check other spaces for the fix'''
-                                        infringement = 'full penalty'
-                                        break
+                            vert_distance = max(space['floor'] - alt, alt - space['ceiling'])
+                            yield space, vert_distance, horiz_distance
+
+    def _worst_infringement(self, violations):
+        """gets worst infringement from (space, vertical distance, horizontal distance) list
+        :returns
+            plot - list, details of airspace infringed
+            penalty - the penalty for this infringement
+        """
+        infringement = 0
+        penalty = 0
+        plot = None
+        for space, vert_distance, horiz_distance in violations:
+            '''sorting list to retrieve correct value case penalty is equal'''
+            sorted_list = sorted(
+                [
+                    (vert_distance, self.params.penalty(vert_distance, 'v'), 'vert'),
+                    (horiz_distance, self.params.penalty(horiz_distance, 'h'), 'horiz'),
+                ],
+                key=lambda p: p[0],
+                reverse=True,
+            )
+            result = min(sorted_list, key=lambda p: p[1])
+            pen = result[1]
+            if pen >= penalty:
+                '''new worse infringement'''
+                infringement_space = space
+                separation = result[2]
+                if pen == 0:
+                    dist = max(vert_distance, horiz_distance)
+                    infringement = 'warning'
+                else:
+                    if pen > penalty:
+                        penalty = pen
+                        dist = result[0]
+                        if pen < max(self.params.h_max_penalty, self.params.v_max_penalty):
+                            infringement = 'penalty'
+                        else:
+                            '''do not need to check other spaces for the fix'''
+                            infringement = 'full penalty'
+                            break
         if infringement:
             plot = [
                 infringement_space['floor'],
@@ -272,6 +337,69 @@ class AirspaceCheck(object):
             ]
         return plot, penalty
 
+    def check_track(self, fixes, alts=None):
+        """check a list of fixes for airspace violations in a single pass
+        Fixes are reprojected with a single transform call and distances from each space are calculated
+        for all fixes inside its bounding box and altitude band at once.
+        arguments:
+        fixes - list of Flight fix objects
+        alts - list of flight altitudes used in flight checking. If None, fix.gnss_alt is used (GPS altitude)
+        :returns
+            list of (plot, penalty) tuples, one for each fix, as returned by check_fix
+        """
+        import numpy as np
+        import shapely
+
+        if not fixes:
+            return []
+        notification_band = self.params.notification_distance
+        index = self.index
+        lat = np.array([fix.lat for fix in fixes], dtype=float)
+        lon = np.array([fix.lon for fix in fixes], dtype=float)
+        if alts is None:
+            alts = [None] * len(fixes)
+        alt = np.array([a if a else fix.gnss_alt for fix, a in zip(fixes, alts)], dtype=float)
+        x, y = self.geo.to_proj.transform(lon, lat)
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        vectorised = hasattr(shapely, 'contains_xy')  # shapely >= 2.0
+
+        violations = defaultdict(list)
+        for i, space in enumerate(self.spaces):
+            (lat1, lon1), (lat2, lon2) = space['bbox']
+            candidates = np.nonzero(
+                (index.lower[i] < alt) & (alt < index.upper[i])
+                & (lat1 <= lat) & (lat <= lat2) & (lon1 <= lon) & (lon <= lon2)
+            )[0]
+            if not len(candidates):
+                continue
+            if space['shape'] == 'circle':
+                turnpoint = space['object']
+                inside = [k for k in candidates.tolist() if turnpoint.in_radius(fixes[k], 0, notification_band)]
+                horiz = [distance(fixes[k], turnpoint) - turnpoint.radius for k in inside]
+                inside = np.array(inside, dtype=int)
+            elif space['shape'] == 'polygon':
+                if vectorised:
+                    horiz = shapely.distance(index.exteriors[i], shapely.points(x[candidates], y[candidates]))
+                    within = shapely.contains_xy(space['object'], x[candidates], y[candidates])
+                else:
+                    points = [Point(x[k], y[k]) for k in candidates]
+                    horiz = np.array([index.exteriors[i].distance(p) for p in points])
+                    within = np.array([index.prepared[i].contains(p) for p in points], dtype=bool)
+                horiz = np.where(within, -horiz, horiz)
+                band = horiz <= notification_band
+                inside = candidates[band]
+                horiz = horiz[band].tolist()
+            else:
+                continue
+            vert = np.maximum(space['floor'] - alt[inside], alt[inside] - space['ceiling']).tolist()
+            for k, v, h in zip(inside.tolist(), vert, horiz):
+                violations[k].append((space, v, h))
+
+        results = [(None, 0)] * len(fixes)
+        for k, fix_violations in violations.items():
+            results[k] = self._worst_infringement(fix_violations)
+        return results
+
     def get_infringements_result(self, infringements_list):
         """
         Airspace Warnings and Penalties Managing
@@ -394,7 +394,7 @@ class Comp(object):
         ''' get rankings '''
         comp.get_rankings()
         for idx, t in enumerate(files):
-            task = Task.create_from_json(task_id=t.task_id, filename=t.file)
+            task = TaskScores.read(task_id=t.task_id, filename=t.file)
             comp.tasks.append(task)
             if task.training:
                 continue
@@ -402,7 +402,7 @@ class Comp(object):
             r = task.ftv_validity * 1000
             '''get pilots result'''
             for p in comp.results:
-                s = next((res.score or 0 for res in task.pilots if res.par_id == p['par_id']), 0)
+                s = task.scores.get(p['par_id'], 0)
                 perf = c_round(s / r, td + 3)
                 p['results'][task.task_code] = {'pre': c_round(s, td), 'perf': perf, 'score': c_round(s, td)}
 
@@ -434,49 +434,56 @@ class Comp(object):
             formula:    comp formula dict
             d:          decimals on single tasks score, default 0
         """
-        from calcUtils import c_round
+        import numpy as np
 
         val = self.formula.overall_validity
         param = self.formula.validity_param
-        avail_validity = self.avail_validity
         td = self.formula.task_result_decimal
 
+        ''' if we score all tasks, or tasks are not enough to have discards,
+            or event has just one valid task regardless method,
+            we can simply sum all score values
+        '''
+        method = None
+        if not ((val == 'all') or (val == 'round' and self.dropped_tasks == 0) or (len(self.tasks) < 2)):
+            if val == 'round' and len(self.tasks) >= param:
+                method = 'round'
+            elif val == 'ftv' and len(self.tasks) > 1:
+                method = 'ftv'
+        validity = {}
+        for t in self.tasks:
+            validity.setdefault(t.task_code, t.ftv_validity)
+
+        '''pilots with the same tasks results are scored together, as a pilots x tasks matrix'''
+        groups = {}
         for pil in self.results:
-            pil['score'] = 0
-
-            ''' if we score all tasks, or tasks are not enough to have discards,
-                or event has just one valid task regardless method,
-                we can simply sum all score values
-            '''
-            if not ((val == 'all') or (val == 'round' and self.dropped_tasks == 0) or (len(self.tasks) < 2)):
-                '''create a ordered list of results, perf desc'''
-                sorted_results = sorted(pil['results'].items(), key=lambda x: (x[1]['perf'], x[1]['pre']), reverse=True)
-
-                if val == 'round' and len(self.tasks) >= param:
-                    '''we need to order by score desc and sum only the ones we need'''
-                    for i in range(self.dropped_tasks):
-                        idx = sorted_results.pop()[0]  # getting id of worst result task
-                        pil['results'][idx]['score'] = 0
-
-                elif val == 'ftv' and len(self.tasks) > 1:
-                    '''ftv calculation'''
-                    pval = avail_validity
-                    for idx, s in sorted_results:
-                        if not (pval > 0):
-                            pil['results'][idx]['score'] = 0
-                        else:
-                            '''get ftv_validity of corresponding task'''
-                            tval = next(t.ftv_validity for t in self.tasks if t.task_code == idx)
-                            if pval > tval:
-                                '''we can use the whole score'''
-                                pval -= tval
-                            else:
-                                '''we need to calculate proportion'''
-                                pil['results'][idx]['score'] = c_round(pil['results'][idx]['score'] * (pval / tval), td)
-                                pval = 0
-
-            '''calculates final pilot score'''
-            pil['score'] = c_round(sum(pil['results'][x]['score'] for x in pil['results'].keys()), cd)
+            groups.setdefault(tuple(pil['results'].keys()), []).append(pil)
+        for codes, pilots in groups.items():
+            results = [[pil['results'][code] for code in codes] for pil in pilots]
+            scores = np.array([[r['score'] for r in row] for row in results], dtype=float).reshape(len(pilots), -1)
+            if method and codes:
+                perf = np.array([[r['perf'] for r in row] for row in results], dtype=float)
+                pre = np.array([[r['pre'] for r in row] for row in results], dtype=float)
+                changed, partial = discard_task_scores(
+                    perf,
+                    pre,
+                    scores,
+                    np.array([validity.get(code, 0) for code in codes], dtype=float),
+                    method,
+                    self.dropped_tasks,
+                    self.avail_validity,
+                    td,
+                )
+                for row, col in zip(*np.nonzero(changed)):
+                    results[row][col]['score'] = partial.get((row, col), 0)
+                    scores[row, col] = results[row][col]['score']
+
+            '''calculates final pilot score, adding task scores in order'''
+            totals = np.zeros(len(pilots))
+            for col in range(len(codes)):
+                totals += scores[:, col]
+            for pil, total in zip(pilots, totals.tolist()):
+                pil['score'] = c_round(total, cd)
 
         ''' order list'''
         self.results = sorted(self.results, key=lambda x: x['score'], reverse=True)
@@ -519,6 +526,89 @@ class Comp(object):
         return filename, dict(title=title, headings=headings, tables=[participants], timestamp=timestamp)
 
 
+def discard_task_scores(perf, pre, scores, validity, method: str, dropped: int, avail_validity: float, td: int = 0):
+    """Applies task discards (round) or FTV to task results of a group of pilots.
+    Each pilot's results are ordered by performance and score, both descending:
+    - round:    the [dropped] worst results are discarded
+    - ftv:      results are counted until pilot's available validity is used, last one in proportion
+
+    input:
+        perf, pre, scores:  pilots x tasks arrays of performance, score before discards, and score
+        validity:           ftv validity of each task
+        td:                 decimals on single tasks score
+    returns a boolean pilots x tasks array of changed scores, and a dict {(pilot, task): score} of proportional
+    scores. Other changed scores are zero.
+    """
+    import numpy as np
+
+    rows, cols = scores.shape
+    '''stable sort keeps original order of equal results, as sorted(reverse=True) does'''
+    order = np.lexsort((-pre, -perf), axis=-1)
+    position = np.arange(cols)
+    partial = {}
+    if method == 'round':
+        '''worst results'''
+        ordered_changed = position >= cols - min(dropped, cols)
+        ordered_changed = np.broadcast_to(ordered_changed, (rows, cols))
+    else:
+        task_validity = validity[order]
+        '''available validity before each result, subtracted in order as validity is used'''
+        start = np.full((rows, 1), avail_validity, dtype=float)
+        available = np.subtract.accumulate(np.hstack((start, task_validity)), axis=1)[:, :-1]
+        whole = (available > 0) & (available > task_validity)
+        '''first result not counted as a whole: proportional if some validity is left, else zero'''
+        first = np.where(whole.all(axis=1), cols, np.argmin(whole, axis=1))
+        ordered_changed = position >= first[:, None]
+        for row in np.flatnonzero(first < cols):
+            idx = first[row]
+            pval, tval = available[row, idx], task_validity[row, idx]
+            if pval > 0:
+                col = int(order[row, idx])
+                partial[(int(row), col)] = c_round(float(scores[row, col] * (pval / tval)), td)
+    changed = np.zeros((rows, cols), dtype=bool)
+    np.put_along_axis(changed, order, ordered_changed, axis=1)
+    return changed, partial
+
+
+class TaskScores(object):
+    """Task attributes, statistics and pilots scores needed to create comp results.
+    It is stored with task result file when published, so comp results do not need to read all task results again.
+    """
+
+    stats_list = ['pilots_launched', 'tot_dist_flown', 'tot_flight_time']
+
+    def __init__(self, task_id: int, scores: dict = None, valid: bool = False, **kwargs):
+        self.id = task_id
+        self.scores = scores or {}  # {par_id: score}
+        self.valid = valid
+        self.__dict__.update(kwargs)
+
+    def is_valid(self):
+        return self.valid
+
+    @staticmethod
+    def from_task(task: Task):
+        scores = {}
+        for res in task.pilots:
+            scores.setdefault(res.par_id, res.score or 0)
+        attributes = {x: getattr(task, x) for x in CompResult.task_list + TaskScores.stats_list if x != 'id'}
+        return TaskScores(task.id, scores=scores, valid=task.is_valid(), **attributes)
+
+    @staticmethod
+    def from_json_data(task_id: int, data: dict):
+        return TaskScores.from_task(Task.create_from_json(task_id=task_id, data=data))
+
+    @staticmethod
+    def read(task_id: int, filename: str):
+        """reads task scores from result binary store, or creates them from json file"""
+        from result import read_result_store
+
+        scores = read_result_store(filename, 'comp')
+        if isinstance(scores, TaskScores):
+            return scores
+        return TaskScores.from_task(Task.create_from_json(task_id=task_id, filename=filename))
+
+
 def delete_comp(comp_id, files=True):
     """delete all database entries and files on disk related to comp"""
     from shutil import rmtree
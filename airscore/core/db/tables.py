@@ -804,6 +804,7 @@ class TblTaskResult(BaseModel):
     score = Column(FLOAT)
     lead_coeff = Column(FLOAT)
     fixed_LC = Column(FLOAT)
+    fingerprint = Column(CHAR(64))
 
     # Participants = relationship('TblParticipant', backref="taskresults", lazy="subquery")
     Participants = relationship('TblParticipant')
@@ -864,6 +865,7 @@ class TblTaskResult(BaseModel):
                     cls.landing_time,
                     cls.track_file,
                     cls.g_record,
+                    cls.fingerprint,
                 )
                 .join(t, t.comp_id == p.comp_id)
                 .outerjoin(cls, (cls.task_id == t.task_id) & (cls.par_id == p.par_id))
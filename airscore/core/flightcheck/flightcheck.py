@@ -12,7 +12,7 @@ from route import (
     get_fix_dist_to_goal,
     in_goal_sector,
     start_made_civl,
-    tp_made_civl,
+    tp_made_civl_array,
     tp_time_civl,
 )
 from task import Task
@@ -20,6 +20,36 @@ from task import Task
 from .flightpointer import FlightPointer
 
 
+class TurnpointCrossings:
+    """Precalculated inside / outside state of track fixes for each turnpoint cylinder.
+    For each turnpoint, element i tells if the couple fixes[i], fixes[i + 1] made the turnpoint,
+    with same result as tp_made_civl. Arrays are calculated on first use, so changes to turnpoints
+    made during the check (launch radius) are taken into account."""
+
+    def __init__(self, fixes: list, turnpoints: list, tolerance: float, min_tol_m: float, series=None):
+        import numpy as np
+
+        self.fixes = fixes
+        self.turnpoints = turnpoints
+        self.tolerance = tolerance
+        self.min_tol_m = min_tol_m
+        self.lats = np.fromiter((fix.lat for fix in fixes), dtype=float, count=len(fixes))
+        self.lons = np.fromiter((fix.lon for fix in fixes), dtype=float, count=len(fixes))
+        '''crossings are shared with track series, so that new ones are stored'''
+        self.series = series
+        self._made = {} if series is None else series.crossings
+
+    def made(self, index: int, i: int) -> bool:
+        """True if fixes i and i + 1 made turnpoint at index"""
+        if index not in self._made:
+            self._made[index] = tp_made_civl_array(
+                self.fixes, self.lats, self.lons, self.turnpoints[index], self.tolerance, self.min_tol_m
+            ).tolist()
+            if self.series is not None:
+                self.series.changed = True
+        return self._made[index][i]
+
+
 def check_fixes(
     result: FlightResult or LiveResult,
     fixes: list,
@@ -31,9 +61,11 @@ def check_fixes(
     igc_parsing_config: FlightParsingConfig = None,
     deadline: int = None,
     print=print,
+    series=None,
 ):
     """ In normal track mode, checks an IGC track fixes against the Task route.
         In livetracking mode, checks a list of fixes against the LiveTask route
+        series: TrackSeries of track, with stored crossings and distances to goal
         """
     '''initialize'''
     total_fixes = len(fixes)
@@ -67,6 +99,16 @@ def check_fixes(
         '''get if pilot already made ESS in previous track slices'''
         already_ESS = any(e.name == 'ESS' for e in result.waypoints_achieved)
 
+    '''fixes to check for airspace infringements, with altitude used in flight checking'''
+    airspace_fixes = []
+    airspace_alts = []
+
+    '''cylinder crossings of consecutive fixes, calculated once for each turnpoint.
+    Every fix is still visited: distance flown, leading coefficient, stopped task distance and airspace
+    need a value for each fix once pilot started, so fixes between crossings cannot be skipped'''
+    '''crossings and distances already calculated are reused from stored track series'''
+    crossings = TurnpointCrossings(fixes, tp.turnpoints, tolerance, min_tol_m, series=series)
+
     for i in range(total_fixes - 1):
         # report percentage progress
         if not livetracking and int(i / len(fixes) * 100) > percentage_complete:
@@ -207,7 +249,7 @@ def check_fixes(
         if pilot_can_start(task, tp, my_fix):
             # print(f'time: {my_fix.rawtime}, start: {task.start_time} | Interval: {task.SS_interval} | my start: {result.real_start_time} | better_start: {pilot_get_better_start(task, my_fix.rawtime, result.SSS_time)} | can start: {pilot_can_start(task, tp, my_fix)} can restart: {pilot_can_restart(task, tp, my_fix, result)} | tp: {tp.name}')
             ''' using NO WPT DIRECTION for start as for other waypoints - FAI GAP RULES 2020 '''
-            if tp_made_civl(my_fix, next_fix, tp.next, tolerance, min_tol_m):
+            if crossings.made(tp.pointer, i):
                 time = int(round(tp_time_civl(my_fix, next_fix, tp.next), 0))
                 result.waypoints_achieved.append(create_waypoint_achieved(my_fix, tp, time, alt))  # pilot has started
                 result.real_start_time = time
@@ -219,7 +261,7 @@ def check_fixes(
         elif pilot_can_restart(task, tp, my_fix, result):
             # print(f'time: {my_fix.rawtime}, start: {task.start_time} | Interval: {task.SS_interval} | my start: {result.real_start_time} | better_start: {pilot_get_better_start(task, my_fix.rawtime, result.SSS_time)} | can start: {pilot_can_start(task, tp, my_fix)} can restart: {pilot_can_restart(task, tp, my_fix, result)} | tp: {tp.name}')
             ''' using NO WPT DIRECTION for start as for other waypoints - FAI GAP RULES 2020 '''
-            if tp_made_civl(my_fix, next_fix, tp.last_made, tolerance, min_tol_m):
+            if crossings.made(tp.last_made_index, i):
                 tp.pointer -= 1
                 time = int(round(tp_time_civl(my_fix, next_fix, tp.next), 0))
                 result.waypoints_achieved.pop()
@@ -237,7 +279,7 @@ def check_fixes(
         if tp.start_done:
             '''Turnpoint managing'''
             if tp.next.shape == 'circle' and tp.next.type in ('endspeed', 'waypoint'):
-                if tp_made_civl(my_fix, next_fix, tp.next, tolerance, min_tol_m):
+                if crossings.made(tp.pointer, i):
                     time = int(round(tp_time_civl(my_fix, next_fix, tp.next), 0))
                     result.waypoints_achieved.append(
                         create_waypoint_achieved(my_fix, tp, time, alt)
@@ -247,7 +289,7 @@ def check_fixes(
                     tp.move_to_next()
 
             if tp.ess_done and tp.type == 'goal':
-                if (tp.next.shape == 'circle' and tp_made_civl(my_fix, next_fix, tp.next, tolerance, min_tol_m)) or (
+                if (tp.next.shape == 'circle' and crossings.made(tp.pointer, i)) or (
                     tp.next.shape == 'line' and (in_goal_sector(task, next_fix))
                 ):
                     result.waypoints_achieved.append(
@@ -268,7 +310,10 @@ def check_fixes(
         if tp.pointer > 0:
             if tp.start_done and not tp.ess_done:
                 '''optimized distance calculation each fix'''
-                dist_to_goal, dist_to_ESS = get_fix_dist_to_goal(task, next_fix, tp.pointer)
+                if series is not None:
+                    dist_to_goal, dist_to_ESS = series.dist_to_goal(task, i + 1, next_fix, tp.pointer)
+                else:
+                    dist_to_goal, dist_to_ESS = get_fix_dist_to_goal(task, next_fix, tp.pointer)
                 fix_dist_flown = task.opt_dist - dist_to_goal
                 # print(f'time: {next_fix.rawtime} | fix: {tp.name} | Optimized Distance used')
             else:
@@ -307,19 +352,23 @@ def check_fixes(
 
         '''Airspace Check'''
         if task.airspace_check and airspace:
-            # map_fix = [next_fix.rawtime, next_fix.lat, next_fix.lon, alt]
-            plot, penalty = airspace.check_fix(next_fix, alt)
+            airspace_fixes.append(next_fix)
+            airspace_alts.append(alt)
+
+    if airspace_fixes:
+        '''check all fixes against airspace at once'''
+        for fix, fix_alt, (plot, penalty) in zip(
+            airspace_fixes, airspace_alts, airspace.check_track(airspace_fixes, airspace_alts)
+        ):
             if plot:
-                # map_fix.extend(plot)
-                '''Airspace Infringement: check if we already have a worse one'''
+                '''Airspace Infringement'''
                 airspace_name = plot[2]
                 infringement_type = plot[3]
                 dist = plot[4]
                 separation = plot[5]
                 result.infringements.append(
-                    [next_fix, alt, airspace_name, infringement_type, dist, penalty, separation]
+                    [fix, fix_alt, airspace_name, infringement_type, dist, penalty, separation]
                 )
-                # print([next_fix, alt, airspace_name, infringement_type, dist, penalty])
 
     result.last_altitude = 0 if 'alt' not in locals() else alt
     result.last_time = 0 if 'next_fix' not in locals() else next_fix.rawtime
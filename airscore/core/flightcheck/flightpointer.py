@@ -33,6 +33,8 @@ class FlightPointer(object):
         self.optimised_turnpoints = task.optimised_turnpoints
         self.pointer = 0
         self.descriptions = []
+        self._start_index = next((i for i, x in enumerate(self.turnpoints) if x.type == 'speed'), None)
+        self._ess_index = next((i for i, x in enumerate(self.turnpoints) if x.type == 'endspeed'), None)
 
         idx = 1
         for tp in self.turnpoints:
@@ -82,17 +84,11 @@ class FlightPointer(object):
 
     @property
     def start_index(self):
-        if any(x for x in self.turnpoints if x.type == 'speed'):
-            return self.turnpoints.index(next(x for x in self.turnpoints if x.type == 'speed'))
-        else:
-            return None
+        return self._start_index
 
     @property
     def ess_index(self):
-        if any(x for x in self.turnpoints if x.type == 'endspeed'):
-            return self.turnpoints.index(next(x for x in self.turnpoints if x.type == 'endspeed'))
-        else:
-            return None
+        return self._ess_index
 
     @property
     def start_done(self):
@@ -0,0 +1,266 @@
+"""
+Track Series Library
+
+contains TrackSeries class.
+
+Data derived from a track file checked against a task route, stored next to the track file:
+    - processed fixes time, position and altitude series, with takeoff, landing and thermals
+    - fixes optimised distance to goal and to ESS, with the turnpoint pointer used to calculate them
+    - turnpoints crossing candidates (couples of fixes that made each turnpoint cylinder)
+    - Leading Coefficient series recorded during last check, with fingerprint of the check
+
+Series only depend on track file, task route and IGC parsing parameters, so track can be checked again without
+parsing the IGC file and calculating again distances and crossings, i.e. stopped task adjustments,
+score back time changes, Leading Coefficient recalculation.
+
+Use:    from flightcheck.trackseries import TrackSeries
+        series = TrackSeries.read(task, track_file, config)
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+
+class TrackSeries:
+    """Derived data of a track, with key of task route and track file they were calculated with."""
+
+    version = 1
+    fix_attributes = ('rawtime', 'lat', 'lon', 'press_alt', 'gnss_alt', 'alt')
+
+    def __init__(
+        self,
+        path: Path,
+        key: str,
+        fixes: dict,
+        takeoff: int = -1,
+        landing: int = -1,
+        thermals: np.ndarray = None,
+        notes: list = None,
+        pointers: np.ndarray = None,
+        dists_to_goal: np.ndarray = None,
+        dists_to_ess: np.ndarray = None,
+        crossings: dict = None,
+        lead_coeff: dict = None,
+        lc_key: str = None,
+    ):
+        size = len(fixes['rawtime'])
+        self.path = path
+        self.key = key
+        self.fixes = fixes
+        self.takeoff = takeoff
+        self.landing = landing
+        self.thermals = np.zeros((0, 2), dtype=int) if thermals is None else thermals
+        self.notes = notes or []
+        self.pointers = np.full(size, -1, dtype=int) if pointers is None else pointers
+        self.dists_to_goal = np.full(size, np.nan) if dists_to_goal is None else dists_to_goal
+        self.dists_to_ess = np.full(size, np.nan) if dists_to_ess is None else dists_to_ess
+        self.crossings = crossings or {}  # turnpoint index: list of bool, same as TurnpointCrossings
+        self.lead_coeff = lead_coeff  # LeadCoeff series
+        self.lc_key = lc_key  # fingerprint of the check that recorded Leading Coefficient series
+        self.changed = False
+
+    def __len__(self):
+        return len(self.fixes['rawtime'])
+
+    @staticmethod
+    def filename(task, track_file: str) -> Path:
+        return Path(task.file_path, f'{track_file}.series.npz')
+
+    @staticmethod
+    def create_key(task, track_file: str, config=None) -> str:
+        """returns key of task and IGC parsing parameters used to process track and calculate distances,
+        followed by track file hash. Launch radius is not used, as it is set during check.
+        config: FlightParsingConfig used to process track, None for default parameters"""
+        import hashlib
+        import json
+
+        from igc_lib import FlightParsingConfig
+        from pilot.flightresult import track_file_hash
+
+        config = config or FlightParsingConfig()
+        params = dict(
+            version=TrackSeries.version,
+            task={x: getattr(task, x) for x in ('window_open_time', 'task_deadline', 'check_launch')},
+            config={x: getattr(config, x) for x in dir(config) if not x.startswith('_')},
+            route=[
+                [tp.lat, tp.lon, None if tp.type == 'launch' else tp.radius, tp.type, tp.shape, tp.how]
+                for tp in task.turnpoints
+            ],
+            formula={x: getattr(task.formula, x, None) for x in ('tolerance', 'min_tolerance')},
+        )
+        data = json.dumps(params, sort_keys=True, default=str)
+        task_hash = hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+        return task_hash + track_file_hash(Path(task.file_path, track_file))
+
+    @classmethod
+    def from_flight(cls, task, track_file: str, flight, config=None):
+        """creates series from a processed Track obj. Returns None if fixes of flight events are not in track"""
+        fixes = flight.fixes
+        positions = {id(fix): i for i, fix in enumerate(fixes)}
+        takeoff = positions.get(id(getattr(flight, 'takeoff_fix', None)), -1)
+        landing = positions.get(id(getattr(flight, 'landing_fix', None)), -1)
+        thermals = [
+            (positions.get(id(t.enter_fix)), positions.get(id(t.exit_fix))) for t in getattr(flight, 'thermals', [])
+        ]
+        if (hasattr(flight, 'takeoff_fix') and takeoff < 0) or (hasattr(flight, 'landing_fix') and landing < 0):
+            return None
+        if any(None in t for t in thermals):
+            return None
+        series = cls(
+            path=cls.filename(task, track_file),
+            key=cls.create_key(task, track_file, config),
+            fixes={
+                x: np.fromiter((getattr(fix, x, np.nan) for fix in fixes), dtype=float, count=len(fixes))
+                for x in cls.fix_attributes
+            },
+            takeoff=takeoff,
+            landing=landing,
+            thermals=np.array(thermals, dtype=int).reshape(-1, 2),
+            notes=list(flight.notes),
+        )
+        series.changed = True
+        return series
+
+    @classmethod
+    def read(cls, task, track_file: str, config=None):
+        """reads stored series of track. Returns None if file does not exist,
+        or series were calculated with a different task route, IGC parsing config or track file"""
+        path = cls.filename(task, track_file)
+        if not path.is_file():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data['key']) != cls.create_key(task, track_file, config):
+                    return None
+                size = len(data['rawtime'])
+                crossings = {}
+                for name in data.files:
+                    if name.startswith('crossing_'):
+                        made = np.zeros(max(size - 1, 0), dtype=bool)
+                        made[data[name]] = True
+                        crossings[int(name[9:])] = made.tolist()
+                lead_coeff = None
+                if 'lc_times' in data.files:
+                    best_dist_to_ess, real_start_time = data['lc_info'].tolist()
+                    lead_coeff = dict(
+                        best_dist_to_ess=best_dist_to_ess,
+                        real_start_time=None if np.isnan(real_start_time) else int(real_start_time),
+                        times=data['lc_times'].tolist(),
+                        dists_to_ess=data['lc_dists_to_ess'].tolist(),
+                    )
+                return cls(
+                    path=path,
+                    key=str(data['key']),
+                    fixes={x: data[x] for x in cls.fix_attributes},
+                    takeoff=int(data['takeoff']),
+                    landing=int(data['landing']),
+                    thermals=data['thermals'],
+                    notes=data['notes'].tolist(),
+                    pointers=data['pointers'],
+                    dists_to_goal=data['dists_to_goal'],
+                    dists_to_ess=data['dists_to_ess'],
+                    crossings=crossings,
+                    lead_coeff=lead_coeff,
+                    lc_key=str(data['lc_key']) if 'lc_key' in data.files else None,
+                )
+        except (OSError, ValueError, KeyError) as e:
+            print(f'Error reading track series {path.name}: {e}')
+            return None
+
+    def save(self):
+        """stores series next to track file, if anything changed"""
+        if not self.changed:
+            return
+        '''crossing candidates are stored as indexes of fixes that made turnpoint'''
+        crossings = {f'crossing_{idx}': np.flatnonzero(made) for idx, made in self.crossings.items()}
+        lead_coeff = {}
+        if self.lead_coeff is not None:
+            lc = self.lead_coeff
+            real_start_time = np.nan if lc['real_start_time'] is None else lc['real_start_time']
+            lead_coeff = dict(
+                lc_info=np.array([lc['best_dist_to_ess'], real_start_time], dtype=float),
+                lc_times=np.array(lc['times'], dtype=float),
+                lc_dists_to_ess=np.array(lc['dists_to_ess'], dtype=float),
+            )
+            if self.lc_key:
+                lead_coeff['lc_key'] = np.array(self.lc_key)
+        try:
+            with open(self.path, 'wb') as f:
+                np.savez_compressed(
+                    f,
+                    key=np.array(self.key),
+                    takeoff=np.array(self.takeoff),
+                    landing=np.array(self.landing),
+                    thermals=self.thermals,
+                    notes=np.array(self.notes, dtype=str),
+                    pointers=self.pointers,
+                    dists_to_goal=self.dists_to_goal,
+                    dists_to_ess=self.dists_to_ess,
+                    **self.fixes,
+                    **crossings,
+                    **lead_coeff,
+                )
+            self.changed = False
+        except OSError as e:
+            print(f'Error saving track series {self.path.name}: {e}')
+
+    def flight(self):
+        """returns a Track-like obj. with fixes, takeoff and landing fixes, thermals, to be checked against task"""
+        from types import SimpleNamespace
+
+        from igc_lib import GNSSFix, Thermal
+
+        fixes = []
+        for index, (rawtime, lat, lon, press_alt, gnss_alt, alt) in enumerate(
+            zip(*(self.fixes[x].tolist() for x in self.fix_attributes))
+        ):
+            fix = GNSSFix(rawtime, lat, lon, 'A', press_alt, gnss_alt, index, '')
+            fix.alt = alt
+            fixes.append(fix)
+        flight = SimpleNamespace(
+            fixes=fixes,
+            thermals=[Thermal(fixes[enter], fixes[exit]) for enter, exit in self.thermals.tolist()],
+            notes=list(self.notes),
+            valid=True,
+        )
+        if self.takeoff >= 0:
+            flight.takeoff_fix = fixes[self.takeoff]
+        if self.landing >= 0:
+            flight.landing_fix = fixes[self.landing]
+        return flight
+
+    def dist_to_goal(self, task, index: int, fix, pointer: int) -> tuple:
+        """returns optimised distance to goal and to ESS of fix at index, as get_fix_dist_to_goal.
+        Distances calculated with a different pointer are calculated again and stored."""
+        if self.pointers[index] == pointer:
+            dist_to_ess = float(self.dists_to_ess[index])
+            return float(self.dists_to_goal[index]), None if np.isnan(dist_to_ess) else dist_to_ess
+        from route import get_fix_dist_to_goal
+
+        dist_to_goal, dist_to_ess = get_fix_dist_to_goal(task, fix, pointer)
+        self.pointers[index] = pointer
+        self.dists_to_goal[index] = dist_to_goal
+        self.dists_to_ess[index] = np.nan if dist_to_ess is None else dist_to_ess
+        self.changed = True
+        return dist_to_goal, dist_to_ess
+
+    def record_lead_coeff(self, lead_coeff):
+        """stores Leading Coefficient series recorded checking track. Series are used only after the check
+        fingerprint is set, as they depend on all task parameters used in check"""
+        lc = None if lead_coeff is None else lead_coeff.series
+        if lc != self.lead_coeff:
+            self.lead_coeff = lc
+            self.lc_key = None
+            self.changed = True
+
+    def set_lc_key(self, fingerprint: str):
+        if fingerprint != self.lc_key:
+            self.lc_key = fingerprint
+            self.changed = True
+
+    def get_lead_coeff(self, fingerprint: str) -> dict or None:
+        """returns Leading Coefficient series if they were recorded checking track with fingerprint"""
+        if self.lead_coeff is not None and fingerprint and fingerprint == self.lc_key:
+            return self.lead_coeff
+        return None
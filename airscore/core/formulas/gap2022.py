@@ -9,6 +9,8 @@ Scoring Formula Script
 """
 from formula import FormulaPreset, Preset
 from formulas.libs.gap import *
+from formulas.libs.gap import gap2020_penalty_scores as penalty_scores  # noqa
+from formulas.libs.gap import gap2020_speed_points as speed_points  # noqa
 from formulas.libs.leadcoeff import *
 from formulas import lclib
 
@@ -312,17 +314,17 @@ def pilot_speed(task, res):
     return Pspeed
 
 
-def lead_coeff_function(lc, result, fix, next_fix):
+def fixed_lc_function(lc):
     """
-    GAP2020 leading Coefficient Calculation
+    GAP2020 leading Coefficient Calculation, area of recorded fixes
     11.3.1 Leading coefficient
     HG: classic LC calculation
     PG: weighted area calculation
     """
     if lc.comp_class == 'HG':
-        return lclib.classic.lc_calculation(lc, result, fix, next_fix)
+        return lclib.classic.fixed_lc_calculation(lc)
     else:
-        return lclib.weightedarea.lc_calculation(lc, result, fix, next_fix)
+        return lclib.weightedarea.fixed_lc_calculation(lc)
 
 
 def tot_lc_calc(res, t):
@@ -337,8 +339,9 @@ def tot_lc_calc(res, t):
         return lclib.weightedarea.tot_lc_calculation(res, t)
 
 
-def points_allocation(task):
-    """ Get task with pilots FlightResult obj. and calculates results"""
+def points_allocation(task, batch: bool = True):
+    """ Get task with pilots FlightResult obj. and calculates results
+    batch: scores all pilots at once when possible, instead of each pilot"""
 
     ''' Get pilot.result not ABS or DNF '''
     results = task.valid_results
@@ -351,6 +354,10 @@ def points_allocation(task):
     ''' Calculate Min Dist Score '''
     min_dist_score = calculate_min_dist_score(task)
 
+    ''' Score all pilots at once'''
+    if batch and allocate_points(task, task.formula.get_lib(), min_dist_score):
+        return
+
     ''' Score each pilot now'''
     for res in results:
 
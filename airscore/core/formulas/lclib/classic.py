@@ -1,15 +1,22 @@
+import numpy as np
 
-def lc_calculation(lc, result, fix, next_fix):
+from formulas.libs.allocation import power
+
+
+def fixed_lc_calculation(lc) -> float:
     """Leading coefficient
     LC = taskTime(i)*(bestDistToESS(i-1)^2 - bestDistToESS(i)^2 )
-    i : i ? TrackPoints In SS"""
+    i : i ? TrackPoints In SS
+    calculated on all recorded fixes at once"""
     # print(f'Classic LC Calculation')
-    if lc.best_dist_to_ess[0] <= lc.best_dist_to_ess[1]:
-        return 0
-    else:
-        task_time = next_fix.rawtime - result.real_start_time
-        # return task_time * (lc.best_dist_to_ess[0] ** 2 - lc.best_dist_to_ess[1] ** 2) / (1800 * (lc.ss_distance ** 2))
-        return task_time * (lc.best_dist_to_ess[0] ** 2 - lc.best_dist_to_ess[1] ** 2)
+    times, previous, best = lc.best_distances()
+    improving = previous > best
+    if not improving.any():
+        return 0.0
+    task_time = times[improving] - lc.real_start_time
+    areas = task_time * (power(previous[improving], 2) - power(best[improving], 2))
+    '''summing in fixes order'''
+    return float(np.add.accumulate(areas)[-1]) if len(areas) else 0.0
 
 
 def tot_lc_calculation(res, t):
@@ -1,5 +1,7 @@
+import numpy as np
 
-def lc_calculation(lc, result, fix, next_fix) -> float:
+
+def fixed_lc_calculation(lc) -> float:
     """ Lead Coefficient formula from GAP2020
         11.3.1 Leading coefficient
         Each started pilot’s track log is used to calculate the leading coefficient (LC),
@@ -12,15 +14,16 @@ def lc_calculation(lc, result, fix, next_fix) -> float:
         This means that the graph never “goes back”: even if the pilot flies away from goal for a while,
         the corresponding points in the graph will use the previously reached best distance towards ESS.
     """
-
-    progress = lc.best_dist_to_ess[0] - lc.best_dist_to_ess[1]
-    # print(f'weight: {weight}, progress: {progress}, time: {time}')
-    if progress <= 0:
-        return 0
-
-    time = next_fix.rawtime - lc.best_start_time
-    weight = weight_calc(lc.best_dist_to_ess[1], lc.ss_distance)
-    return 0 if weight == 0 else weight * progress * time
+    times, previous, best = lc.best_distances()
+    progress = previous - best
+    improving = progress > 0
+    if not improving.any():
+        return 0.0
+    time = times[improving] - lc.best_start_time
+    weight = np.array([weight_calc(d, lc.ss_distance) for d in best[improving].tolist()], dtype=float)
+    areas = np.where(weight == 0, 0, weight * progress[improving] * time)
+    '''summing in fixes order'''
+    return float(np.add.accumulate(areas)[-1]) if len(areas) else 0.0
 
 
 def tot_lc_calculation(res, t) -> float:
@@ -0,0 +1,189 @@
+"""
+Points Allocation Library
+
+contains
+    - Batch points allocation: scores all pilots of a task at once, using arrays of results
+    - Formula sweeps: scores of a task with many sets of formula parameters
+
+Formula libraries provide the vectorised scoring functions used here:
+    distance_points, leadout_points, speed_points, arrival_points, penalty_scores
+Each of them returns None if results cannot be scored in batch (i.e. missing values, unsupported options),
+so that formula library falls back to scoring each pilot.
+Operations are in the same order of the per pilot functions, and powers are calculated with the same
+function Python uses, so scores are exactly the same.
+
+Use:    from formulas.libs.allocation import allocate_points, formula_sweep
+"""
+
+import numpy as np
+
+
+class ResultsArrays:
+    """Valid results attributes used in scoring, as arrays. Missing values are nan."""
+
+    attributes = (
+        'distance',
+        'ss_time',
+        'lead_coeff',
+        'real_start_time',
+        'ESS_rank',
+        'time_after',
+        'jtg_penalty',
+        'flat_penalty',
+        'percentage_penalty',
+    )
+
+    def __init__(self, results: list):
+        self.results = results
+        for attr in self.attributes:
+            setattr(self, attr, to_array([getattr(res, attr, None) for res in results]))
+        self.mindist = np.array([res.result_type == 'mindist' for res in results], dtype=bool)
+        self.goal = np.array([bool(res.goal_time) for res in results], dtype=bool)
+        self.ess = np.array([bool(res.ESS_time) for res in results], dtype=bool)
+        self.sss = np.array([bool(res.SSS_time) for res in results], dtype=bool)
+
+    def __len__(self):
+        return len(self.results)
+
+    @property
+    def scored(self):
+        """pilots scored with formula, others get min distance score"""
+        return ~self.mindist
+
+
+def to_array(values: list) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def power(base: np.ndarray, exponent: float) -> np.ndarray:
+    """element-wise power, calculated as Python does.
+    Deliberately not vectorised: numpy power can use SIMD implementations differing by 1 ulp from Python float
+    power, and batch scores have to be exactly the same as the per pilot ones. Arrays have one value per pilot,
+    so the loop is not a bottleneck"""
+    return np.array([b ** exponent for b in base.tolist()], dtype=float)
+
+
+def penalty_arrays(arrays: ResultsArrays, attributes: tuple) -> tuple or None:
+    """Returns mask of pilots with any of the penalties in attributes, and the penalties of those pilots.
+    None if penalised pilots have missing values"""
+    values = [getattr(arrays, attr) for attr in attributes]
+    penalised = np.zeros(len(arrays), dtype=bool)
+    for v in values:
+        penalised |= np.nan_to_num(v) != 0
+    values = [v[penalised] for v in values]
+    if any(np.isnan(v).any() for v in values):
+        return None
+    return (penalised, *values)
+
+
+def score_arrays(task, lib, arrays: ResultsArrays, min_dist_score: float) -> dict or None:
+    """Calculates scores of all results with formula library functions.
+    Returns dict of arrays, or None if results cannot be scored in batch"""
+    formula = task.formula
+    if task.departure == 'departure':
+        '''departure points are scored for each pilot'''
+        return None
+    n = len(arrays)
+    scored = arrays.scored
+    distance_score = np.zeros(n)
+    time_score = np.zeros(n)
+    arrival_score = np.zeros(n)
+    departure_score = np.zeros(n)
+
+    distance = lib.distance_points(task, arrays, scored)
+    if distance is None:
+        return None
+    distance_score[scored] = distance
+    distance_score[arrays.mindist] = min_dist_score
+
+    if task.departure == 'leadout':
+        mask = scored & arrays.sss
+        leadout = lib.leadout_points(task, arrays, mask)
+        if leadout is None:
+            return None
+        departure_score[mask] = leadout
+
+    mask = scored & arrays.ess
+    speed = lib.speed_points(task, arrays, mask)
+    if speed is None:
+        return None
+    time_score[mask] = speed
+    arrival = lib.arrival_points(task, arrays, mask)
+    if arrival is None:
+        return None
+    arrival_score[mask] = arrival
+
+    '''Penalty for not making goal'''
+    no_goal = mask & ~arrays.goal
+    time_score[no_goal] *= 1 - formula.no_goal_penalty
+    arrival_score[no_goal] *= 1 - formula.no_goal_penalty
+
+    '''Total score'''
+    total = distance_score + time_score + arrival_score + departure_score
+    penalties = lib.penalty_scores(task, arrays, total, min_dist_score)
+    if penalties is None:
+        return None
+    penalty, score = penalties
+    return dict(
+        distance_score=distance_score,
+        time_score=time_score,
+        arrival_score=arrival_score,
+        departure_score=departure_score,
+        penalty=penalty,
+        score=score,
+        no_goal=no_goal,
+    )
+
+
+def allocate_points(task, lib, min_dist_score: float) -> bool:
+    """Scores all valid results of task at once, and writes scores to FlightResult objects.
+    Returns False if results cannot be scored in batch, leaving results unchanged."""
+    results = task.valid_results
+    scores = score_arrays(task, lib, ResultsArrays(results), min_dist_score)
+    if scores is None:
+        return False
+    no_goal = scores.pop('no_goal').tolist()
+    values = {k: v.tolist() for k, v in scores.items()}
+    for idx, res in enumerate(results):
+        for k, v in values.items():
+            setattr(res, k, v[idx])
+        if no_goal[idx]:
+            res.goal_time = 0
+    return True
+
+
+def formula_sweep(task, parameters: list) -> list:
+    """Calculates scores of task valid results with many sets of formula parameters.
+    Task and results are not changed. Results are used as processed with task formula,
+    so parameters used to process results (i.e. min_dist, formula_departure) are applied only to scoring.
+    parameters: list of dict {formula parameter: value}
+    Returns list of dict with day quality and scores arrays for each set of parameters,
+    None for sets that cannot be scored in batch"""
+    from copy import copy
+
+    results = task.valid_results
+    arrays = ResultsArrays(results)
+    saved = {k: v for k, v in task.as_dict().items() if k not in ('pilots', 'formula', '_stats')}
+    original = task.formula
+    output = []
+    try:
+        for params in parameters:
+            formula = copy(original)
+            formula.as_dict().update(params)
+            task.formula = formula
+            lib = formula.get_lib()
+            lib.day_quality(task)
+            lib.points_weight(task)
+            if formula.formula_distance == 'difficulty':
+                task.difficulty = lib.difficulty_calculation(task)
+            scores = score_arrays(task, lib, arrays, lib.calculate_min_dist_score(task))
+            if scores is not None:
+                scores.pop('no_goal')
+                scores['day_quality'] = task.day_quality
+            output.append(scores)
+    finally:
+        task.formula = original
+        task.as_dict().update(saved)
+        for k in [k for k in task.as_dict() if k not in saved and k not in ('pilots', 'formula', '_stats')]:
+            del task.as_dict()[k]
+    return output
@@ -16,17 +16,48 @@ Add support for FAI Sphere ???
 from dataclasses import dataclass
 from math import sqrt
 
+import numpy as np
+
+from formulas.libs.allocation import allocate_points, penalty_arrays, power
 from pilot.flightresult import FlightResult
 
 
-def difficulty_calculation(task):
-    @dataclass
-    class Diffslot:
-        dist_x10: int
-        diff: int = 0
-        rel_diff: float = 0.0
-        diff_score: float = 0.0
+@dataclass
+class Diffslot:
+    dist_x10: int
+    diff: int = 0
+    rel_diff: float = 0.0
+    diff_score: float = 0.0
+
+
+class Difficulty:
+    """Difficulty of each 100 m slot of the task, as arrays indexed by distance (Km * 10).
+    Can be read as a list of Diffslot, i.e. difficulty[dist_x10].diff_score"""
+
+    def __init__(self, diff=None, rel_diff=None, diff_score=None):
+        self.diff = np.zeros(0, dtype=int) if diff is None else diff
+        self.rel_diff = np.zeros(len(self.diff)) if rel_diff is None else rel_diff
+        self.diff_score = np.zeros(len(self.diff)) if diff_score is None else diff_score
+
+    def __len__(self):
+        return len(self.diff)
+
+    def __getitem__(self, index: int) -> Diffslot:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('difficulty slot out of range')
+        return Diffslot(index, int(self.diff[index]), float(self.rel_diff[index]), float(self.diff_score[index]))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def dist_x10(self):
+        return np.arange(len(self))
 
+
+def difficulty_calculation(task):
     formula = task.formula
     best_dist_flown = max(task.max_distance, formula.min_dist) / 1000  # Km
     lo_results = [p for p in task.valid_results if not p.goal_time]
@@ -38,58 +69,39 @@ def difficulty_calculation(task):
 
     '''distance spread'''
     min_dist_kmx10 = int(formula.min_dist / 100)  # min_dist (Km) * 10
-    distspread = dict()
-    best_dist = 0  # best dist. (Km)
-    best_dist_kmx10 = 0  # best dist. (Km) * 10
-
-    for p in lo_results:
-        dist_kmx10 = max(int(p.distance / 100), min_dist_kmx10)
-        dist = p.distance / 1000  # Km
-        distspread[dist_kmx10] = 1 if dist_kmx10 not in distspread.keys() else distspread[dist_kmx10] + 1
-        if dist_kmx10 > best_dist_kmx10:
-            best_dist_kmx10 = dist_kmx10
-        if dist > best_dist:
-            best_dist = dist
+    spread = [max(int(p.distance / 100), min_dist_kmx10) for p in lo_results]
+    best_dist = max(0, max(p.distance for p in lo_results) / 1000)  # best dist. (Km)
+    best_dist_kmx10 = max(spread)  # best dist. (Km) * 10
 
     # Sanity
     if best_dist == 0:
-        return []
+        return Difficulty()
 
     ''' the difficulty for each 100-meter section of the task is calculated
         by counting the number of pilots who landed further along the task'''
     best_dist_kmx10r = int((best_dist_kmx10 + 10) / 10) * 10
     look_ahead = max(30, round(30 * best_dist_flown / pilots_lo))
-    kmdiff = []
-
-    for i in range(best_dist_kmx10r):
-        diff = sum(
-            [
-                0 if x not in distspread.keys() else distspread[x]
-                for x in range(i, min(i + look_ahead, best_dist_kmx10r))
-            ]
-        )
-        kmdiff.append(Diffslot(i, diff))
+    distspread = np.bincount(spread, minlength=best_dist_kmx10r)
+    landed_before = np.concatenate(([0], np.cumsum(distspread)))
+    slots = np.arange(best_dist_kmx10r)
+    diff = landed_before[np.minimum(slots + look_ahead, best_dist_kmx10r)] - landed_before[slots]
 
-    sum_diff = sum([x.diff for x in kmdiff])
+    sum_diff = int(diff.sum())
 
     ''' Relative difficulty is then calculated by dividing each 100-meter slot’s
         difficulty by twice the sum of all difficulty values.'''
+    first = min(min_dist_kmx10 + 1, best_dist_kmx10r)  # first slot over min. distance
+    last = max(first, best_dist_kmx10)  # first slot at best distance
+    rel_diff = np.zeros(best_dist_kmx10r)
+    diff_score = np.full(best_dist_kmx10r, 0.5)
+    sum_rel_diff = 0 if sum_diff == 0 else sum((0.5 * diff[:first] / sum_diff).tolist())
+    diff_score[:first] = sum_rel_diff
+    if sum_diff > 0:
+        rel_diff[first:last] = 0.5 * diff[first:last] / sum_diff
+    '''difficulty score is the sum of relative difficulty of slots up to the pilot one'''
+    diff_score[first:last] = np.add.accumulate(np.concatenate(([sum_rel_diff], rel_diff[first:last])))[1:]
 
-    sum_rel_diff = (
-        0 if sum_diff == 0 else sum([(0.5 * x.diff / sum_diff) for x in kmdiff if x.dist_x10 <= min_dist_kmx10])
-    )
-    for el in kmdiff:
-        if el.dist_x10 <= min_dist_kmx10:
-            el.diff_score = sum_rel_diff
-        elif el.dist_x10 >= best_dist_kmx10:
-            el.diff_score = 0.5
-        else:
-            if sum_diff > 0:
-                el.rel_diff = 0.5 * el.diff / sum_diff
-            sum_rel_diff += el.rel_diff
-            el.diff_score = sum_rel_diff
-
-    return kmdiff
+    return Difficulty(diff, rel_diff, diff_score)
 
 
 def launch_validity(task):
@@ -422,12 +434,12 @@ def pilot_distance(task, pil):
         distance flown in the task.
         The other half is assigned taking into consideration the difficulty
         of the kilometers flown."""
-        diff = task.difficulty
+        diff = task.difficulty.diff_score
         linear_fraction = 0.5 * pil.distance / task.max_distance
         dist10 = int(pil.distance / 100)  # int(dist in Km * 10)
-        diff_fraction = diff[dist10].diff_score
-        if len(diff) > dist10 + 1 and diff[dist10 + 1].diff_score > diff_fraction:
-            diff_fraction += (diff[dist10 + 1].diff_score - diff[dist10].diff_score) * (pil.distance / 100 - dist10)
+        diff_fraction = float(diff[dist10])
+        if len(diff) > dist10 + 1 and diff[dist10 + 1] > diff_fraction:
+            diff_fraction += (float(diff[dist10 + 1]) - diff_fraction) * (pil.distance / 100 - dist10)
         return task.avail_dist_points * (linear_fraction + diff_fraction)
 
 
@@ -452,6 +464,155 @@ def pilot_penalty(task, res):
     return actual_penalty, score_after_all_penalties
 
 
+def distance_points(task, arrays, mask):
+    """pilot_distance for all pilots in mask, as array. None if pilots cannot be scored in batch"""
+    avail = task.avail_dist_points
+    goal = arrays.goal[mask]
+    distance = np.where(goal, 0, arrays.distance[mask])
+    if np.isnan(distance).any() or (not task.max_distance and not goal.all()):
+        return None
+
+    if task.formula.formula_distance == 'on':
+        points = distance / task.max_distance * avail
+
+    elif task.formula.formula_distance == 'difficulty':
+        if task.difficulty is None:
+            return None
+        diff = task.difficulty.diff_score
+        linear_fraction = 0.5 * distance / task.max_distance
+        dist10 = (distance / 100).astype(int)
+        if (dist10 >= len(diff)).any():
+            return None
+        diff_fraction = diff[dist10]
+        next_fraction = diff[np.minimum(dist10 + 1, len(diff) - 1)]
+        interpolate = (dist10 + 1 < len(diff)) & (next_fraction > diff_fraction)
+        diff_fraction = np.where(
+            interpolate, diff_fraction + (next_fraction - diff_fraction) * (distance / 100 - dist10), diff_fraction
+        )
+        points = avail * (linear_fraction + diff_fraction)
+
+    else:
+        return None
+
+    return np.where(goal, avail, points)
+
+
+def leadout_points(task, arrays, mask):
+    """pilot_leadout for all pilots in mask, as array"""
+    Astart = task.avail_dep_points
+    LCmin = task.min_lead_coeff
+    LCp = arrays.lead_coeff[mask]
+    if np.isnan(LCp).any() or (LCmin is None and len(LCp)):
+        return None
+
+    Pdepart = np.zeros(len(LCp))
+    Pdepart[(LCp > 0) & (LCp <= LCmin)] = Astart
+    if LCmin is not None and LCmin > 0:
+        lead = LCp > LCmin
+        LF = 1 - power((LCp[lead] - LCmin) / sqrt(LCmin), 2 / 3)
+        Pdepart[lead] = np.where(LF > 0, Astart * LF, 0)
+
+    return Pdepart
+
+
+def speed_points(task, arrays, mask):
+    """pilot_speed for all pilots in mask, as array"""
+    Aspeed = task.avail_time_points
+    Tmin = task.fastest or 0
+    Ptime = arrays.ss_time[mask]
+    Pspeed = np.zeros(len(Ptime))
+
+    if Tmin > 0:
+        base = (Ptime - Tmin) / 3600 / sqrt(Tmin / 3600)
+        if np.isnan(base).any() or (base < 0).any():
+            return None
+        SF = 1 - power(base, 2 / 3)
+        reduction = task.time_points_reduction if hasattr(task, 'time_points_reduction') else 0
+        Pspeed = np.where(SF > 0, Aspeed * SF - reduction, 0)
+
+    return Pspeed
+
+
+def arrival_points(task, arrays, mask):
+    """pilot_arrival for all pilots in mask, as array"""
+    Aarrival = task.avail_arr_points
+
+    if task.arrival == 'off' or not mask.any():
+        return np.zeros(np.count_nonzero(mask))
+    elif task.arrival == 'position':
+        '''FAI position arrival points'''
+        AC = 1 - (arrays.ESS_rank[mask] - 1) / task.pilots_ess
+    elif task.arrival == 'time':
+        '''OZGAP time arrival points'''
+        AC = 1 - 0.667 * (arrays.time_after[mask] / 3600)
+    else:
+        return None
+
+    if np.isnan(AC).any():
+        return None
+    AF = 0.2 + 0.037 * AC + 0.13 * power(AC, 2) + 0.633 * power(AC, 3)
+    return AF * Aarrival
+
+
+def penalty_scores(task, arrays, scores, min_dist_score):
+    """pilot_penalty for all pilots, as arrays of penalty and final score"""
+    values = penalty_arrays(arrays, ('jtg_penalty', 'flat_penalty', 'percentage_penalty'))
+    if values is None:
+        return None
+    penalised, jtg, flat, perc = values
+    penalty = np.zeros(len(scores))
+    final = scores.copy()
+
+    score_before = scores[penalised]
+    score_after_jtg = np.where(jtg == 0, score_before, np.maximum(min_dist_score, score_before - jtg))
+    other_penalty = score_after_jtg * perc + flat
+    max_avail_points = task.day_quality * 1000
+    score_after_all_penalties = np.minimum(np.maximum(0, score_after_jtg - other_penalty), max_avail_points)
+    penalty[penalised] = score_before - score_after_all_penalties
+    final[penalised] = score_after_all_penalties
+    return penalty, final
+
+
+def gap2020_speed_points(task, arrays, mask):
+    """GAP2020 and later pilot_speed for all pilots in mask, as array.
+    None if pilots cannot be scored in batch"""
+    Aspeed = task.avail_time_points
+    if not mask.any():
+        return np.zeros(0)
+
+    if task.formula.no_goal_penalty < 1 or (task.stopped_time and not task.fastest_in_goal):
+        Tmin = (task.fastest or 0) / 3600  # decimal hours
+    else:
+        Tmin = (task.fastest_in_goal or 0) / 3600
+    if not Tmin > 0:
+        return None
+
+    Ptime = arrays.ss_time[mask] / 3600  # decimal hours
+    base = (Ptime - Tmin) / sqrt(Tmin)
+    if np.isnan(base).any() or (base < 0).any():
+        return None
+    SF = np.maximum(0, 1 - power(base, 5 / 6))
+    return np.where(SF > 0, Aspeed * SF - task.time_points_reduction, 0)
+
+
+def gap2020_penalty_scores(task, arrays, scores, min_dist_score):
+    """GAP2020 and later pilot_penalty for all pilots, as arrays of penalty and final score"""
+    values = penalty_arrays(arrays, ('jtg_penalty', 'flat_penalty', 'percentage_penalty'))
+    if values is None:
+        return None
+    penalised, jtg, flat, perc = values
+    penalty = np.zeros(len(scores))
+    final = scores.copy()
+
+    score = scores[penalised]
+    score_after_jtg = np.where(jtg == 0, score, np.maximum(min_dist_score, score - jtg))
+    # applying flat penalty after percentage ones
+    other_penalty = score_after_jtg * perc + flat
+    final[penalised] = np.maximum(0, score_after_jtg - other_penalty)
+    penalty[penalised] = score - final[penalised]
+    return penalty, final
+
+
 def calculate_min_dist_score(t):
     from pilot.flightresult import FlightResult
 
@@ -500,8 +661,9 @@ def process_results(task):
             res.lead_coeff = lib.tot_lc_calc(res, task)
 
 
-def points_allocation(task):
-    """ Get task with pilots FlightResult obj. and calculates results"""
+def points_allocation(task, batch: bool = True):
+    """ Get task with pilots FlightResult obj. and calculates results
+    batch: scores all pilots at once when possible, instead of each pilot"""
 
     ''' Get pilot.result not ABS or DNF '''
     results = task.valid_results
@@ -514,6 +676,10 @@ def points_allocation(task):
     ''' Calculate Min Dist Score '''
     task.min_dist_score = calculate_min_dist_score(task)
 
+    ''' Score all pilots at once'''
+    if batch and allocate_points(task, task.formula.get_lib(), task.min_dist_score):
+        return
+
     ''' Score each pilot now'''
     for res in results:
 
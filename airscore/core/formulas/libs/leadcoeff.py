@@ -7,41 +7,90 @@ contains
 
 Stuart Mackintosh, Antonio Golfari - 2019
 """
+import numpy as np
+
 from formulas import lclib
 
 
 class LeadCoeff(object):
+    """Records time and distance to ESS of each track fix in speed section.
+    Leading Coefficient area is calculated from recorded series by Formula Library, when needed,
+    so it can be calculated again, i.e. with a different formula, without checking track again."""
+
     def __init__(self, task):
         self.ss_distance = task.SS_distance / 1000
         self.opt_dist_to_ess = task.opt_dist_to_ESS / 1000
-        self.best_dist_to_ess = [task.SS_distance / 1000]
+        self.best_dist_to_ess = [task.SS_distance / 1000]  # best distance before recorded fixes
         self.best_distance_time = 0
         self.best_start_time = task.start_time
         self.lib = task.formula.get_lib()
         self.comp_class = task.comp_class
-        self.summing = 0.0
+        self.real_start_time = None
+        self.times = []
+        self.dists_to_ess = []
+
+    @property
+    def best_dist_to_ess_km(self):
+        best = self.best_dist_to_ess[-1]
+        if self.dists_to_ess:
+            best = min(best, self.ss_distance, min(self.dists_to_ess))
+        return best
 
     @property
     def best_dist_to_ess_m(self):
-        return self.best_dist_to_ess[-1] * 1000
+        return self.best_dist_to_ess_km * 1000
+
+    @property
+    def summing(self) -> float:
+        """ Get lead coeff area calculation formula from Formula Library"""
+        return self.lib.fixed_lc_function(self)
+
+    @property
+    def series(self) -> dict:
+        return dict(
+            best_dist_to_ess=self.best_dist_to_ess[-1],
+            real_start_time=self.real_start_time,
+            times=self.times,
+            dists_to_ess=self.dists_to_ess,
+        )
+
+    @classmethod
+    def from_series(cls, task, series: dict):
+        """creates LeadCoeff obj. from recorded series"""
+        lc = cls(task)
+        lc.best_dist_to_ess = [series['best_dist_to_ess']]
+        lc.real_start_time = series['real_start_time']
+        lc.times = list(series['times'])
+        lc.dists_to_ess = list(series['dists_to_ess'])
+        return lc
 
     def reset(self):
-        self.summing = 0.0
+        self.best_dist_to_ess = [self.best_dist_to_ess_km]
+        self.real_start_time = None
+        self.times = []
+        self.dists_to_ess = []
 
     def update(self, result, fix, next_fix, dist_to_ess):
-        """ Get lead coeff calculation formula from Formula Library"""
-        dist_to_ess /= 1000
-        self.best_dist_to_ess.append(min(dist_to_ess, self.ss_distance, self.best_dist_to_ess[0]))
+        """ Records fix time and distance to ESS (Km)"""
+        if not self.times:
+            self.real_start_time = result.real_start_time
+        self.times.append(next_fix.rawtime)
+        self.dists_to_ess.append(dist_to_ess / 1000)
         self.best_distance_time = result.best_distance_time if not result.ESS_time else result.ESS_time
-        self.summing += self.lib.lead_coeff_function(self, result, fix, next_fix)
-        self.best_dist_to_ess.pop(0)
 
+    def best_distances(self) -> tuple:
+        """Returns fix times, best distance to ESS before and after each fix, as arrays.
+        Best distance never goes back, and is never more than SS distance"""
+        distances = np.minimum(np.array(self.dists_to_ess, dtype=float), self.ss_distance)
+        best = np.minimum.accumulate(np.concatenate(([self.best_dist_to_ess[-1]], distances)))
+        return np.array(self.times, dtype=float), best[:-1], best[1:]
 
-def lead_coeff_function(lc, result, fix, next_fix):
-    """Lead Coefficient formula from GAP2016
+
+def fixed_lc_function(lc):
+    """Lead Coefficient area of recorded fixes, formula from GAP2016
     Default fallback
     This is the default function if not present in Formula library"""
-    return lclib.classic.lc_calculation(lc, result, fix, next_fix)
+    return lclib.classic.fixed_lc_calculation(lc)
 
 
 def tot_lc_calc(res, t):
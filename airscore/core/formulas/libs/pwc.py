@@ -15,6 +15,10 @@ Add support for FAI Sphere ???
 
 from math import sqrt
 
+import numpy as np
+
+from formulas.libs.allocation import allocate_points, penalty_arrays, power
+
 
 def launch_validity(task):
     """
@@ -271,6 +275,77 @@ def pilot_penalty(task, res):
     return actual_penalty, score_after_all_penalties
 
 
+def distance_points(task, arrays, mask):
+    """pilot_distance for all pilots in mask, as array. None if pilots cannot be scored in batch"""
+    avail = task.avail_dist_points
+    goal = arrays.goal[mask]
+    distance = np.where(goal, 0, arrays.distance[mask])
+    if np.isnan(distance).any() or (not task.max_distance and not goal.all()):
+        return None
+
+    return np.where(goal, avail, distance / task.max_distance * avail)
+
+
+def leadout_points(task, arrays, mask):
+    """pilot_leadout for all pilots in mask, as array"""
+    Astart = task.avail_dep_points
+    LCmin = task.min_lead_coeff
+    LCp = arrays.lead_coeff[mask]
+    if np.isnan(LCp).any() or (LCmin is None and len(LCp)):
+        return None
+
+    Pdepart = np.zeros(len(LCp))
+    Pdepart[(LCp > 0) & (LCp <= LCmin)] = Astart
+    if LCmin is not None and LCmin > 0:
+        lead = LCp > LCmin
+        LF = np.maximum(0, 1 - power((LCp[lead] - LCmin) / sqrt(LCmin), 2 / 3))
+        Pdepart[lead] = Astart * LF
+
+    return Pdepart
+
+
+def speed_points(task, arrays, mask):
+    """pilot_speed for all pilots in mask, as array"""
+    Aspeed = task.avail_time_points
+    Tmin = task.fastest or 0
+    Ptime = arrays.ss_time[mask]
+    Pspeed = np.zeros(len(Ptime))
+
+    if Tmin > 0:
+        base = (Ptime - Tmin) / 3600 / sqrt(Tmin / 3600)
+        if np.isnan(base).any() or (base < 0).any():
+            return None
+        SF = 1 - power(base, 5 / 6)
+        reduction = task.time_points_reduction if hasattr(task, 'time_points_reduction') else 0
+        Pspeed = np.where(SF > 0, Aspeed * SF - reduction, 0)
+
+    return Pspeed
+
+
+def arrival_points(task, arrays, mask):
+    """PWC has no arrival points"""
+    return np.zeros(np.count_nonzero(mask))
+
+
+def penalty_scores(task, arrays, scores, min_dist_score):
+    """pilot_penalty for all pilots, as arrays of penalty and final score"""
+    values = penalty_arrays(arrays, ('flat_penalty', 'percentage_penalty'))
+    if values is None:
+        return None
+    penalised, flat, perc = values
+    penalty = np.zeros(len(scores))
+    final = scores.copy()
+
+    score_before = scores[penalised]
+    # applying flat penalty after percentage ones
+    pilot_penalty = score_before * perc + flat
+    max_avail_points = task.day_quality * 1000
+    score_after_all_penalties = np.minimum(np.maximum(0, score_before - pilot_penalty), max_avail_points)
+    penalty[penalised] = score_before - score_after_all_penalties
+    final[penalised] = score_after_all_penalties
+    return penalty, final
+
+
 def calculate_min_dist_score(t):
     from pilot.flightresult import FlightResult
 
@@ -317,8 +392,9 @@ def process_results(task):
         res.lead_coeff = lib.tot_lc_calc(res, task)
 
 
-def points_allocation(task):
-    """ Get task with pilots FlightResult obj. and calculates results"""
+def points_allocation(task, batch: bool = True):
+    """ Get task with pilots FlightResult obj. and calculates results
+    batch: scores all pilots at once when possible, instead of each pilot"""
 
     ''' Get pilots not ABS or DNF '''
     results = task.valid_results
@@ -327,6 +403,10 @@ def points_allocation(task):
     ''' Calculate Min Dist Score '''
     task.min_dist_score = calculate_min_dist_score(task)
 
+    ''' Score all pilots at once'''
+    if batch and allocate_points(task, task.formula.get_lib(), task.min_dist_score):
+        return
+
     ''' Score each pilot now'''
     for res in results:
 
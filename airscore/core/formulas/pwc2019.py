@@ -138,16 +138,16 @@ def points_weight(task):
         task.time_points_reduction = 0
 
 
-def lead_coeff_function(lc, result, fix, next_fix):
+def fixed_lc_function(lc):
     """
-    PWC2019 leading Coefficient Calculation
+    PWC2019 leading Coefficient Calculation, area of recorded fixes
     11.3.1 Leading coefficient
     PG: weighted area calculation
     """
     if lc.comp_class == 'HG':
-        return lclib.classic.lc_calculation(lc, result, fix, next_fix)
+        return lclib.classic.fixed_lc_calculation(lc)
     else:
-        return lclib.weightedarea.lc_calculation(lc, result, fix, next_fix)
+        return lclib.weightedarea.fixed_lc_calculation(lc)
 
 
 def tot_lc_calc(res, t):
@@ -60,55 +60,84 @@ def get_comps() -> list:
     return [row._asdict() for row in comps]
 
 
-def find_orphan_pilots(pilots_list: list, orphans: list) -> (list, list):
+def find_orphan_pilots(pilots_list: list, orphans: list, matches: dict = None) -> (list, list):
     """Tries to guess participants that do not have a pil_id, and associate them to other participants or
-    to a pilot in database"""
+    to a pilot in database.
+    matches: (opt.) dict {par_id: pil_id} of previous guesses, pil_id is None if no pilot was found.
+             It is updated with new guesses."""
     from calcUtils import get_int
     from db.tables import PilotView as P
 
+    matches = {} if matches is None else matches
+    pilots_index = {}
+    for el in pilots_list:
+        pilots_index.setdefault(el['pil_id'], el)
     pilots_found = []
     still_orphans = []
+    guessed = []
     ''' find a match among pilots already in list'''
     print(f"trying to find pilots from orphans...")
     for p in orphans:
-        name, civl_id, comp_id = p['name'], p['civl_id'], p['comp_id']
+        par_id, name, civl_id, comp_id = p['par_id'], p['name'], p['civl_id'], p['comp_id']
+        if par_id in matches:
+            '''already guessed'''
+            found = pilots_index.get(matches[par_id])
+            if found:
+                found['par_ids'].append(par_id)
+                found['comp_ids'].append(comp_id)
+            elif matches[par_id]:
+                guessed.append(p)
+            else:
+                still_orphans.append(p)
+            continue
         found = next(
             (
                 el
                 for el in pilots_list
-                if (el['name'] == name or (civl_id and civl_id == el['civl_id'])) and comp_id not in el[comp_id]
+                if (el['name'] == name or (civl_id and civl_id == el['civl_id'])) and comp_id not in el['comp_ids']
             ),
             None,
         )
         if found:
             '''adding to existing pilot'''
-            found['par_ids'].append(p['par_id'])
+            found['par_ids'].append(par_id)
             found['comp_ids'].append(comp_id)
+            matches[par_id] = found['pil_id']
         else:
             still_orphans.append(p)
     ''' find a match among pilots in database if still we have orphans'''
     orphans = []
-    if still_orphans:
+    unknown = [p for p in still_orphans if p['par_id'] not in matches]
+    orphans.extend(p for p in still_orphans if p['par_id'] in matches)
+    if unknown or guessed:
         with db_session() as db:
-            pilots = db.query(P).all()
-            for p in still_orphans:
+            if unknown:
+                pilots = db.query(P).all()
+            else:
+                pilots = db.query(P).filter(P.pil_id.in_([matches[p['par_id']] for p in guessed])).all()
+            pilots_by_id = {int(el.pil_id): el for el in pilots}
+            for p in guessed + unknown:
                 name, civl_id, comp_id = p['name'].title(), p['civl_id'], p['comp_id']
-                row = next(
-                    (
-                        el
-                        for el in pilots
-                        if (
-                            (
-                                el.first_name
-                                and el.last_name
-                                and el.first_name.title() in name
-                                and el.last_name.title() in name
+                if p['par_id'] in matches:
+                    row = pilots_by_id.get(matches[p['par_id']])
+                else:
+                    row = next(
+                        (
+                            el
+                            for el in pilots
+                            if (
+                                (
+                                    el.first_name
+                                    and el.last_name
+                                    and el.first_name.title() in name
+                                    and el.last_name.title() in name
+                                )
+                                or (civl_id and el.civl_id and civl_id == get_int(el.civl_id))
                             )
-                            or (civl_id and el.civl_id and civl_id == get_int(el.civl_id))
-                        )
-                    ),
-                    None,
-                )
+                        ),
+                        None,
+                    )
+                    matches[p['par_id']] = None if not row else int(row.pil_id)
                 if row:
                     '''check if we already found the same pilot in orphans'''
                     found = next((el for el in pilots_found if el['pil_id'] == row.pil_id), None)
@@ -158,9 +187,17 @@ def get_ladders() -> list:
 
 
 def get_ladder_results(
-    ladder_id: int, season: int, nat: str = None, starts: datetime.date = None, ends: datetime.date = None
+    ladder_id: int,
+    season: int,
+    nat: str = None,
+    starts: datetime.date = None,
+    ends: datetime.date = None,
+    refresh: bool = False,
 ) -> json:
-    """creates result json using comp results from all events in ladder"""
+    """creates result json using comp results from all events in ladder.
+    Results are saved in a ladder result file, that is created again only when comp result files,
+    participants or ladder parameters change, or if refresh is True"""
+    import hashlib
     import time
 
     from calcUtils import get_season_dates
@@ -171,7 +208,7 @@ def get_ladder_results(
     from db.tables import TblLadderSeason as LS
     from db.tables import TblParticipant as P
     from db.tables import TblResultFile as R
-    from result import open_json_file
+    from result import open_json_file, result_file_version, write_json_file
 
     if not (nat and starts and ends):
         lad = L.get_by_id(ladder_id)
@@ -210,13 +247,40 @@ def get_ladder_results(
         files = [row.filename for row in results]
         print(comps_ids, files)
 
+        '''participants, and their version to check if they changed since ladder was created'''
+        participants = db.query(P).filter(P.comp_id.in_(comps_ids), P.nat == nat).order_by(P.pil_id, P.comp_id).all()
+        participants_data = [
+            [p.par_id, p.comp_id, p.pil_id, p.civl_id, p.fai_id, p.name, p.sex, p.nat, p.glider, p.glider_cert]
+            for p in participants
+        ]
+        participants_version = hashlib.blake2b(
+            json.dumps(participants_data, default=str).encode(), digest_size=16
+        ).hexdigest()
+
+        '''check if ladder result file is up to date'''
+        filename = f'ladder_{ladder_id}_{season}.json'
+        sources = dict(
+            files=[[f, result_file_version(f)] for f in files],
+            participants=[len(participants), participants_version],
+            params=[nat, str(starts), str(ends), row.cat_id, row.overall_validity, row.validity_param],
+        )
+        ladder = None if refresh else open_json_file(filename)
+        if isinstance(ladder, dict) and ladder['file_stats'].get('sources') == sources:
+            return ladder
+        '''previous guesses of participants without pil_id, used only if participants did not change,
+        so that wrong guesses are corrected editing participants'''
+        matches = {}
+        previous = ladder['file_stats'] if isinstance(ladder, dict) else {}
+        if previous.get('sources', {}).get('participants') == sources['participants']:
+            matches = {int(k): v for k, v in previous.get('orphan_matches', {}).items()}
+
         '''create Participants list'''
-        results = db.query(P).filter(P.comp_id.in_(comps_ids), P.nat == nat).order_by(P.pil_id, P.comp_id).all()
         pilots_list = []
+        pilots_index = {}
         orphans = []
-        for row in results:
+        for row in participants:
             if row.pil_id:
-                p = next((el for el in pilots_list if el['pil_id'] == row.pil_id), None)
+                p = pilots_index.get(row.pil_id)
                 if p:
                     '''add par_id'''
                     p['par_ids'].append(row.par_id)
@@ -237,6 +301,7 @@ def get_ladder_results(
                         results=[],
                     )
                     pilots_list.append(p)
+                    pilots_index[row.pil_id] = p
             else:
                 p = dict(
                     comp_id=row.comp_id,
@@ -253,12 +318,17 @@ def get_ladder_results(
                 orphans.append(p)
     '''try to guess orphans'''
     if orphans:
-        pilots_list, orphans = find_orphan_pilots(pilots_list, orphans)
+        pilots_list, orphans = find_orphan_pilots(pilots_list, orphans, matches)
+    participants = {}
+    for p in pilots_list:
+        for par_id in p['par_ids']:
+            participants.setdefault(par_id, p)
 
     '''get results'''
     stats = {'tot_pilots': len(pilots_list)}
     comps = []
     tasks = []
+    tasks_index = {}
     for file in files:
         f = open_json_file(file)
         '''get comp info'''
@@ -266,19 +336,20 @@ def get_ladder_results(
         comp_code = i['comp_code']
         results = f['results']
         comps.append(dict(id=i['id'], comp_code=i['comp_code'], comp_name=i['comp_name'], tasks=len(f['tasks'])))
-        tasks.extend(
-            [
-                dict(id=t['id'], ftv_validity=t['ftv_validity'], task_code=f"{i['comp_code']}_{t['task_code']}")
-                for t in f['tasks']
-            ]
-        )
+        comp_tasks = [
+            dict(id=t['id'], ftv_validity=t['ftv_validity'], task_code=f"{i['comp_code']}_{t['task_code']}")
+            for t in f['tasks']
+        ]
+        tasks.extend(comp_tasks)
+        for t in comp_tasks:
+            tasks_index.setdefault(t['task_code'], t)
         for r in results:
-            p = next((el for el in pilots_list if r['par_id'] in el['par_ids']), None)
+            p = participants.get(r['par_id'])
             if p:
                 scores = r['results']
                 for i, s in scores.items():
-                    idx, code = next((t['id'], t['task_code']) for t in tasks if f"{comp_code}_{i}" == t['task_code'])
-                    p['results'].append({'task_id': idx, 'task_code': code, **s})
+                    t = tasks_index[f"{comp_code}_{i}"]
+                    p['results'].append({'task_id': t['id'], 'task_code': t['task_code'], **s})
 
     '''get params'''
     val = formula['overall_validity']
@@ -339,7 +410,7 @@ def get_ladder_results(
     pilots_list = sorted(pilots_list, key=lambda x: x['score'], reverse=True)
     stats['winner_score'] = 0 if not pilots_list else pilots_list[0]['score']
     '''create json'''
-    file_stats = {'timestamp': time.time()}
+    file_stats = {'result_type': 'ladder', 'timestamp': time.time(), 'sources': sources, 'orphan_matches': matches}
     output = {
         'info': info,
         'comps': comps,
@@ -349,9 +420,30 @@ def get_ladder_results(
         'rankings': rankings,
         'file_stats': file_stats,
     }
+    '''save ladder result file'''
+    write_json_file(filename, output)
     return output
 
 
+def update_ladder_results(comp_id: int):
+    """creates again result files of ladders and seasons that include the competition"""
+    from db.tables import TblLadderComp as LC
+    from db.tables import TblLadderSeason as LS
+
+    with db_session() as db:
+        ladders = [
+            (row.ladder_id, row.season)
+            for row in db.query(LS.ladder_id, LS.season)
+            .join(LC, LC.ladder_id == LS.ladder_id)
+            .filter(LC.comp_id == comp_id, LS.active == 1)
+        ]
+    for ladder_id, season in ladders:
+        try:
+            get_ladder_results(ladder_id, season)
+        except Exception as e:
+            print(f'Error updating results of ladder {ladder_id} season {season}: {e}')
+
+
 def get_admin_comps(current_userid, current_user_access=None):
     """get a list of all competitions in the DB and flag ones where owner is current user"""
     c = aliased(TblCompetition)
@@ -582,15 +674,18 @@ def check_task(task_id: int) -> tuple:
     from db.tables import TblTaskResult as R
     from db.tables import TblForComp as F
     from db.tables import TblTask as T
+    from task import need_full_rescore as tracks_need_full_rescore
 
     need_full_rescore = False
     need_new_scoring = False
     need_older_tracks_recheck = False
+    has_tracks = False
 
     with db_session() as db:
         '''get last track creation'''
         query = db.query(R.last_update).filter_by(task_id=task_id).filter(R.track_file.isnot(None))
         if query.count() > 0:
+            has_tracks = True
             last_track = query.order_by(R.last_update.desc()).first()
             first_track = query.order_by(R.last_update).first()
             last_file = db.query(RF).filter_by(task_id=task_id).order_by(RF.created.desc()).first()
@@ -605,8 +700,9 @@ def check_task(task_id: int) -> tuple:
             if task_updated > first_track.last_update:
                 '''formula or task has changed after first track was evaluated'''
                 need_older_tracks_recheck = True
-            # todo logic to see if we need a full rescore, probably only if task was canceled and we have more tracks,
-            #  or stopped and elapsed time / multistart with newer tracks started later than previous last
+    if has_tracks:
+        '''tracks checked with different task route, formula or airspace parameters, compared by fingerprint'''
+        need_full_rescore = tracks_need_full_rescore(task_id)
     return need_new_scoring, need_older_tracks_recheck, need_full_rescore
 
 
@@ -791,7 +887,7 @@ def allowed_tracklog_filesize(filesize, size=5):
 
 def process_igc(task_id: int, par_id: int, tracklog, user, check_g_record=False, check_validity=False):
     from airspace import AirspaceCheck
-    from pilot.flightresult import FlightResult, save_track
+    from pilot.flightresult import FlightResult, save_track, track_fingerprint
     from trackUtils import check_flight, igc_parsing_config_from_yaml, import_igc_file, save_igc_file
     from task import Task
     from tempfile import mkdtemp
@@ -825,7 +921,8 @@ def process_igc(task_id: int, par_id: int, tracklog, user, check_g_record=False,
     pilot.track_file = save_igc_file(tracklog, task.file_path, task.date, pilot.name, pilot.ID)
 
     airspace = None if not task.airspace_check else AirspaceCheck.from_task(task)
-    check_flight(pilot, mytrack, task, airspace, print=print)
+    fingerprint = track_fingerprint(task.check_hash(), Path(task.file_path, pilot.track_file))
+    check_flight(pilot, mytrack, task, airspace, print=print, fingerprint=fingerprint)
     '''save to database'''
     save_track(pilot, task.id)
 
@@ -839,7 +936,7 @@ def process_igc_background(task_id: int, par_id: int, file, user, check_g_record
     from trackUtils import import_igc_file, save_igc_file, igc_parsing_config_from_yaml, check_flight
     import json
     from airspace import AirspaceCheck
-    from pilot.flightresult import FlightResult, save_track
+    from pilot.flightresult import FlightResult, save_track, track_fingerprint
     from task import Task
 
     print = partial(print_to_sse, id=par_id, channel=user)
@@ -870,7 +967,8 @@ def process_igc_background(task_id: int, par_id: int, file, user, check_g_record
     print(f'IGC file saved: {pilot.track_file}')
     airspace = None if not task.airspace_check else AirspaceCheck.from_task(task)
     print('***************START*******************')
-    check_flight(pilot, mytrack, task, airspace, print=print)
+    fingerprint = track_fingerprint(task.check_hash(), Path(task.file_path, pilot.track_file))
+    check_flight(pilot, mytrack, task, airspace, print=print, fingerprint=fingerprint)
     '''save to database'''
     save_track(pilot, task.id)
 
@@ -912,88 +1010,81 @@ def track_result_output(pilot, task_id) -> dict:
     return data
 
 
-def unzip_igc(zipfile):
-    """split function for background in production"""
+def save_zip_to_temp(zipfile) -> Path:
+    """split function for background in production.
+    Saves the archive in a temp dir that background worker can read, tracks are not extracted"""
     from os import chmod
+    from shutil import copyfile
     from tempfile import mkdtemp
 
     from Defines import TEMPFILES
-    from trackUtils import extract_tracks
 
     """create a temporary directory"""
-    # with TemporaryDirectory() as tracksdir:
-    tracksdir = mkdtemp(dir=TEMPFILES)
+    tempdir = mkdtemp(dir=TEMPFILES)
     # make readable and writable by other users as background runs in another container
-    chmod(tracksdir, 0o775)
-
-    error = extract_tracks(zipfile, tracksdir)
-    if error:
-        print(f"An error occurred while dealing with file {zipfile}")
-        return None
-    return tracksdir
+    chmod(tempdir, 0o775)
+    file = Path(tempdir, 'tracks.zip')
+    if isinstance(zipfile, (Path, str)):
+        copyfile(zipfile, file)
+    else:
+        zipfile.save(file)
+    return file
 
 
-def process_archive_background(taskid: int, tracksdir, user, check_g_record=False, track_source=None):
+def process_archive_background(taskid: int, zipfile, user, check_g_record=False, track_source=None):
     """function split for background use.
-    tracksdir is a temp dir that will be deleted at the end of the function"""
+    zipfile is in a temp dir that will be deleted at the end of the function"""
     from shutil import rmtree
 
     from task import Task
-    from trackUtils import assign_and_import_tracks, get_tracks
 
     print = partial(print_to_sse, id=None, channel=user)
     print('|open_modal')
     task = Task.read(taskid)
-    if task.opt_dist == 0:
-        print('task not optimised.. optimising')
-        task.calculate_optimised_task_length()
-    tracks = get_tracks(tracksdir)
-    """find valid tracks"""
-    if tracks is None:
-        print(f"There are no valid tracks in zipfile")
-        return None
-    """associate tracks to pilots and import"""
-    assign_and_import_tracks(tracks, task, track_source, user=user, check_g_record=check_g_record, print=print)
-    rmtree(tracksdir)
-    print('|reload')
-    return 'Success'
+    result = process_archive(task, zipfile, check_g_record, track_source, user=user, print=print)
+    rmtree(Path(zipfile).parent)
+    if result:
+        print('|reload')
+    return result
 
 
-def process_archive(task, zipfile, check_g_record=False, track_source=None):
-    from tempfile import TemporaryDirectory
+def process_archive(task, zipfile, check_g_record=False, track_source=None, user=None, print=print):
+    """reads tracks from archive, without extracting them, and imports them"""
+    from zipfile import BadZipFile, ZipFile
 
-    from trackUtils import assign_and_import_tracks, extract_tracks, get_tracks
+    from trackUtils import assign_and_import_tracks, get_zip_tracks
 
     if task.opt_dist == 0:
         print('task not optimised.. optimising')
         task.calculate_optimised_task_length()
 
-    """create a temporary directory"""
-    with TemporaryDirectory() as tracksdir:
-        error = extract_tracks(zipfile, tracksdir)
-        if error:
-            print(f"An error occurred while dealing with file {zipfile} \n")
-            return None
-        """find valid tracks"""
-        tracks = get_tracks(tracksdir)
-        if not tracks:
-            print(f"There are no valid tracks in zipfile {zipfile}, or all pilots are already been scored \n")
-            return None
-
-        """associate tracks to pilots and import"""
-        assign_and_import_tracks(tracks, task, track_source, check_g_record=check_g_record)
-        return 'Success'
+    try:
+        with ZipFile(zipfile, 'r') as archive:
+            """find valid tracks"""
+            tracks = get_zip_tracks(archive)
+            if not tracks:
+                print(f"There are no valid tracks in zipfile, or all pilots are already been scored \n")
+                return None
+
+            """associate tracks to pilots and import"""
+            assign_and_import_tracks(
+                tracks, task, track_source, user=user, check_g_record=check_g_record, print=print
+            )
+    except (IOError, BadZipFile):
+        print(f"An error occurred while dealing with file {zipfile} \n")
+        return None
+    return 'Success'
 
 
 def process_zip_file(zip_file: Path, taskid: int, username: str, grecord: bool, track_source: str = None):
     from task import Task
 
     if production():
-        tracksdir = unzip_igc(zip_file)
+        zipfile = save_zip_to_temp(zip_file)
         job = current_app.task_queue.enqueue(
             process_archive_background,
             taskid=taskid,
-            tracksdir=tracksdir,
+            zipfile=zipfile,
             user=username,
             check_g_record=grecord,
             track_source=track_source,
@@ -2088,6 +2179,7 @@ def unpublish_comp_result(comp_id: int):
     from result import unpublish_result
 
     unpublish_result(comp_id, comp=True)
+    update_ladder_results(comp_id)
 
 
 def publish_comp_result(comp_id: int, filename: str) -> bool:
@@ -2097,6 +2189,7 @@ def publish_comp_result(comp_id: int, filename: str) -> bool:
     try:
         unpublish_result(comp_id, comp=True)
         publish_result(filename)
+        update_ladder_results(comp_id)
         return True
     except (FileNotFoundError, Exception) as e:
         print(f'Error trying to publish result')
@@ -2115,6 +2208,7 @@ def publish_all_results(comp_id: int):
             row.active = 1
     '''update comp result'''
     Comp.create_results(comp_id, status='Created from FSDB imported results', name_suffix='Overview')
+    update_ladder_results(comp_id)
 
 
 def update_comp_result(comp_id: int, status: str = None, name_suffix: str = None) -> tuple:
@@ -2509,7 +2603,7 @@ def create_new_comp(comp, user_id: int) -> dict:
 
 def recheck_track(task_id: int, par_id: int, user) -> tuple:
     from airspace import AirspaceCheck
-    from pilot.flightresult import FlightResult, save_track
+    from pilot.flightresult import FlightResult, save_track, track_fingerprint
     from trackUtils import check_flight, igc_parsing_config_from_yaml, import_igc_file
     from task import Task
 
@@ -2530,7 +2624,8 @@ def recheck_track(task_id: int, par_id: int, user) -> tuple:
 
     '''recheck track'''
     airspace = None if not task.airspace_check else AirspaceCheck.from_task(task)
-    check_flight(pilot, flight, task, airspace, print=print)
+    fingerprint = track_fingerprint(task.check_hash(), Path(task.file_path, pilot.track_file))
+    check_flight(pilot, flight, task, airspace, print=print, fingerprint=fingerprint)
     '''save to database'''
     save_track(pilot, task.id)
 
@@ -2544,7 +2639,7 @@ def recheck_track_background(task_id: int, par_id: int, user):
     from trackUtils import import_igc_file, igc_parsing_config_from_yaml, check_flight
     import json
     from airspace import AirspaceCheck
-    from pilot.flightresult import FlightResult, save_track
+    from pilot.flightresult import FlightResult, save_track, track_fingerprint
     from task import Task
 
     print = partial(print_to_sse, id=par_id, channel=user)
@@ -2567,7 +2662,8 @@ def recheck_track_background(task_id: int, par_id: int, user):
     '''recheck track'''
     airspace = None if not task.airspace_check else AirspaceCheck.from_task(task)
     print('***************START*******************')
-    check_flight(pilot, flight, task, airspace, print=print)
+    fingerprint = track_fingerprint(task.check_hash(), Path(task.file_path, pilot.track_file))
+    check_flight(pilot, flight, task, airspace, print=print, fingerprint=fingerprint)
     '''save to database'''
     save_track(pilot, task.id)
 
@@ -2582,7 +2678,7 @@ def recheck_track_background(task_id: int, par_id: int, user):
 
 def recheck_tracks(task_id: int, username: str):
     """get list of tracks that need to be evaluated, and process them"""
-    from pilot.flightresult import FlightResult, update_all_results
+    from pilot.flightresult import FlightResult, track_fingerprint, update_all_results
     from task import Task
     from airspace import AirspaceCheck
     from trackUtils import igc_parsing_config_from_yaml, check_flight
@@ -2601,13 +2697,14 @@ def recheck_tracks(task_id: int, username: str):
     track_path = task.file_path
     FlightParsingConfig = igc_parsing_config_from_yaml(task.igc_config_file)
     airspace = None if not task.airspace_check else AirspaceCheck.from_task(task)
+    task_hash = task.check_hash()
 
     for par in par_ids:
         pilot = FlightResult.read(par_id=par, task_id=task_id)
         file = Path(track_path, pilot.track_file)
         flight = Track.process(file, task, config=FlightParsingConfig)
         if flight:
-            check_flight(pilot, flight, task, airspace=airspace)
+            check_flight(pilot, flight, task, airspace=airspace, fingerprint=track_fingerprint(task_hash, file))
             pilots_to_save.append(pilot)
     '''save all succesfully processed pilots to database'''
     update_all_results([p for p in pilots_to_save], task_id)
@@ -2618,7 +2715,7 @@ def recheck_tracks_background(task_id: int, user: str):
     from task import Task
     from airspace import AirspaceCheck
     from trackUtils import igc_parsing_config_from_yaml, check_flight
-    from pilot.flightresult import update_all_results
+    from pilot.flightresult import track_fingerprint, update_all_results
     from pilot.track import Track
 
     pilots_to_save = []
@@ -2631,6 +2728,7 @@ def recheck_tracks_background(task_id: int, user: str):
     outdated_results = filter(lambda x: x.par_id in par_ids, task.results)
     FlightParsingConfig = igc_parsing_config_from_yaml(task.igc_config_file)
     airspace = None if not task.airspace_check else AirspaceCheck.from_task(task)
+    task_hash = task.check_hash()
     for pilot in outdated_results:
         # pilot = FlightResult.read(par_id=par, task_id=task_id)
         file = Path(track_path, pilot.track_file)
@@ -2641,7 +2739,8 @@ def recheck_tracks_background(task_id: int, user: str):
         else:
             pilot_print = partial(print_to_sse, id=pilot.par_id, channel=user)
             print('***************START*******************')
-            check_flight(pilot, flight, task, airspace, print=pilot_print)
+            fingerprint = track_fingerprint(task_hash, file)
+            check_flight(pilot, flight, task, airspace, print=pilot_print, fingerprint=fingerprint)
             if pilot.notifications:
                 print(f"NOTES:<br /> {'<br />'.join(n.comment for n in pilot.notifications)}")
 
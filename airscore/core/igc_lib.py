@@ -31,6 +31,8 @@ import re
 import xml.dom.minidom
 from pathlib2 import Path
 
+import numpy as np
+
 from collections import defaultdict
 
 import lib.viterbi as viterbi
@@ -398,6 +400,172 @@ class GNSSFix:
             extras)
 
 
+class FixArrays:
+    """Columnar storage of the fixes of a Flight.
+
+    Raw attributes are numpy arrays with one element per fix, in the same
+    order as Flight.fixes:
+        rawtime: time since last midnight, UTC, seconds
+        lat: latitude in degrees
+        lon: longitude in degrees
+        press_alt: pressure altitude, meters
+        gnss_alt: GNSS altitude, meters
+
+    Derived arrays (alt, timestamp, gsp, step_dist, bearing,
+    bearing_change_rate) are added by Flight while processing the fixes.
+    Flight.fixes keeps the GNSSFix objects, whose attributes are filled
+    from these arrays.
+    """
+
+    def __init__(self, rawtime, lat, lon, press_alt, gnss_alt):
+        self.rawtime = np.asarray(rawtime, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.press_alt = np.asarray(press_alt, dtype=np.float64)
+        self.gnss_alt = np.asarray(gnss_alt, dtype=np.float64)
+
+    @staticmethod
+    def from_fixes(fixes):
+        """Creates FixArrays from a list of GNSSFix objects."""
+        return FixArrays(
+            rawtime=[fix.rawtime for fix in fixes],
+            lat=[fix.lat for fix in fixes],
+            lon=[fix.lon for fix in fixes],
+            press_alt=[fix.press_alt for fix in fixes],
+            gnss_alt=[fix.gnss_alt for fix in fixes])
+
+    def __len__(self):
+        return len(self.rawtime)
+
+
+def _digits(records, start, end):
+    """Decodes a fixed-width column of ASCII digits into a float array."""
+    value = np.zeros(len(records))
+    for pos in range(start, end):
+        value = value * 10.0 + (records[:, pos] - 48)
+    return value
+
+
+def _are_digits(records, start, end):
+    """Returns a boolean array, rows whose columns start:end are digits."""
+    column = records[:, start:end]
+    return np.all((column >= 48) & (column <= 57), axis=1)
+
+
+def _signed_alt(records, start):
+    """Decodes a 5 characters altitude column, optionally signed.
+
+    Returns a tuple: the altitudes and a boolean array of valid rows.
+    """
+    sign = records[:, start]
+    negative = sign == ord('-')
+    valid = (negative | ((sign >= 48) & (sign <= 57))) & _are_digits(
+        records, start + 1, start + 5)
+    alt = _digits(records, start + 1, start + 5)
+    alt = np.where(negative, -alt, alt + (sign - 48) * 10000.0)
+    return alt, valid
+
+
+_B_RECORD_LENGTH = 35
+_B_RECORD_EXTRAS = re.compile(r'[0-9a-zA-Z\-]*')
+
+
+def parse_igc_file(filename, time_window=None):
+    """Reads an IGC file and decodes all B records in a single batch.
+
+    The file is read as bytes and the fixed-width part of the B records
+    is decoded with numpy, instead of matching each line with a regular
+    expression. Fixes with the same time as the previous one are ignored.
+
+    Args:
+        filename: a string or Path, the name of the input IGC file, or an
+            object with the Path open() method, i.e. a file in an archive
+        time_window: optional tuple (first, last) rawtime, in seconds.
+            Fixes out of the window are ignored.
+
+    Returns:
+        A tuple: list of GNSSFix objects, FixArrays object with the same
+        fixes, list of A records, list of H records, list of I records.
+    """
+    a_records = []
+    h_records = []
+    i_records = []
+    b_records = []
+    b_extras = []
+    if isinstance(filename, (str, Path)):
+        filename = Path(filename).expanduser().absolute()
+    with filename.open('rb') as flight_file:
+        data = flight_file.read()
+    for line in data.splitlines():
+        if not line:
+            continue
+        kind = line[:1]
+        if kind == b'B':
+            if len(line) >= _B_RECORD_LENGTH:
+                b_records.append(line[:_B_RECORD_LENGTH])
+                b_extras.append(line[_B_RECORD_LENGTH:])
+        elif kind == b'A':
+            a_records.append(line.decode('ISO-8859-1'))
+        elif kind == b'I':
+            i_records.append(line.decode('ISO-8859-1'))
+        elif kind == b'H':
+            h_records.append(line.decode('ISO-8859-1'))
+        else:
+            # Do not parse any other types of IGC records
+            pass
+
+    records = np.frombuffer(b''.join(b_records), dtype=np.uint8).reshape(
+        len(b_records), _B_RECORD_LENGTH).astype(np.int64)
+
+    press_alt, press_alt_ok = _signed_alt(records, 25)
+    gnss_alt, gnss_alt_ok = _signed_alt(records, 30)
+    valid = (_are_digits(records, 1, 14) &
+             np.isin(records[:, 14], (ord('N'), ord('S'))) &
+             _are_digits(records, 15, 23) &
+             np.isin(records[:, 23], (ord('E'), ord('W'))) &
+             np.isin(records[:, 24], (ord('A'), ord('V'))) &
+             press_alt_ok & gnss_alt_ok)
+
+    rawtime = ((_digits(records, 1, 3)*60.0 + _digits(records, 3, 5))*60.0 +
+               _digits(records, 5, 7))
+    if time_window is not None:
+        valid &= (time_window[0] <= rawtime) & (rawtime <= time_window[1])
+    selected = np.nonzero(valid)[0]
+    # The time did not change since the previous fix, ignore this fix.
+    rawtime = rawtime[selected]
+    moved = np.ones(len(selected), dtype=bool)
+    moved[1:] = np.abs(np.diff(rawtime)) >= 1e-5
+    selected = selected[moved]
+    records = records[selected]
+
+    lat = _digits(records, 7, 9)
+    lat += _digits(records, 9, 11) / 60.0
+    lat += _digits(records, 11, 14) / 1000.0 / 60.0
+    lat = np.where(records[:, 14] == ord('S'), -lat, lat)
+
+    lon = _digits(records, 15, 18)
+    lon += _digits(records, 18, 20) / 60.0
+    lon += _digits(records, 20, 23) / 1000.0 / 60.0
+    lon = np.where(records[:, 23] == ord('W'), -lon, lon)
+
+    fix_arrays = FixArrays(rawtime[moved], lat, lon,
+                           press_alt[selected], gnss_alt[selected])
+    fixes = [
+        GNSSFix(rawtime, lat, lon, chr(validity), press_alt, gnss_alt,
+                index, _B_RECORD_EXTRAS.match(
+                    b_extras[i].decode('ISO-8859-1')).group())
+        for index, (i, rawtime, lat, lon, validity, press_alt, gnss_alt)
+        in enumerate(zip(selected.tolist(),
+                         fix_arrays.rawtime.tolist(),
+                         fix_arrays.lat.tolist(),
+                         fix_arrays.lon.tolist(),
+                         records[:, 24].tolist(),
+                         fix_arrays.press_alt.tolist(),
+                         fix_arrays.gnss_alt.tolist()))
+    ]
+    return fixes, fix_arrays, a_records, h_records, i_records
+
+
 class Thermal:
     """Represents a single thermal detected in a flight.
 
@@ -576,6 +744,8 @@ class Flight:
         notes: a list of strings, warnings and errors encountered while
         parsing/validating the file
         fixes: a list of GNSSFix objects, one per each valid B record
+        fix_arrays: a FixArrays object, columnar copy of fixes used for
+        vectorised computations
         thermals: a list of Thermal objects, the detected thermals
         glides: a list of Glide objects, the glides between thermals
         takeoff_fix: a GNSSFix object, the fix at which takeoff was detected
@@ -613,38 +783,14 @@ class Flight:
             An instance of Flight built from the supplied IGC file.
         """
         config = config_class()
-        fixes = []
-        a_records = []
-        i_records = []
-        h_records = []
-        abs_filename = Path(filename).expanduser().absolute()
-        with abs_filename.open('r', encoding="ISO-8859-1") as flight_file:
-            for line in flight_file:
-                line = line.replace('\n', '').replace('\r', '')
-                if not line:
-                    continue
-                if line[0] == 'A':
-                    a_records.append(line)
-                elif line[0] == 'B':
-                    fix = GNSSFix.build_from_B_record(line, index=len(fixes))
-                    if fix is not None:
-                        if fixes and math.fabs(fix.rawtime - fixes[-1].rawtime) < 1e-5:
-                            # The time did not change since the previous fix.
-                            # Ignore this fix.
-                            pass
-                        else:
-                            fixes.append(fix)
-                elif line[0] == 'I':
-                    i_records.append(line)
-                elif line[0] == 'H':
-                    h_records.append(line)
-                else:
-                    # Do not parse any other types of IGC records
-                    pass
-        flight = Flight(fixes, a_records, h_records, i_records, config)
+        fixes, fix_arrays, a_records, h_records, i_records = parse_igc_file(
+            filename)
+        flight = Flight(fixes, a_records, h_records, i_records, config,
+                        fix_arrays=fix_arrays)
         return flight
 
-    def __init__(self, fixes, a_records, h_records, i_records, config):
+    def __init__(self, fixes, a_records, h_records, i_records, config,
+                 fix_arrays=None):
         """Initializer of the Flight class. Do not use directly."""
         self._config = config
         self.fixes = fixes
@@ -657,6 +803,9 @@ class Flight:
             self.valid = False
             return
 
+        if fix_arrays is None:
+            fix_arrays = FixArrays.from_fixes(fixes)
+        self.fix_arrays = fix_arrays
         self._check_altitudes()
         if not self.valid:
             return
@@ -687,9 +836,7 @@ class Flight:
             self.valid = False
             return
 
-        for fix in self.fixes:
-            fix.set_flight(self)
-
+        self._set_fixes_flight()
         self._compute_ground_speeds()
         self._compute_flight()
         self._compute_takeoff_landing()
@@ -801,37 +948,42 @@ class Flight:
         descr += ")"
         return descr
 
+    def _alt_changes(self, alts):
+        """Computes altitude changes statistics between consecutive fixes.
+
+        Returns:
+            A tuple: number of changes faster than max_alt_change_rate,
+            sum of the absolute value of the other changes.
+        """
+        arrays = self.fix_arrays
+        alt_delta = np.abs(np.diff(alts))
+        rawtime_delta = np.abs(np.diff(arrays.rawtime))
+        timed = rawtime_delta > 0.5
+        huge = np.zeros_like(timed)
+        huge[timed] = (alt_delta[timed] / rawtime_delta[timed] >
+                       self._config.max_alt_change_rate)
+        huge_changes_num = int(np.count_nonzero(huge))
+        chgs_sum = float(alt_delta[timed & ~huge].sum())
+        return huge_changes_num, chgs_sum
+
+    def _alt_violations(self, alts):
+        """Returns a boolean array, fixes out of min_alt - max_alt limits.
+
+        As in the original per-fix loop, the last fix is not checked.
+        """
+        alts = alts[:-1]
+        return (alts > self._config.max_alt) | (alts < self._config.min_alt)
+
     def _check_altitudes(self):
-        press_alt_violations_num = 0
-        gnss_alt_violations_num = 0
-        press_huge_changes_num = 0
-        gnss_huge_changes_num = 0
-        press_chgs_sum = 0.0
-        gnss_chgs_sum = 0.0
-        for i in range(len(self.fixes) - 1):
-            press_alt_delta = math.fabs(
-                self.fixes[i+1].press_alt - self.fixes[i].press_alt)
-            gnss_alt_delta = math.fabs(
-                self.fixes[i+1].gnss_alt - self.fixes[i].gnss_alt)
-            rawtime_delta = math.fabs(
-                self.fixes[i+1].rawtime - self.fixes[i].rawtime)
-            if rawtime_delta > 0.5:
-                if (press_alt_delta / rawtime_delta >
-                        self._config.max_alt_change_rate):
-                    press_huge_changes_num += 1
-                else:
-                    press_chgs_sum += press_alt_delta
-                if (gnss_alt_delta / rawtime_delta >
-                        self._config.max_alt_change_rate):
-                    gnss_huge_changes_num += 1
-                else:
-                    gnss_chgs_sum += gnss_alt_delta
-            if (self.fixes[i].press_alt > self._config.max_alt
-                    or self.fixes[i].press_alt < self._config.min_alt):
-                press_alt_violations_num += 1
-            if (self.fixes[i].gnss_alt > self._config.max_alt or
-                    self.fixes[i].gnss_alt < self._config.min_alt):
-                gnss_alt_violations_num += 1
+        arrays = self.fix_arrays
+        press_huge_changes_num, press_chgs_sum = self._alt_changes(
+            arrays.press_alt)
+        gnss_huge_changes_num, gnss_chgs_sum = self._alt_changes(
+            arrays.gnss_alt)
+        press_alt_violations_num = int(np.count_nonzero(
+            self._alt_violations(arrays.press_alt)))
+        gnss_alt_violations_num = int(np.count_nonzero(
+            self._alt_violations(arrays.gnss_alt)))
         press_chgs_avg = press_chgs_sum / float(len(self.fixes) - 1)
         gnss_chgs_avg = gnss_chgs_sum / float(len(self.fixes) - 1)
 
@@ -890,26 +1042,24 @@ class Flight:
         handling.
         """
         DAY = 24.0 * 60.0 * 60.0
-        days_added = 0
-        rawtime_to_add = 0.0
-        rawtime_between_fix_exceeded = 0
-        for i in range(1, len(self.fixes)):
-            f0 = self.fixes[i-1]
-            f1 = self.fixes[i]
-            f1.rawtime += rawtime_to_add
-
-            if (f0.rawtime > f1.rawtime and
-                    f1.rawtime + DAY < f0.rawtime + 200.0):
-                # Day switch
-                days_added += 1
-                rawtime_to_add += DAY
-                f1.rawtime += DAY
-
-            time_change = f1.rawtime - f0.rawtime
-            if time_change < self._config.min_seconds_between_fixes - 1e-5:
-                rawtime_between_fix_exceeded += 1
-            if time_change > self._config.max_seconds_between_fixes + 1e-5:
-                rawtime_between_fix_exceeded += 1
+        arrays = self.fix_arrays
+        rawtime = arrays.rawtime
+        # A day switch only depends on the two original rawtimes, as both
+        # fixes have already been shifted by the same amount.
+        day_switch = ((rawtime[:-1] > rawtime[1:]) &
+                      (rawtime[1:] + DAY < rawtime[:-1] + 200.0))
+        days_added = int(np.count_nonzero(day_switch))
+        if days_added:
+            rawtime = rawtime.copy()
+            rawtime[1:] += np.cumsum(day_switch) * DAY
+            arrays.rawtime = rawtime
+            for fix, fix_rawtime in zip(self.fixes, rawtime.tolist()):
+                fix.rawtime = fix_rawtime
+
+        time_change = np.diff(rawtime)
+        rawtime_between_fix_exceeded = int(np.count_nonzero(
+            (time_change < self._config.min_seconds_between_fixes - 1e-5) |
+            (time_change > self._config.max_seconds_between_fixes + 1e-5)))
 
         if rawtime_between_fix_exceeded > self._config.max_time_violations:
             self.notes.append(
@@ -925,16 +1075,33 @@ class Flight:
                 % (self._config.max_new_days_in_flight, days_added))
             self.valid = False
 
+    def _set_fixes_flight(self):
+        """Sets parent Flight, alt and timestamp on fixes and arrays."""
+        arrays = self.fix_arrays
+        if self.alt_source == "PRESS":
+            arrays.alt = arrays.press_alt
+        else:
+            arrays.alt = arrays.gnss_alt
+        arrays.timestamp = arrays.rawtime + self.date_timestamp
+        for fix, alt, timestamp in zip(self.fixes, arrays.alt.tolist(),
+                                       arrays.timestamp.tolist()):
+            fix.flight = self
+            fix.alt = alt
+            fix.timestamp = timestamp
+
     def _compute_ground_speeds(self):
         """Adds ground speed info (km/h) to self.fixes."""
-        self.fixes[0].gsp = 0.0
-        for i in range(1, len(self.fixes)):
-            dist = self.fixes[i].distance_to(self.fixes[i-1])
-            rawtime = self.fixes[i].rawtime - self.fixes[i-1].rawtime
-            if math.fabs(rawtime) < 1e-5:
-                self.fixes[i].gsp = 0.0
-            else:
-                self.fixes[i].gsp = dist/rawtime*3600.0
+        arrays = self.fix_arrays
+        dist = geo.earth_distances(arrays.lat[1:], arrays.lon[1:],
+                                   arrays.lat[:-1], arrays.lon[:-1])
+        rawtime = np.diff(arrays.rawtime)
+        moved = np.abs(rawtime) >= 1e-5
+        gsp = np.zeros(len(arrays))
+        gsp[1:][moved] = dist[moved] / rawtime[moved] * 3600.0
+        arrays.gsp = gsp
+        arrays.step_dist = np.concatenate(([0.0], dist))
+        for fix, fix_gsp in zip(self.fixes, gsp.tolist()):
+            fix.gsp = fix_gsp
 
     def _flying_emissions(self):
         """Generates raw flying/not flying emissions from ground speed.
@@ -943,14 +1110,8 @@ class Flight:
         Exported to a separate function to be used in Baum-Welch parameters
         learning.
         """
-        emissions = []
-        for fix in self.fixes:
-            if fix.gsp > self._config.min_gsp_flight:
-                emissions.append(1)
-            else:
-                emissions.append(0)
-
-        return emissions
+        emissions = self.fix_arrays.gsp > self._config.min_gsp_flight
+        return emissions.astype(int).tolist()
 
     def _compute_flight(self):
         """Adds boolean flag .flying to self.fixes.
@@ -1054,9 +1215,37 @@ class Flight:
 
     def _compute_bearings(self):
         """Adds bearing info to self.fixes."""
-        for i in range(len(self.fixes) - 1):
-            self.fixes[i].bearing = self.fixes[i].bearing_to(self.fixes[i+1])
-        self.fixes[-1].bearing = self.fixes[-2].bearing
+        arrays = self.fix_arrays
+        bearing = np.empty(len(arrays))
+        bearing[:-1] = geo.bearings_to(arrays.lat[:-1], arrays.lon[:-1],
+                                       arrays.lat[1:], arrays.lon[1:])
+        bearing[-1] = bearing[-2]
+        arrays.bearing = bearing
+        for fix, fix_bearing in zip(self.fixes, bearing.tolist()):
+            fix.bearing = fix_bearing
+
+    def _prev_fixes_for_bearing_change(self):
+        """Computes the previous fix to be used in bearing rate change.
+
+        Returns an integer array, for each fix the index of the closest
+        previous fix at least min_time_for_bearing_change seconds apart,
+        or -1 if there is none. The first fix is never used.
+        """
+        rawtime = self.fix_arrays.rawtime
+        min_time = self._config.min_time_for_bearing_change - 1e-7
+        if np.all(np.diff(rawtime) >= 0.0):
+            prev = np.searchsorted(rawtime, rawtime - min_time,
+                                   side='left') - 1
+        else:
+            # Time is not monotonic, we need to scan back fix by fix.
+            prev = np.full(len(rawtime), -1)
+            for curr_fix in range(len(rawtime)):
+                for i in range(curr_fix - 1, 0, -1):
+                    if math.fabs(rawtime[curr_fix] - rawtime[i]) > min_time:
+                        prev[curr_fix] = i
+                        break
+        prev[prev < 1] = -1
+        return prev
 
     def _compute_bearing_change_rates(self):
         """Adds bearing change rate info to self.fixes.
@@ -1066,35 +1255,20 @@ class Flight:
         Therefore we compute rates between points that are at least
         min_time_for_bearing_change seconds apart.
         """
-        def find_prev_fix(curr_fix):
-            """Computes the previous fix to be used in bearing rate change."""
-            prev_fix = None
-            for i in range(curr_fix - 1, 0, -1):
-                time_dist = math.fabs(self.fixes[curr_fix].timestamp -
-                                      self.fixes[i].timestamp)
-                if (time_dist >
-                        self._config.min_time_for_bearing_change - 1e-7):
-                    prev_fix = i
-                    break
-            return prev_fix
-
-        for curr_fix in range(len(self.fixes)):
-            prev_fix = find_prev_fix(curr_fix)
-
-            if prev_fix is None:
-                self.fixes[curr_fix].bearing_change_rate = 0.0
-            else:
-                bearing_change = (self.fixes[prev_fix].bearing -
-                                  self.fixes[curr_fix].bearing)
-                if math.fabs(bearing_change) > 180.0:
-                    if bearing_change < 0.0:
-                        bearing_change += 360.0
-                    else:
-                        bearing_change -= 360.0
-                time_change = (self.fixes[prev_fix].timestamp -
-                               self.fixes[curr_fix].timestamp)
-                change_rate = bearing_change/time_change
-                self.fixes[curr_fix].bearing_change_rate = change_rate
+        arrays = self.fix_arrays
+        prev = self._prev_fixes_for_bearing_change()
+        change_rate = np.zeros(len(arrays))
+        found = prev >= 0
+        curr_fix = np.nonzero(found)[0]
+        prev_fix = prev[found]
+        bearing_change = arrays.bearing[prev_fix] - arrays.bearing[curr_fix]
+        bearing_change[bearing_change < -180.0] += 360.0
+        bearing_change[bearing_change > 180.0] -= 360.0
+        time_change = arrays.timestamp[prev_fix] - arrays.timestamp[curr_fix]
+        change_rate[found] = bearing_change / time_change
+        arrays.bearing_change_rate = change_rate
+        for fix, rate in zip(self.fixes, change_rate.tolist()):
+            fix.bearing_change_rate = rate
 
     def _circling_emissions(self):
         """Generates raw circling/straight emissions from bearing change.
@@ -1102,16 +1276,12 @@ class Flight:
         Staight flight is encoded as 0, circling is encoded as 1. Exported
         to a separate function to be used in Baum-Welch parameters learning.
         """
-        emissions = []
-        for fix in self.fixes:
-            bearing_change = math.fabs(fix.bearing_change_rate)
-            bearing_change_enough = (
-                bearing_change > self._config.min_bearing_change_circling)
-            if fix.flying and bearing_change_enough:
-                emissions.append(1)
-            else:
-                emissions.append(0)
-        return emissions
+        bearing_change_enough = (
+            np.abs(self.fix_arrays.bearing_change_rate) >
+            self._config.min_bearing_change_circling)
+        flying = np.fromiter((fix.flying for fix in self.fixes), dtype=bool,
+                             count=len(self.fixes))
+        return (flying & bearing_change_enough).astype(int).tolist()
 
     def _compute_circling(self):
         """Adds .circling to self.fixes."""
@@ -1152,7 +1322,8 @@ class Flight:
         first_glide_fix = None
         last_glide_fix = None
         distance = 0.0
-        for fix in flight_fixes:
+        step_dist = self.fix_arrays.step_dist.tolist()
+        for index, fix in enumerate(flight_fixes, takeoff_index):
             if not circling_now and fix.circling:
                 # Just started circling
                 circling_now = True
@@ -1172,7 +1343,8 @@ class Flight:
                     gliding_now = False
 
             if gliding_now:
-                distance = distance + fix.distance_to(last_glide_fix)
+                # distance from last_glide_fix, i.e. the previous fix
+                distance = distance + step_dist[index]
                 last_glide_fix = fix
             else:
                 # just started gliding
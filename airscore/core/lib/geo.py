@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 EARTH_RADIUS_KM = 6371.0
 
 
@@ -66,6 +68,34 @@ def bearing_to(lat1, lon1, lat2, lon2):
     return math.degrees(math.atan2(y, x))
 
 
+def earth_distances(lat1, lon1, lat2, lon2):
+    """Vectorised version of earth_distance.
+
+    Input angles are numpy arrays (or scalars broadcastable to them) in
+    degrees, WGS-84. Output is a numpy array of distances in kilometers.
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = (np.sin(dlat/2)**2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2)
+    return EARTH_RADIUS_KM * 2.0 * np.arcsin(np.sqrt(a))
+
+
+def bearings_to(lat1, lon1, lat2, lon2):
+    """Vectorised version of bearing_to.
+
+    Input angles are numpy arrays (or scalars broadcastable to them) in
+    degrees. Output is a numpy array of bearings in degrees (north = 0.0).
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+    dLon = lon2 - lon1
+    y = np.sin(dLon) * np.cos(lat2)
+    x = (np.cos(lat1) * np.sin(lat2) -
+         np.sin(lat1) * np.cos(lat2) * np.cos(dLon))
+    return np.degrees(np.arctan2(y, x))
+
+
 def sphere_angle(lat1, lon1, lat, lon, lat2, lon2):
     """Computes the angle on a sphere given three points.
 
@@ -1,6 +1,8 @@
 import math
 import unittest
 
+import numpy as np
+
 import lib.geo as geo
 
 
@@ -172,3 +174,25 @@ class TestSphereAngle(unittest.TestCase):
                 lat=51.507222, lon=-0.1275,
                 lat2=48.856667, lon2=2.350833),
             46.704, places=3)
+
+
+class TestVectorised(unittest.TestCase):
+
+    def testSameAsScalar(self):
+        lat1 = [45.0, 0.0, 50.85, -33.2]
+        lon1 = [10.0, 0.0, 4.35, 151.1]
+        lat2 = [20.0, 90.0, 51.507222, -33.21]
+        lon2 = [15.0, 0.0, -0.1275, 151.12]
+        distances = geo.earth_distances(
+            np.array(lat1), np.array(lon1), np.array(lat2), np.array(lon2))
+        bearings = geo.bearings_to(
+            np.array(lat1), np.array(lon1), np.array(lat2), np.array(lon2))
+        for i in range(len(lat1)):
+            self.assertAlmostEqual(
+                distances[i],
+                geo.earth_distance(lat1[i], lon1[i], lat2[i], lon2[i]),
+                places=9)
+            self.assertAlmostEqual(
+                bearings[i],
+                geo.bearing_to(lat1[i], lon1[i], lat2[i], lon2[i]),
+                places=9)
@@ -1,3 +1,5 @@
+import math
+import random
 import unittest
 
 import lib.viterbi as viterbi
@@ -50,3 +52,41 @@ class TestSimpleViterbiDecoder(unittest.TestCase):
         data = [1, 0, 1, 1, 0, 0, 1, 1, 1]
         expected_result = [1, 1, 1, 1, 1, 1, 1, 1, 1]
         self.assertDecode(data, expected_result)
+
+    def testDecodeMany(self):
+        data = [[1, 0, 0, 0, 1, 1, 0, 0, 0], [], [1, 0, 1, 1, 0, 0, 1, 1, 1]]
+        expected_result = [[0] * 9, [], [1] * 9]
+        self.assertListEqual(self.decoder.decode_many(data), expected_result)
+
+    def testMatchesStepByStepDecode(self):
+        random.seed(0)
+        for emission_probs in (self.emission_probs, [[0.942, 0.058], [0.093, 0.907]]):
+            for transition_probs in (self.transition_probs, [[0.9995, 0.0005], [0.0005, 0.9995]]):
+                for p in (0.05, 0.5, 0.95):
+                    data = [int(random.random() < p) for _ in range(3000)]
+                    decoder = viterbi.SimpleViterbiDecoder(self.init_probs, transition_probs, emission_probs)
+                    expected = step_by_step_decode(self.init_probs, transition_probs, emission_probs, data)
+                    self.assertListEqual(decoder.decode(data), expected)
+
+
+def step_by_step_decode(init_probs, transition_probs, emission_probs, emissions):
+    """reference Viterbi decoder, one step at a time"""
+    init_log = [math.log(x) for x in init_probs]
+    transition_log = [[math.log(x) for x in xs] for xs in transition_probs]
+    emission_log = [[math.log(x) for x in xs] for xs in emission_probs]
+    state_log = [[init_log[0] + emission_log[0][emissions[0]], init_log[1] + emission_log[1][emissions[0]]]]
+    backtrack_info = [None]
+    for i in range(1, len(emissions)):
+        state_log.append([None, None])
+        backtrack_info.append([None, None])
+        for target in [0, 1]:
+            from_0 = state_log[i - 1][0] + transition_log[0][target]
+            from_1 = state_log[i - 1][1] + transition_log[1][target]
+            backtrack_info[i][target] = 0 if from_0 > from_1 else 1
+            state_log[i][target] = max(from_0, from_1) + emission_log[target][emissions[i]]
+    state = 0 if state_log[-1][0] > state_log[-1][1] else 1
+    states = [state]
+    for i in range(len(emissions) - 1, 0, -1):
+        state = backtrack_info[i][state]
+        states.append(state)
+    return states[::-1]
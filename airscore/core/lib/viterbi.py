@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 class SimpleViterbiDecoder(object):
     """A simple Viterbi algorightm implementation.
@@ -8,6 +10,13 @@ class SimpleViterbiDecoder(object):
     states and the emissions are represented by 0 and 1.
     """
 
+    # After _MIN_REPEATED steps with the same transitions, next steps are
+    # guessed to follow them and computed at once, starting with _MIN_BLOCK
+    # steps. Block size doubles while the guess holds.
+    _MIN_REPEATED = 8
+    _MIN_BLOCK = 64
+    _MAX_BLOCK = 8192
+
     def __init__(self, init_probs, transition_probs, emission_probs):
         """Initializer for the class.
 
@@ -32,53 +41,152 @@ class SimpleViterbiDecoder(object):
     def decode(self, emissions):
         """Run the Viterbi decoder.
 
+        State log-probabilities are kept in preallocated arrays. Runs of
+        steps that follow the same transitions are computed at once with
+        numpy, with the same sequence of floating point operations of the
+        step by step algorithm, so the result is exactly the same.
+
         Args:
             emissions: a list of {0, 1} - the observed emissions
 
         Returns:
             a list of {0, 1} - the most likely sequence of hidden states
         """
-        if not emissions:
+        if len(emissions) == 0:
             # Edge case, handle empty list here, to simplify the algorithm
             return []
 
+        emissions = np.asarray(emissions, dtype=bool)
         N = len(emissions)
-        state_log = [[None, None] for i in range(N)]
-        backtrack_info = [[None, None] for i in range(N)]
+        t00, t01 = self._transition_log[0]
+        t10, t11 = self._transition_log[1]
+        # emission log-probability of each step, for each target state
+        e0 = np.where(emissions, self._emission_log[0][1], self._emission_log[0][0])
+        e1 = np.where(emissions, self._emission_log[1][1], self._emission_log[1][0])
 
-        # Forward pass, calculate the probabilities of states and the
-        # back-tracking information.
+        e0_list = e0.tolist()
+        e1_list = e1.tolist()
+        back0 = bytearray(N)
+        back1 = bytearray(N)
 
         # The initial state probability estimates are treated separately
         # because these come from the initial distribution.
-        state_log[0] = self._init_log
-        state_log[0][0] += self._emission_log[0][emissions[0]]
-        state_log[0][1] += self._emission_log[1][emissions[0]]
-
-        # Successive state probability estimates are calculated using
-        # the log-probabilities in the transition matrix.
-        for i in range(1, N):
-            for target in [0, 1]:
-                from_0 = state_log[i - 1][0] + self._transition_log[0][target]
-                from_1 = state_log[i - 1][1] + self._transition_log[1][target]
-                emission_log = self._emission_log[target][emissions[i]]
-                if from_0 > from_1:
-                    backtrack_info[i][target] = 0
-                    state_log[i][target] = from_0 + emission_log
-                else:
-                    backtrack_info[i][target] = 1
-                    state_log[i][target] = from_1 + emission_log
+        # (initial log-probabilities are updated in place, as they always were)
+        self._init_log[0] += self._emission_log[0][int(emissions[0])]
+        self._init_log[1] += self._emission_log[1][int(emissions[0])]
+        state_0, state_1 = self._init_log
+
+        # Forward pass, calculate the probabilities of states and the
+        # back-tracking information.
+        block = self._MIN_BLOCK
+        transitions = None
+        repeated = 0
+        i = 1
+        while i < N:
+            from_0 = state_0 + t00
+            from_1 = state_1 + t10
+            if from_0 > from_1:
+                back_0, next_0 = 0, from_0 + e0_list[i]
+            else:
+                back_0, next_0 = 1, from_1 + e0_list[i]
+            from_0 = state_0 + t01
+            from_1 = state_1 + t11
+            if from_0 > from_1:
+                back_1, next_1 = 0, from_0 + e1_list[i]
+            else:
+                back_1, next_1 = 1, from_1 + e1_list[i]
+            back0[i], back1[i] = back_0, back_1
+            state_0, state_1 = next_0, next_1
+            i += 1
+            if (back_0, back_1) == transitions:
+                repeated += 1
+            else:
+                transitions, repeated = (back_0, back_1), 1
+            if repeated < self._MIN_REPEATED or i == N or transitions == (1, 0):
+                continue
+
+            # guess next steps follow the same transitions, then keep the
+            # steps until the first one where the guess is wrong
+            end = min(N, i + block)
+            size = end - i
+            if back_0 == 0:
+                new_0 = _chain(state_0, t00, e0[i:end])
+            if back_1 == 1:
+                new_1 = _chain(state_1, t11, e1[i:end])
+            if back_0 == 1:
+                new_0 = (np.concatenate(([state_1], new_1[:-1])) + t10) + e0[i:end]
+            if back_1 == 0:
+                new_1 = (np.concatenate(([state_0], new_0[:-1])) + t01) + e1[i:end]
+            prev_0 = np.concatenate(([state_0], new_0[:-1]))
+            prev_1 = np.concatenate(([state_1], new_1[:-1]))
+            good = ((prev_0 + t00 > prev_1 + t10) == (back_0 == 0)) & ((prev_0 + t01 > prev_1 + t11) == (back_1 == 0))
+            kept = size if good.all() else int(np.argmin(good))
+            if kept:
+                state_0, state_1 = float(new_0[kept - 1]), float(new_1[kept - 1])
+                back0[i:i + kept] = bytes([back_0]) * kept
+                back1[i:i + kept] = bytes([back_1]) * kept
+                i += kept
+            if kept == size:
+                block = min(block * 2, self._MAX_BLOCK)
+            else:
+                block, repeated = self._MIN_BLOCK, 0
 
         # Backward pass, find the most likely sequence of states.
-        if state_log[N - 1][0] > state_log[N - 1][1]:
+        if state_0 > state_1:
             state = 0
         else:
             state = 1
 
-        states = [state]
-        for i in range(N - 1, 0, -1):
-            state = backtrack_info[i][state]
-            states.append(state)
-        states.reverse()
+        back0 = np.frombuffer(back0, dtype=np.int8)
+        back1 = np.frombuffer(back1, dtype=np.int8)
+        return _backtrack(back0, back1, state).tolist()
+
+    def decode_many(self, emissions_list):
+        """Run the Viterbi decoder on many emissions lists.
 
-        return states
+        Lists are decoded in order, as the decoder initial log-probabilities
+        are updated by each decoding.
+
+        Args:
+            emissions_list: a list of lists of {0, 1} - the observed emissions
+
+        Returns:
+            a list of lists of {0, 1} - the most likely sequences of hidden states
+        """
+        return [self.decode(emissions) for emissions in emissions_list]
+
+
+def _chain(start, transition_log, emission_logs):
+    """State log-probabilities following the same transition at each step.
+    Values are accumulated in order, adding transition and then emission
+    log-probability at each step, as the step by step algorithm does."""
+    steps = np.empty(2 * len(emission_logs))
+    steps[0::2] = transition_log
+    steps[1::2] = emission_logs
+    steps[0] += start
+    return np.add.accumulate(steps)[1::2]
+
+
+def _backtrack(back0, back1, state):
+    """Most likely sequence of states from back-tracking information.
+    Steps where both states come from the same state fix the previous state,
+    between them states are kept or swapped, so the sequence is computed
+    without going back one step at a time."""
+    N = len(back0)
+    index = np.arange(N)
+    fixed = back0 == back1
+    swap = (back0 == 1) & (back1 == 0)
+    fixed[0] = swap[0] = False
+    swaps = np.cumsum(swap)
+    # for each step, the first following step that fixes the state
+    next_fixed = np.minimum.accumulate(np.where(fixed, index, N)[::-1])[::-1]
+    states = np.empty(N, dtype=np.int8)
+    states[N - 1] = state
+    j = index[:-1]
+    r = next_fixed[1:]
+    has_fixed = r < N
+    r_safe = np.where(has_fixed, r, N - 1)
+    base = np.where(has_fixed, back0[r_safe], state)
+    parity = np.where(has_fixed, swaps[r_safe - 1], swaps[N - 1]) - swaps[j]
+    states[:-1] = base ^ (parity & 1)
+    return states
@@ -29,7 +29,7 @@ from pilot.flightresult import FlightResult
 from pilot.notification import Notification
 from pilot.waypointachieved import WaypointAchieved
 from trackUtils import create_igc_filename, igc_parsing_config_from_yaml
-from pilot.track import GNSSFix
+from igc_lib import GNSSFix
 from calcUtils import igc_coords, sec_to_time, sec_to_string, epoch_to_string
 from task import Task
 
@@ -41,6 +41,83 @@ config.time_after_deadline = 180  # (sec) time after deadline at which livetrack
 config.min_distance = 100  # meters max distance from launch not to be considered airborne if fast enough
 config.min_alt_difference = 50  # meters min altitude difference not to be considered landed
 
+'''parameters for livetracking cycle'''
+CYCLE_BUDGET = 0.8  # part of interval after which no more pilot checks are started in the cycle
+CYCLE_WORKERS = 8  # max number of pilots checked concurrently
+REQUEST_TIMEOUT = (5, 20)  # (sec) connect and read timeout of requests to Livetracking server
+
+_session = None
+
+
+def get_session():
+    """returns requests Session used for Livetracking server requests, keeping connections between cycles"""
+    global _session
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    if _session is None:
+        _session = requests.Session()
+        _session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=CYCLE_WORKERS, max_retries=1))
+        _session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=CYCLE_WORKERS, max_retries=1))
+    return _session
+
+
+class CycleTimer:
+    """Keeps time of livetracking cycle stages, against the time budget of the cycle"""
+    def __init__(self, budget: float):
+        self.budget = budget  # seconds
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.stages = {}  # {stage: seconds}
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    @property
+    def remaining(self) -> float:
+        return self.budget - self.elapsed
+
+    def lap(self, stage: str):
+        """saves time from previous stage"""
+        now = time.perf_counter()
+        self.stages[stage] = round(now - self.last, 3)
+        self.last = now
+
+
+async def run_concurrently(items: list, func, timer: CycleTimer, executor, workers: int = CYCLE_WORKERS):
+    """Runs func on each item in executor, with max workers calls at the same time.
+    Items whose call did not start before timer budget is over are not processed.
+    Returns list of func results, in items order (None for items not processed), and list of items not processed"""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(workers)
+    deferred = []
+
+    async def process(item):
+        async with semaphore:
+            if timer.remaining <= 0:
+                deferred.append(item)
+                return None
+            return await loop.run_in_executor(executor, func, item)
+
+    results = await asyncio.gather(*(process(item) for item in items))
+    deferred = {id(el) for el in deferred}
+    return list(results), [item for item in items if id(item) in deferred]
+
+
+def _init_live_worker(task, airspace):
+    """stores task and airspace in the worker process, so they are pickled only once per worker"""
+    global _worker_task, _worker_airspace
+    _worker_task, _worker_airspace = task, airspace
+
+
+def _check_live_pilot(p):
+    """Checks new fixes of a pilot in a worker process. Returns the updated pilot result"""
+    check_livetrack(result=p, task=_worker_task, airspace=_worker_airspace)
+    return p
+
 
 class LiveFix(GNSSFix):
     """GNSSFix from igc_lib, a little easier to initialise, adding alt attribute as gps alt if not specified"""
@@ -67,6 +144,7 @@ class LiveResult(FlightResult):
 
         p = LiveResult()
         p.as_dict().update(d)
+        FlightResult.results_changed()
         p.waypoints_achieved = [WaypointAchieved.from_dict(d) for d in p.waypoints_achieved]
         p.notifications = [Notification.from_dict(d) for d in p.notifications]
         if isinstance(p.suspect_landing_fix, dict):
@@ -77,6 +155,7 @@ class LiveResult(FlightResult):
         """ creates a LiveResult obj. from result dict in Livetracking json file"""
 
         self.as_dict().update(d)
+        FlightResult.results_changed()
         self.waypoints_achieved = [WaypointAchieved.from_dict(d) for d in self.waypoints_achieved]
         self.notifications = [Notification.from_dict(d) for d in self.notifications]
         if isinstance(self.suspect_landing_fix, dict):
@@ -555,11 +634,27 @@ class LiveTracking(object):
             - creates pilots FlightResult Objects according to json results
             - retrieves track fixes from Livetracking server for pilots still flying
             - checks tracks
-            - updates results in json file"""
-
-        from frontendUtils import track_result_output
+            - updates results in json file
+        Cycle runs on an asyncio loop, see run_cycle"""
+        import asyncio
+
+        return asyncio.run(self.run_cycle(interval))
+
+    async def run_cycle(self, interval: int = 60):
+        """Livetracking cycle.
+        Tracks are requested to Livetracking server with a pooled session and timeouts, and pilots are checked
+        concurrently in a pool of worker processes, as check is CPU bound. Track files and database are updated
+        in main process. Checks that did not start within the cycle time budget are deferred to next cycle:
+        pilot fixes are not consumed, so they will be requested again.
+        Time of each stage is saved in file_stats."""
+        import asyncio
+        from concurrent.futures import ProcessPoolExecutor
+        from functools import partial
         from result import open_json_file
 
+        timer = CycleTimer(interval * CYCLE_BUDGET)
+        loop = asyncio.get_running_loop()
+
         '''read results from json file'''
         self.result = open_json_file(self.filename)
         self.init_timestamp = self.result['file_stats'].get('init_timestamp')
@@ -572,41 +667,99 @@ class LiveTracking(object):
             self.update_result_status()
             print(f"RUN, from read")
             print(f"Flying pilots: {len(self.flying_pilots)}")
+            data = {el['par_id']: el for el in self.result['data']}
             for p in self.flying_pilots:
-                d = next(el for el in self.result['data'] if el['par_id'] == p.par_id)
-                p.update_from_result(d)
+                p.update_from_result(data[p.par_id])
                 print(f"RUN, from json")
                 print(f"{p.name} (live {p.live_id}: first {p.first_time}, last (next live request time) {p.last_time}, landing {p.landing_time}")
+            timer.lap('read')
 
             cycle_starting_time = self.now
             print(f"cycle starting time: {epoch_to_string(self.now, self.task.time_offset)}")  # Local Time
-            response = get_livetracks(self.task, self.flying_pilots, cycle_starting_time, interval)
+            try:
+                response = await asyncio.wait_for(
+                    loop.run_in_executor(
+                        None,
+                        partial(
+                            get_livetracks,
+                            self.task,
+                            self.flying_pilots,
+                            cycle_starting_time,
+                            interval,
+                            session=get_session(),
+                            timeout=REQUEST_TIMEOUT,
+                        ),
+                    ),
+                    timeout=max(timer.remaining, 1),
+                )
+            except asyncio.TimeoutError:
+                print(f'{self.now}: -- Livetracking server request timed out')
+                response = None
+            timer.lap('fetch')
             if not response:
                 print(f'{self.now}: -- NO RESPONSE or NO NEW FIXES ...')
             else:
                 print(f'{self.now}: -- Associating livetracks ...')
-                associate_livetracks(self.task, self.flying_pilots, response, cycle_starting_time)
+                associate_livetracks(self.task, self.flying_pilots, response, cycle_starting_time, update_file=False)
+                to_check = self.flying_pilots_with_new_fixes
+                checking = {p.par_id for p in to_check}
+                for p in self.flying_pilots:
+                    if p.livetrack and p.par_id not in checking:
+                        update_livetrack_file(p, p.livetrack, self.task.file_path)
+                timer.lap('associate')
                 print(f'{self.now}: -- Checking tracks ...')
 
-                for p in self.flying_pilots_with_new_fixes:
-                    print(f"* {p.name}: getting to live check")
-                    check_livetrack(result=p, task=self.task, airspace=self.airspace)
-                    print(f"after check_livetrack in run")
-                    print(f"{p.name} first_time: {p.first_time}, last_time: {p.last_time}, live comment: {p.live_comment}")
-                    if (p.landing_time or p.goal_time) and not p.track_id:
-                        '''pilot landed or made goal, save track result'''
-                        print(f"{p.name} before track saving: {p.result_type}, live comment: {p.live_comment}")
-                        save_livetrack_result(p, self.task, self.airspace)
-                        valid_results.append(track_result_output(p, self.task.task_id))
-                        print(f"{p.name}: Track saved: track_id: {p.track_id}")
-                        print(f"result_type: {p.result_type}, live comment: {p.live_comment}")
-                        p.live_comment = 'landed'
-                    self.update_pilot_result(p)
-
+                checked, deferred = [], []
+                if to_check:
+                    with ProcessPoolExecutor(
+                        max_workers=min(CYCLE_WORKERS, len(to_check)),
+                        initializer=_init_live_worker,
+                        initargs=(self.task, self.airspace),
+                    ) as executor:
+                        checked, deferred = await run_concurrently(to_check, _check_live_pilot, timer, executor)
+                for p, result in zip(to_check, checked):
+                    if result is not None:
+                        output = self.check_pilot(p, result)
+                        if output:
+                            valid_results.append(output)
+                for p in deferred:
+                    print(f"{p.name}: check deferred to next cycle")
+                    p.livetrack = []
+                    checking.discard(p.par_id)
+                for p in to_check:
+                    if p.par_id in checking:
+                        self.update_pilot_result(p)
+                timer.lap('check')
+
+                self.result['file_stats']['cycle_timing'] = dict(timer.stages)
                 self.create_json_file()
+                timer.lap('write')
+            print(f"cycle timing: {timer.stages}, total {timer.elapsed:.3f} s, budget {timer.budget:.3f} s")
             Logger('OFF')
         return valid_results
 
+    def check_pilot(self, p: LiveResult, result: LiveResult):
+        """Updates pilot with result checked in worker process, appends new fixes to pilot track file,
+        and saves track result if pilot landed.
+        Returns track result output if track has been saved."""
+        from frontendUtils import track_result_output
+
+        print(f"* {p.name}: getting to live check")
+        p.__dict__.update(result.__dict__)
+        update_livetrack_file(p, p.livetrack, self.task.file_path)
+        print(f"after check_livetrack in run")
+        print(f"{p.name} first_time: {p.first_time}, last_time: {p.last_time}, live comment: {p.live_comment}")
+        if (p.landing_time or p.goal_time) and not p.track_id:
+            '''pilot landed or made goal, save track result'''
+            print(f"{p.name} before track saving: {p.result_type}, live comment: {p.live_comment}")
+            save_livetrack_result(p, self.task, self.airspace)
+            output = track_result_output(p, self.task.task_id)
+            print(f"{p.name}: Track saved: track_id: {p.track_id}")
+            print(f"result_type: {p.result_type}, live comment: {p.live_comment}")
+            p.live_comment = 'landed'
+            return output
+        return None
+
     def finalise(self):
         """closes Livetracking service:
         - changes status in json file
@@ -619,9 +772,11 @@ class LiveTracking(object):
             save_livetrack_result(p, self.task, self.airspace)
 
 
-def get_livetracks(task: Task, pilots: list, timestamp, interval):
+def get_livetracks(task: Task, pilots: list, timestamp, interval, session=None, timeout=None):
     """Requests live tracks fixes to Livetracking Server
-    Flymaster gives back chunks of 100 fixes for each live_id"""
+    Flymaster gives back chunks of 100 fixes for each live_id
+    session:    (opt.) requests Session, to reuse connections between cycles
+    timeout:    (opt.) requests timeout, (connect, read) in seconds"""
     import jsonpickle
     import requests
     from Defines import FM_LIVE
@@ -642,7 +797,7 @@ def get_livetracks(task: Task, pilots: list, timestamp, interval):
         url = FM_LIVE + str(jsonpickle.encode(request))
         if request:
             try:
-                response = requests.get(url)
+                response = (session or requests).get(url, timeout=timeout)
                 response.raise_for_status()
                 return response.json()
             except HTTPError as http_err:
@@ -651,7 +806,7 @@ def get_livetracks(task: Task, pilots: list, timestamp, interval):
                 print(f'Error trying to get tracks: {err}')
 
 
-def associate_livetracks(task: LiveTask, pilots: list, response, timestamp):
+def associate_livetracks(task: LiveTask, pilots: list, response, timestamp, update_file: bool = True):
     """ Flymaster Livetracking fix info:
         dict
         d  - timestamp, epoc
@@ -660,7 +815,8 @@ def associate_livetracks(task: LiveTask, pilots: list, response, timestamp):
         h  - gnss alt, m
         s  - ground alt, m
         ai - lat, deg * 60000
-        oi - lon, deg * 60000 """
+        oi - lon, deg * 60000
+    update_file: if False, new fixes are not appended to pilots track files """
     import time
 
     '''initialise'''
@@ -708,7 +864,7 @@ def associate_livetracks(task: LiveTask, pilots: list, response, timestamp):
             flight.append(LiveFix(t, lat, lon, baro_alt, gnss_alt, alt, height, s, idx))
         pil.livetrack = flight
         print(f"{pil.name}: livetrack fixes: {len(pil.livetrack)}")
-        if pil.livetrack:
+        if pil.livetrack and update_file:
             print(f"{pil.name}: updating livetrack file")
             update_livetrack_file(pil, flight, task.file_path)
 
@@ -1,3 +1,6 @@
+TRACK_LOD_TOLERANCES = (1000, 200, 50, 10)  # meters, tracklog level of detail pyramid, coarsest first
+
+
 def checkbbox(lat, lon, bbox):
     if lat < bbox[0][0]:
         bbox[0][0] = lat
@@ -212,16 +215,60 @@ def get_other_tracks(taskid, pilot_parid):
     return tracks
 
 
-def result_to_geojson(result, task, flight, second_interval=5):
+def decimated_fixes(rawtimes: list, second_interval: int, event_times: set) -> list:
+    """returns indexes of fixes to keep in map tracklog: one fix every second_interval seconds,
+    and fixes whose time is in event_times (turnpoints achieved, infringements)"""
+    keep = []
+    last = rawtimes[0]
+    for idx, rawtime in enumerate(rawtimes):
+        if rawtime >= last + second_interval or rawtime in event_times:
+            keep.append(idx)
+            last = rawtime
+    return keep
+
+
+def simplified_fixes(lats, lons, tolerance: float, rawtimes: list, event_times: set) -> list:
+    """returns indexes of fixes to keep in map tracklog using Douglas-Peucker simplification:
+    fixes farther than tolerance (meters) from the simplified line, and fixes whose time is in event_times.
+    lats, lons: numpy arrays of fixes coordinates"""
+    import numpy as np
+
+    '''local equirectangular coordinates in meters are precise enough for simplification'''
+    y = (lats - lats[0]) * 111195.0
+    x = (lons - lons[0]) * 111195.0 * np.cos(np.radians(lats.mean()))
+    keep = np.zeros(len(lats), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(lats) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        px, py = x[first + 1 : last] - x[first], y[first + 1 : last] - y[first]
+        length = np.hypot(dx, dy)
+        dist = np.abs(dx * py - dy * px) / length if length else np.hypot(px, py)
+        idx = int(np.argmax(dist))
+        if dist[idx] > tolerance:
+            idx += first + 1
+            keep[idx] = True
+            stack.extend(((first, idx), (idx, last)))
+    keep |= np.fromiter((t in event_times for t in rawtimes), dtype=bool, count=len(rawtimes))
+    return np.flatnonzero(keep).tolist()
+
+
+def result_to_geojson(result, task, flight, second_interval=5, tolerance=None):
     """Dumps the flight to geojson format used for mapping.
     Contains tracklog split into pre SSS, pre Goal and post goal parts, thermals, takeoff/landing,
     result object, waypoints achieved, and bounds
     second_interval = resolution of tracklog. default one point every 5 seconds. regardless it will
                         keep points where waypoints were achieved.
+    tolerance = if set, tracklog is simplified with Douglas-Peucker algorithm instead, tolerance in meters.
     returns the Json string."""
 
     from collections import namedtuple
 
+    import numpy as np
+
     from geojson import Feature, FeatureCollection, MultiLineString, Point
     from route import distance, rawtime_float_to_hms
 
@@ -231,11 +278,9 @@ def result_to_geojson(result, task, flight, second_interval=5):
     infringements = []
     point = namedtuple('fix', 'lat lon')
 
-    min_lat = flight.fixes[0].lat
-    min_lon = flight.fixes[0].lon
-    max_lat = flight.fixes[0].lat
-    max_lon = flight.fixes[0].lon
-    bbox = [[min_lat, min_lon], [max_lat, max_lon]]
+    lats = np.fromiter((fix.lat for fix in flight.fixes), dtype=float, count=len(flight.fixes))
+    lons = np.fromiter((fix.lon for fix in flight.fixes), dtype=float, count=len(flight.fixes))
+    bbox = [[float(lats.min()), float(lons.min())], [float(lats.max()), float(lons.max())]]
 
     takeoff = Point((flight.takeoff_fix.lon, flight.takeoff_fix.lat))
     takeoff_landing.append(Feature(geometry=takeoff, properties={"TakeOff": "TakeOff"}))
@@ -290,31 +335,29 @@ def result_to_geojson(result, task, flight, second_interval=5):
                 achieved.extend([0, "0:00:00", '-'])
             waypoints_achieved.append(achieved)
 
-    lastfix = flight.fixes[0]
-    for fix in flight.fixes:
-        bbox = checkbbox(fix.lat, fix.lon, bbox)
-        keep = False
-        if (
-            fix.rawtime >= lastfix.rawtime + second_interval
-            or any(tp for tp in result.waypoints_achieved if tp.rawtime == fix.rawtime)
-            or any(tp for tp in result.infringements if int(tp['rawtime']) == fix.rawtime)
-        ):
-            '''keep fixes that validate a turnpoint or cause an infringement'''
-            ###
-            # print(f'rawtime: {fix.rawtime}')
-            keep = True
-            lastfix = fix
-
-        if keep and fix.rawtime:
+    '''keep fixes that validate a turnpoint or cause an infringement'''
+    event_times = {tp.rawtime for tp in result.waypoints_achieved}
+    event_times.update(int(tp['rawtime']) for tp in result.infringements)
+    rawtimes = [fix.rawtime for fix in flight.fixes]
+    if tolerance:
+        keep = simplified_fixes(lats, lons, tolerance, rawtimes, event_times)
+    else:
+        keep = decimated_fixes(rawtimes, second_interval, event_times)
+
+    for idx in keep:
+        fix = flight.fixes[idx]
+        if fix.rawtime:
+            '''coordinates rounded to 6 decimals (about 0.1 m), altitudes to meters'''
+            coords = (round(fix.lon, 6), round(fix.lat, 6), round(fix.gnss_alt), round(fix.press_alt))
             if fix.rawtime <= SSS_time:
-                pre_sss.append((fix.lon, fix.lat, fix.gnss_alt, fix.press_alt))
+                pre_sss.append(coords)
             if SSS_time <= fix.rawtime <= goal_time:
-                pre_goal.append((fix.lon, fix.lat, fix.gnss_alt, fix.press_alt))
+                pre_goal.append(coords)
                 if len(pre_goal) == 1:
                     '''adding fix to pre_sss to link polylines'''
                     pre_sss.append(pre_goal[0])
             if fix.rawtime >= goal_time:
-                post_goal.append((fix.lon, fix.lat, fix.gnss_alt, fix.press_alt))
+                post_goal.append(coords)
                 if len(post_goal) == 1:
                     '''adding fix to pre_goal to link polylines'''
                     pre_goal.append(post_goal[0])
@@ -348,6 +391,125 @@ def result_to_geojson(result, task, flight, second_interval=5):
     return tracklog, thermals, takeoff_landing, bbox, waypoints_achieved, infringements
 
 
+def create_track_lod(flight, event_times: set, SSS_time: int, goal_time: int = None) -> dict:
+    """Creates the level of detail pyramid of pilot's tracklog, used to deliver track segments to map by zoom level.
+    Each level contains the track simplified with TRACK_LOD_TOLERANCES tolerance, coarsest first.
+    Fixes at event_times, where turnpoints were achieved or infringements happened, are kept in all levels."""
+    import numpy as np
+
+    fixes = [fix for fix in flight.fixes if fix.rawtime]
+    lats = np.fromiter((fix.lat for fix in fixes), dtype=float, count=len(fixes))
+    lons = np.fromiter((fix.lon for fix in fixes), dtype=float, count=len(fixes))
+    rawtimes = [fix.rawtime for fix in fixes]
+
+    levels = []
+    for tolerance in TRACK_LOD_TOLERANCES:
+        keep = simplified_fixes(lats, lons, tolerance, rawtimes, event_times)
+        levels.append(
+            {
+                'tolerance': tolerance,
+                'rawtime': [rawtimes[i] for i in keep],
+                'lat': [round(fixes[i].lat, 6) for i in keep],
+                'lon': [round(fixes[i].lon, 6) for i in keep],
+                'alt': [fixes[i].gnss_alt for i in keep],
+            }
+        )
+    return {
+        'SSS_time': SSS_time,
+        'goal_time': goal_time or None,
+        'levels': levels,
+    }
+
+
+def track_lod_segment(lod: dict, zoom: int, start: int = None, end: int = None) -> dict:
+    """Returns the part of tracklog level of detail pyramid suitable to display at map zoom level,
+    between start and end rawtimes. Fixes just outside time range are included to link segments."""
+    from bisect import bisect_left, bisect_right
+    from math import cos, radians
+
+    levels = lod['levels']
+    '''map meters per pixel at zoom level (web mercator)'''
+    lat = levels[-1]['lat'][0] if levels[-1]['lat'] else 0
+    pixel = 156543.03 * cos(radians(lat)) / 2 ** zoom
+    level = next((el for el in levels if el['tolerance'] <= pixel), levels[-1])
+    times = level['rawtime']
+    first = 0 if start is None else max(bisect_left(times, start) - 1, 0)
+    last = len(times) if end is None else min(bisect_right(times, end) + 1, len(times))
+    segment = {key: level[key][first:last] for key in ('rawtime', 'lat', 'lon', 'alt')}
+    return dict(segment, tolerance=level['tolerance'], SSS_time=lod['SSS_time'], goal_time=lod['goal_time'])
+
+
+def save_map_file(fullname, data, compression: str = None):
+    """Saves map file data as compact json, compressed as set in MAP_FILE_COMPRESSION (none, gzip, brotli).
+    Compressed files get .gz or .br suffix; other versions of the same file are removed.
+    returns the file path"""
+    import json
+    from pathlib import Path
+
+    from Defines import MAP_FILE_COMPRESSION
+
+    fullname = Path(fullname)
+    compression = compression or MAP_FILE_COMPRESSION
+    content = json.dumps(data, separators=(',', ':')).encode()
+    if compression == 'brotli':
+        try:
+            import brotli
+
+            content = brotli.compress(content)
+        except ImportError:
+            print('brotli module is not installed, using gzip')
+            compression = 'gzip'
+    if compression == 'gzip':
+        import gzip
+
+        content = gzip.compress(content)
+    suffixes = {'gzip': '.gz', 'brotli': '.br'}
+    filename = Path(str(fullname) + suffixes.get(compression, ''))
+    filename.write_bytes(content)
+    '''remove other versions of the file'''
+    for suffix in ('', *suffixes.values()):
+        other = Path(str(fullname) + suffix)
+        if other != filename and other.is_file():
+            other.unlink()
+    return filename
+
+
+def map_file_exists(fullname) -> bool:
+    """True if map file, or one of its compressed versions, exists"""
+    from pathlib import Path
+
+    return any(Path(str(fullname) + suffix).is_file() for suffix in ('', '.gz', '.br'))
+
+
+def delete_map_file(fullname):
+    """Deletes map file, and its compressed versions"""
+    from pathlib import Path
+
+    for suffix in ('', '.gz', '.br'):
+        Path(str(fullname) + suffix).unlink(missing_ok=True)
+
+
+def read_map_file(fullname):
+    """Reads map file saved with save_map_file, compressed or not"""
+    from pathlib import Path
+
+    import jsonpickle
+
+    for suffix in ('', '.gz', '.br'):
+        filename = Path(str(fullname) + suffix)
+        if filename.is_file():
+            content = filename.read_bytes()
+            if suffix == '.gz':
+                import gzip
+
+                content = gzip.decompress(content)
+            elif suffix == '.br':
+                import brotli
+
+                content = brotli.decompress(content)
+            return jsonpickle.decode(content.decode())
+
+
 def create_trackpoints_layer(file: str, offset: int = 0) -> list:
     from calcUtils import sec_to_string
     from pilot.track import Track, Path
@@ -106,18 +106,37 @@ class FlightResult(Participant):
         self.still_flying_at_deadline = False
         self.track_id = track_id
         self.track_file = track_file
+        self.fingerprint = None  # hash of track file and task parameters used to check it
 
         super().__init__(**kwargs)
 
     def __setattr__(self, attr, value):
-        property_names = [p for p in dir(FlightResult) if isinstance(getattr(FlightResult, p), property)]
+        property_names = FlightResult._property_names
         if attr in ('name', 'glider') and type(value) is str:
             self.__dict__[attr] = value.title()
         elif attr in ('nat', 'sex') and type(value) is str:
             self.__dict__[attr] = value.upper()
         elif attr not in property_names:
+            if attr in FlightResult._stats_versions and self._changes_stats(attr, value):
+                FlightResult._stats_versions[attr] += 1
             self.__dict__[attr] = value
 
+    def _changes_stats(self, attr, value) -> bool:
+        """checks if new attribute value could change task statistics"""
+        if attr not in self.__dict__:
+            return True
+        old = self.__dict__[attr]
+        if attr == 'goal_time' and not old and not value:
+            '''None and 0 both mean pilot is not in goal'''
+            return False
+        return old != value
+
+    @staticmethod
+    def results_changed():
+        """to be called when results attributes are changed without setting them, i.e. updating __dict__"""
+        for attr in FlightResult._stats_versions:
+            FlightResult._stats_versions[attr] += 1
+
     def as_dict(self):
         return self.__dict__
 
@@ -202,6 +221,7 @@ class FlightResult(Participant):
         if isinstance(participant, Participant):
             result = cls()
             result.as_dict().update(participant.as_dict())
+            FlightResult.results_changed()
             return result
 
     @staticmethod
@@ -392,7 +412,7 @@ class FlightResult(Participant):
         for attr in attr_list:
             setattr(self, attr, getattr(init, attr))
 
-    def check_flight(self, flight, task, airspace_obj=None, deadline=None, print=print):
+    def check_flight(self, flight, task, airspace_obj=None, deadline=None, print=print, series=None):
         """Checks a Flight object against the task.
         Args:
                :param flight: a Flight object
@@ -402,6 +422,7 @@ class FlightResult(Participant):
                             as deadline
                :param print: function to overide print() function. defaults to print() i.e. no override. Intended for
                              sending progress to front end
+               :param series: TrackSeries of flight, to reuse stored crossings and distances to goal
         Returns:
                 a list of GNSSFixes of when turnpoints were achieved.
         """
@@ -444,9 +465,14 @@ class FlightResult(Participant):
                 print(f'We should not create airspace here')
                 airspace_obj = AirspaceCheck.from_task(task)
 
-        check_fixes(self, flight.fixes, task, tp, lead_coeff, airspace_obj, deadline=deadline, print=print)
+        check_fixes(
+            self, flight.fixes, task, tp, lead_coeff, airspace_obj, deadline=deadline, print=print, series=series
+        )
 
         calculate_final_results(self, task, tp, lead_coeff, airspace_obj, deadline=deadline, print=print)
+        if series is not None:
+            '''Leading Coefficient series, to calculate fixed LC again without checking track'''
+            series.record_lead_coeff(lead_coeff)
 
     def to_geojson_result(self, track, task, pilot_info=None, second_interval=5):
         """Dumps the flight to geojson format used for mapping.
@@ -487,10 +513,10 @@ class FlightResult(Participant):
 
     def save_tracklog_map_file(self, task, flight=None, second_interval=5):
         """ Creates the file to be used to display pilot's track on map"""
-        import json
         from pathlib import Path
 
         from Defines import MAPOBJDIR
+        from mapUtils import delete_map_file, save_map_file
         from pilot.track import Track
 
         if self.result_type not in ('abs', 'dnf', 'mindist', 'nyp'):
@@ -512,16 +538,20 @@ class FlightResult(Participant):
             fullname = Path(res_path, filename)
             """copy file"""
             try:
-                with open(fullname, 'w') as f:
-                    json.dump(data, f)
-                return fullname
+                saved = save_map_file(fullname, data)
             except:
                 print('Error saving file:', fullname)
+                return
+            '''level of detail pyramid is created again from new tracklog when first requested'''
+            delete_map_file(Path(res_path, f'{self.par_id}.lod'))
+            return saved
 
     def save_tracklog_map_result_file(self, data, trackid, taskid):
         """save tracklog map result file in the correct folder as defined by DEFINES"""
         from pathlib import Path
 
+        from mapUtils import save_map_file
+
         res_path = Path(MAPOBJDIR, 'tracks', str(taskid))
         """check if directory already exists"""
         if not res_path.is_dir():
@@ -532,9 +562,7 @@ class FlightResult(Participant):
         filename = f'{trackid}.track'
         fullname = Path(res_path, filename)
         try:
-            with open(fullname, 'w') as f:
-                json.dump(data, f)
-            return fullname
+            return save_map_file(fullname, data)
         except:
             print('Error saving file:', fullname)
 
@@ -548,13 +576,123 @@ class FlightResult(Participant):
         return result
 
 
-def verify_all_tracks(task, lib, airspace=None, print=print):
+'''attributes are set for each fix during flight check, so property names are listed once'''
+FlightResult._property_names = frozenset(p for p in dir(FlightResult) if isinstance(getattr(FlightResult, p), property))
+'''version of each attribute used in task statistics, incremented when any result changes it'''
+FlightResult._stats_versions = dict.fromkeys(
+    (
+        'result_type',
+        'SSS_time',
+        'ESS_time',
+        'goal_time',
+        'real_start_time',
+        'first_time',
+        'landing_time',
+        'last_time',
+        'distance_flown',
+        'total_distance',
+        'still_flying_at_deadline',
+        'lead_coeff',
+        'score',
+    ),
+    0,
+)
+
+
+def load_track(task, track_file: str, config=None) -> tuple:
+    """Returns processed flight and its TrackSeries.
+    Stored series are used if they are still valid for track file, task route and IGC parsing config,
+    so IGC file is not parsed again; otherwise track file is processed and new series are created,
+    to be saved after check.
+    config: FlightParsingConfig, defaults to task IGC parsing config"""
+    from flightcheck.trackseries import TrackSeries
+    from igc_lib import FlightParsingConfig
+    from pilot.track import Track
+    from trackUtils import igc_parsing_config_from_yaml
+
+    if config is None and task.igc_config_file:
+        config = igc_parsing_config_from_yaml(task.igc_config_file)
+    series = TrackSeries.read(task, track_file, config)
+    if series is not None:
+        return series.flight(), series
+    flight = Track.process(Path(task.file_path, track_file), task, config=config or FlightParsingConfig())
+    if flight and flight.valid:
+        series = TrackSeries.from_flight(task, track_file, flight, config)
+    return flight, series
+
+
+def _init_track_worker(task, config, airspace):
+    """stores objects shared by all tracks in the worker process, so they are pickled only once per worker"""
+    global _worker_task, _worker_config, _worker_airspace
+    _worker_task, _worker_config, _worker_airspace = task, config, airspace
+
+
+def _verify_track(pilot):
+    """Checks a single pilot track in a worker process.
+    Returns the updated pilot result and the list of messages printed while checking,
+    so that parent process can forward them in task order"""
+    from trackUtils import check_flight
+
+    messages = []
+
+    def log(*args):
+        messages.append(' '.join(str(a) for a in args))
+
+    flight, series = load_track(_worker_task, pilot.track_file, config=_worker_config)
+    if flight:
+        pilot.flight_notes = flight.notes
+        if flight.valid:
+            check_flight(
+                pilot,
+                flight,
+                _worker_task,
+                airspace=_worker_airspace,
+                print=log,
+                fingerprint=pilot.fingerprint,
+                series=series,
+            )
+        else:
+            log(f'Error in parsing track: {[x for x in flight.notes]}')
+    return pilot, messages
+
+
+def track_file_hash(filename: Path) -> str:
+    import hashlib
+
+    with open(filename, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def track_fingerprint(task_hash: str, filename: Path) -> str:
+    """returns fingerprint of a track checked against task: task check hash followed by track file hash"""
+    return task_hash + track_file_hash(filename)
+
+
+def update_fixed_lc(task, pilot, config=None) -> bool:
+    """calculates fixed LC of pilot from Leading Coefficient series stored with track series.
+    Returns False if there are no series recorded with pilot fingerprint"""
+    from flightcheck.trackseries import TrackSeries
+
+    series = TrackSeries.read(task, pilot.track_file, config)
+    lc = None if series is None else series.get_lead_coeff(pilot.fingerprint)
+    if lc is None:
+        return False
+    pilot.fixed_LC = LeadCoeff.from_series(task, lc).summing
+    return True
+
+
+def verify_all_tracks(task, lib, airspace=None, print=print, workers: int = None, reuse_unchanged=False):
     """Gets in input:
     task:       Task object
-    lib:        Formula library module"""
+    lib:        Formula library module
+    workers:    number of processes used to check tracks. Defaults to Defines.TRACK_CHECK_WORKERS.
+                With more than one worker tracks are checked in parallel, results and messages are
+                merged back in pilots order, so output is the same as checking tracks one by one.
+    reuse_unchanged: if True, tracks with the same fingerprint as the stored result are not checked again,
+                stored result is loaded from database instead."""
     from pathlib import Path
     from trackUtils import igc_parsing_config_from_yaml, check_flight
-    from pilot.track import Track
+    from Defines import TRACK_CHECK_WORKERS
 
     pilots = [p for p in task.pilots if p.result_type not in ('abs', 'dnf', 'mindist') and p.track_file]
 
@@ -565,22 +703,67 @@ def verify_all_tracks(task, lib, airspace=None, print=print):
             print(f"{track}")
         return None
 
+    '''fingerprint of each track, to find tracks that did not change since last check'''
+    task_hash = task.check_hash()
+    for p in pilots:
+        p.fingerprint = track_fingerprint(task_hash, Path(task.file_path, p.track_file))
+    FlightParsingConfig = igc_parsing_config_from_yaml(task.igc_config_file)
+    if reuse_unchanged:
+        stored = {p.par_id: p for p in get_task_results(task.id, task.comp_id) if p.fingerprint}
+        unchanged = [p for p in pilots if p.par_id in stored and stored[p.par_id].fingerprint == p.fingerprint]
+        for p in unchanged:
+            p.__dict__.update(stored[p.par_id].__dict__)
+        if task.formula.formula_departure == 'leadout':
+            '''fixed LC depends on formula library, it is calculated again from stored Leading Coefficient series.
+            Tracks without series recorded with the same fingerprint are checked again'''
+            unchanged = [p for p in unchanged if update_fixed_lc(task, p, FlightParsingConfig)]
+        FlightResult.results_changed()
+        pilots = [p for p in pilots if p not in unchanged]
+        print(f'{len(unchanged)} tracks did not change since last check')
+
     print('getting tracks...')
     number_of_pilots = len(task.pilots)
-    FlightParsingConfig = igc_parsing_config_from_yaml(task.igc_config_file)
+    workers = min(workers or TRACK_CHECK_WORKERS or 1, len(pilots))
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_track_worker, initargs=(task, FlightParsingConfig, airspace)
+        ) as executor:
+            futures = {id(p): executor.submit(_verify_track, p) for p in pilots}
+            for track_number, pilot in enumerate(task.pilots, 1):
+                print(f"{track_number}/{number_of_pilots}|track_counter")
+                if id(pilot) in futures:
+                    print(f"{pilot.ID}. {pilot.name}: ({pilot.track_file})")
+                    result, messages = futures[id(pilot)].result()
+                    for message in messages:
+                        print(message)
+                    '''merge worker result into task pilot'''
+                    pilot.__dict__.update(result.__dict__)
+        FlightResult.results_changed()
+        lib.process_results(task)
+        return
 
     for track_number, pilot in enumerate(task.pilots, 1):
         print(f"{track_number}/{number_of_pilots}|track_counter")
-        if pilot.result_type not in ('abs', 'dnf', 'mindist') and pilot.track_file:
+        if pilot in pilots:
             print(f"{pilot.ID}. {pilot.name}: ({pilot.track_file})")
-            filename = Path(task.file_path, pilot.track_file)
-            '''load track file'''
-            flight = Track.process(filename, task, config=FlightParsingConfig)
+            '''load track file, or stored track series'''
+            flight, series = load_track(task, pilot.track_file, config=FlightParsingConfig)
             if flight:
                 pilot.flight_notes = flight.notes
                 if flight.valid:
                     '''check flight against task and create map'''
-                    check_flight(pilot, flight, task, airspace=airspace, print=print)
+                    check_flight(
+                        pilot,
+                        flight,
+                        task,
+                        airspace=airspace,
+                        print=print,
+                        fingerprint=pilot.fingerprint,
+                        series=series,
+                    )
                 elif flight:
                     print(f'Error in parsing track: {[x for x in flight.notes]}')
     lib.process_results(task)
@@ -588,7 +771,9 @@ def verify_all_tracks(task, lib, airspace=None, print=print):
 
 def adjust_flight_results(task, lib, airspace=None):
     """Called when multi-start or elapsed time task was stopped.
-    We need to check again and adjust results of pilots that flew more than task duration"""
+    We need to check again and adjust results of pilots that flew more than task duration.
+    Tracks are checked again from track series stored in first check, if still valid"""
+    from flightcheck.trackseries import TrackSeries
     from pilot.track import Track
     from trackUtils import check_flight
 
@@ -600,12 +785,15 @@ def adjust_flight_results(task, lib, airspace=None):
                 pilot.ESS_time and pilot.ss_time > maxtime
             ):
                 '''need to adjust pilot result'''
-                filename = Path(task.file_path, pilot.track_file)
-                '''load track file'''
-                flight = Track.process(filename, task)
+                '''load stored track series, if created with default IGC parsing config, or track file'''
+                series = TrackSeries.read(task, pilot.track_file)
+                if series is not None:
+                    flight = series.flight()
+                else:
+                    flight = Track.process(Path(task.file_path, pilot.track_file), task)
                 '''check flight against task and create map'''
                 if flight:
-                    check_flight(pilot, flight, task, airspace=airspace, print=print)
+                    check_flight(pilot, flight, task, airspace=airspace, print=print, series=series)
 
     lib.process_results(task)
 
@@ -631,6 +819,7 @@ def delete_track(trackid: int, delete_file=False):
     if track:
         if track.track_file is not None and delete_file:
             Path(get_task_fullpath(track.task_id), track.track_file).unlink(missing_ok=True)
+            Path(get_task_fullpath(track.task_id), f'{track.track_file}.series.npz').unlink(missing_ok=True)
         track.delete()
         row_deleted = True
     return row_deleted
@@ -801,6 +990,7 @@ def create_tracklog_map_file(pilot, task, flight, second_interval=5):
     returns the Json string."""
     from pathlib import Path
 
+    from Defines import MAP_TRACK_TOLERANCE
     from mapUtils import result_to_geojson
 
     '''create info'''
@@ -816,7 +1006,7 @@ def create_tracklog_map_file(pilot, task, flight, second_interval=5):
         'track_file': Path(task.file_path, pilot.track_file).as_posix(),
     }
     tracklog, thermals, takeoff_landing, bbox, waypoint_achieved, infringements = result_to_geojson(
-        pilot, task, flight, second_interval
+        pilot, task, flight, second_interval, tolerance=MAP_TRACK_TOLERANCE
     )
     data = {
         'info': info,
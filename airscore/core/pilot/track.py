@@ -10,9 +10,8 @@ and creates an object containing all info about the flight
 Antonio Golfari, Stuart Mackintosh - 2021
 """
 
-import math
-
-from igc_lib import Flight, FlightParsingConfig, GNSSFix
+import numpy as np
+from igc_lib import Flight, FlightParsingConfig, parse_igc_file
 from pathlib2 import Path
 from task import Task
 
@@ -23,45 +22,16 @@ class Track(Flight):
         super().__init__(*args, **kwargs)
 
     def _check_altitudes(self):
-        press_alt_violations_num = 0
-        gnss_alt_violations_num = 0
-        press_huge_changes_num = 0
-        gnss_huge_changes_num = 0
-        press_chgs_sum = 0.0
-        gnss_chgs_sum = 0.0
         smallint_range = 30000
-        press_out_of_range = False
-        gnss_out_of_range = False
-        for i in range(len(self.fixes) - 1):
-            press_alt_delta = math.fabs(
-                self.fixes[i+1].press_alt - self.fixes[i].press_alt)
-            gnss_alt_delta = math.fabs(
-                self.fixes[i+1].gnss_alt - self.fixes[i].gnss_alt)
-            rawtime_delta = math.fabs(
-                self.fixes[i+1].rawtime - self.fixes[i].rawtime)
-            if rawtime_delta > 0.5:
-                if (press_alt_delta / rawtime_delta >
-                        self._config.max_alt_change_rate):
-                    press_huge_changes_num += 1
-                else:
-                    press_chgs_sum += press_alt_delta
-                if (gnss_alt_delta / rawtime_delta >
-                        self._config.max_alt_change_rate):
-                    gnss_huge_changes_num += 1
-                else:
-                    gnss_chgs_sum += gnss_alt_delta
-            if abs(self.fixes[i].press_alt) > smallint_range:
-                press_out_of_range = True
-                press_alt_violations_num += 1
-            elif (self.fixes[i].press_alt > self._config.max_alt
-                    or self.fixes[i].press_alt < self._config.min_alt):
-                press_alt_violations_num += 1
-            if abs(self.fixes[i].gnss_alt) > smallint_range:
-                gnss_out_of_range = True
-                gnss_alt_violations_num += 1
-            elif (self.fixes[i].gnss_alt > self._config.max_alt or
-                    self.fixes[i].gnss_alt < self._config.min_alt):
-                gnss_alt_violations_num += 1
+        arrays = self.fix_arrays
+        press_huge_changes_num, press_chgs_sum = self._alt_changes(arrays.press_alt)
+        gnss_huge_changes_num, gnss_chgs_sum = self._alt_changes(arrays.gnss_alt)
+        press_out_of_range = bool(np.any(np.abs(arrays.press_alt[:-1]) > smallint_range))
+        gnss_out_of_range = bool(np.any(np.abs(arrays.gnss_alt[:-1]) > smallint_range))
+        press_alt_violations_num = int(np.count_nonzero(
+            self._alt_violations(arrays.press_alt) | (np.abs(arrays.press_alt[:-1]) > smallint_range)))
+        gnss_alt_violations_num = int(np.count_nonzero(
+            self._alt_violations(arrays.gnss_alt) | (np.abs(arrays.gnss_alt[:-1]) > smallint_range)))
 
         press_chgs_avg = press_chgs_sum / float(len(self.fixes) - 1)
         gnss_chgs_avg = gnss_chgs_sum / float(len(self.fixes) - 1)
@@ -135,35 +105,8 @@ class Track(Flight):
             An instance of Flight built from the supplied IGC file.
         """
 
-        fixes = []
-        a_records = []
-        i_records = []
-        h_records = []
-        abs_filename = Path(filename).expanduser().absolute()
-        with abs_filename.open('r', encoding="ISO-8859-1") as flight_file:
-            for line in flight_file:
-                line = line.replace('\n', '').replace('\r', '')
-                if not line:
-                    continue
-                if line[0] == 'A':
-                    a_records.append(line)
-                elif line[0] == 'B':
-                    fix = GNSSFix.build_from_B_record(line, index=len(fixes))
-                    if fix is not None:
-                        if fixes and math.fabs(fix.rawtime - fixes[-1].rawtime) < 1e-5:
-                            # The time did not change since the previous fix.
-                            # Ignore this fix.
-                            pass
-                        else:
-                            fixes.append(fix)
-                elif line[0] == 'I':
-                    i_records.append(line)
-                elif line[0] == 'H':
-                    h_records.append(line)
-                else:
-                    # Do not parse any other types of IGC records
-                    pass
-        return Track(fixes, a_records, h_records, i_records, config)
+        fixes, fix_arrays, a_records, h_records, i_records = parse_igc_file(filename)
+        return Track(fixes, a_records, h_records, i_records, config, fix_arrays=fix_arrays)
 
     @staticmethod
     def process(
@@ -184,40 +127,11 @@ class Track(Flight):
             An instance of Track(igc_lib Flight) built from the supplied IGC file.
         """
 
-        fixes = []
-        a_records = []
-        i_records = []
-        h_records = []
-        abs_filename = Path(filename).expanduser().absolute()
-        with abs_filename.open('r', encoding="ISO-8859-1") as flight_file:
-            for line in flight_file:
-                line = line.replace('\n', '').replace('\r', '')
-                if not line:
-                    continue
-                if line[0] == 'A':
-                    a_records.append(line)
-                elif line[0] == 'B':
-                    fix = GNSSFix.build_from_B_record(line, index=len(fixes))
-                    if fix is not None:
-                        if fixes and math.fabs(fix.rawtime - fixes[-1].rawtime) < 1e-5:
-                            # The time did not change since the previous fix.
-                            # Ignore this fix.
-                            pass
-                        elif task and not (task.window_open_time - 1 <= fix.rawtime <= task.task_deadline + 1):
-                            # We are out of task time.
-                            # Ignore this fix.
-                            pass
-                        else:
-                            fixes.append(fix)
-                elif line[0] == 'I':
-                    i_records.append(line)
-                elif line[0] == 'H':
-                    h_records.append(line)
-                else:
-                    # Do not parse any other types of IGC records
-                    pass
+        '''fixes out of task time are ignored'''
+        time_window = (task.window_open_time - 1, task.task_deadline + 1) if task else None
+        fixes, fix_arrays, a_records, h_records, i_records = parse_igc_file(filename, time_window)
         try:
-            return Track(fixes, a_records, h_records, i_records, config)
+            return Track(fixes, a_records, h_records, i_records, config, fix_arrays=fix_arrays)
         except (IndexError, AttributeError) as e:
             print(f"Error creating Track from {filename.name}: {e}")
             return None
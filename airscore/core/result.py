@@ -591,6 +591,10 @@ def publish_result(filename_or_refid, ref_id=False):
 def open_json_file(filename: str or Path):
     import jsonpickle
 
+    '''binary store is used if up to date'''
+    data = read_result_store(filename)
+    if data is not None:
+        return data
     try:
         with open(Path(RESULTDIR, filename), 'r') as f:
             return jsonpickle.decode(f.read())
@@ -617,6 +621,93 @@ def write_json_file(filename: str, content: dict):
     '''giving correct access permission'''
     os.chown(file, 1000, 1000)
 
+    '''creating binary store, with content as read from json file'''
+    write_result_store(filename, json.loads(content))
+
+
+def result_file_version(filename: str or Path) -> list or None:
+    """returns [modification time, size] of a result json file, None if file does not exist"""
+    try:
+        stat = Path(RESULTDIR, filename).stat()
+        return [stat.st_mtime_ns, stat.st_size]
+    except (TypeError, OSError):
+        return None
+
+
+def result_store_file(filename: str or Path) -> Path:
+    """returns the binary store file of a result json file"""
+    return Path(RESULTDIR, filename).with_suffix('.pkl')
+
+
+def write_result_store(filename: str or Path, content: dict):
+    """Writes the binary store of a result json file.
+    It contains json file content and its formatted view used by result pages, pickled separately,
+    so that readers unpickle only the part they need.
+    Returns the formatted view."""
+    import os
+    import pickle
+
+    from frontendUtils import get_pretty_data
+
+    try:
+        data = pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL)
+        stat = Path(RESULTDIR, filename).stat()
+        store = {'source': [stat.st_mtime_ns, stat.st_size], 'data': data}
+        result_type = content['file_stats'].get('result_type')
+        pretty = None
+        if result_type in ('task', 'comp'):
+            '''get_pretty_data modifies content, so it gets a copy'''
+            pretty = get_pretty_data(pickle.loads(data))
+            store['pretty'] = pickle.dumps(pretty, protocol=pickle.HIGHEST_PROTOCOL)
+        if result_type == 'task':
+            '''task data and scores used to create comp results'''
+            from comp import TaskScores
+
+            try:
+                scores = TaskScores.from_json_data(content['info']['id'], pickle.loads(data))
+                store['comp'] = pickle.dumps(scores, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                print(f'Error creating task scores of result file {filename}: {e}')
+        file = result_store_file(filename)
+        temp = file.with_suffix('.tmp')
+        with open(temp, 'wb') as f:
+            pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, file)
+        return pretty
+    except Exception as e:
+        print(f'Error writing binary store of result file {filename}: {e}')
+        return None
+
+
+def read_result_store(filename: str or Path, part: str = 'data'):
+    """Reads part ('data', 'pretty', or 'comp' for task results) from the binary store of a result json file.
+    Returns None if store does not exist, or json file has been modified after store was written."""
+    import pickle
+
+    try:
+        stat = Path(RESULTDIR, filename).stat()
+        with open(result_store_file(filename), 'rb') as f:
+            store = pickle.load(f)
+        if store['source'] == [stat.st_mtime_ns, stat.st_size]:
+            return pickle.loads(store[part])
+    except (TypeError, OSError, EOFError, KeyError, pickle.UnpicklingError):
+        pass
+    return None
+
+
+def get_pretty_result(filename: str):
+    """returns formatted view of a result json file, as used by result pages.
+    Binary store is created or updated if needed."""
+    from frontendUtils import get_pretty_data
+
+    pretty = read_result_store(filename, 'pretty')
+    if pretty is None:
+        content = open_json_file(filename)
+        if not isinstance(content, dict):
+            return 'error'
+        pretty = write_result_store(filename, content) or get_pretty_data(content)
+    return pretty
+
 
 def update_result_status(filename: str, status: str, locked: bool = None):
     import time
@@ -641,6 +732,7 @@ def update_result_status(filename: str, status: str, locked: bool = None):
         with db_session() as db:
             result = db.query(TblResultFile).filter_by(filename=filename).one()
             result.status = status
+    write_result_store(filename, d)
 
 
 def update_tasks_status_in_comp_result(comp_id: int) -> bool:
@@ -648,8 +740,8 @@ def update_tasks_status_in_comp_result(comp_id: int) -> bool:
     from compUtils import get_comp_json_filename
     from task import get_task_json
     try:
-        file = Path(RESULTDIR, get_comp_json_filename(comp_id))
-        with open(file, 'r+') as f:
+        filename = get_comp_json_filename(comp_id)
+        with open(Path(RESULTDIR, filename), 'r+') as f:
             d = json.load(f)
             for t in d.get('tasks'):
                 file = get_task_json(t['id'])
@@ -658,6 +750,7 @@ def update_tasks_status_in_comp_result(comp_id: int) -> bool:
             f.seek(0)
             f.write(json.dumps(d))
             f.truncate()
+        write_result_store(filename, d)
         return True
     except Exception:
         return False
@@ -759,6 +852,8 @@ def update_result_file(filename: str, par_id: int, notification: dict):
                 db.rollback()
                 db.close()
                 return error
+    '''formatted view is generated again for the edited file'''
+    write_result_store(filename, data)
 
 
 def order_task_results(results: list) -> list:
@@ -797,6 +892,7 @@ def update_results_rankings(comp_id: int, comp_class: str = None) -> bool:
                     f.seek(0)
                     f.write(json.dumps(data, cls=CJsonEncoder))
                     f.truncate()
+                write_result_store(file, json.loads(json.dumps(data, cls=CJsonEncoder)))
             return True
         except Exception as e:
             # raise
@@ -807,6 +903,7 @@ def update_results_rankings(comp_id: int, comp_class: str = None) -> bool:
 def delete_result(filename: str, delete_file=False):
     if delete_file:
         Path(RESULTDIR, filename).unlink(missing_ok=True)
+        result_store_file(filename).unlink(missing_ok=True)
     row = TblResultFile.get_one(filename=filename)
     row.delete()
 
@@ -20,7 +20,7 @@ from geopy.distance import geodesic
 from pyproj import Proj
 
 if FAI_SPHERE:
-    from haversine import Unit, haversine
+    from haversine import Unit, haversine, haversine_vector
 
 '''define earth model'''
 # EARTHMODEL = Proj("+init=EPSG:4326")  # LatLon with WGS84 datum used by GPS units and Google Earth
@@ -138,12 +138,33 @@ class Turnpoint:
         fix - gnns fix object from flight
         t - tolerance as a percentage
         tm- minimum tolerance in meters"""
+        return distance(self, fix) < self.radius + self.tolerance(t, tm)
+
+    def in_radius_array(self, lats, lons, t, tm, fixes=None):
+        """Vectorised version of in_radius, checks a whole track segment in one call
+        arguments:
+        lats, lons - numpy arrays of fixes coordinates
+        t - tolerance as a percentage
+        tm- minimum tolerance in meters
+        fixes - optional list of fixes. If given, fixes closer than 1 mm to the limit are checked again with
+                in_radius, so that result is identical to the scalar version
+        returns numpy boolean array"""
+        limit = self.radius + self.tolerance(t, tm)
+        dist = distances_to_point(lats, lons, self)
+        inside = dist < limit
+        if fixes is not None:
+            for i in np.flatnonzero(np.abs(dist - limit) < 0.001).tolist():
+                inside[i] = self.in_radius(fixes[i], t, tm)
+        return inside
+
+    def tolerance(self, t, tm):
+        """tolerance in meters
+        t - tolerance as a percentage
+        tm- minimum tolerance in meters"""
         if t < 0:
-            tol = min(tm, self.radius * t)
+            return min(tm, self.radius * t)
         else:
-            tol = max(tm, self.radius * t)
-
-        return distance(self, fix) < self.radius + tol
+            return max(tm, self.radius * t)
 
 
 def delete_turnpoint(tp_id):
@@ -281,6 +302,33 @@ def distance(p1, p2, method='fast_andoyer'):
         return fast_andoyer(p1, p2)
 
 
+def distance_array(lat1, lon1, lat2, lon2):
+    """Vectorised version of distance.
+    Coordinates are numpy arrays or scalars that broadcast together: i.e. N fixes to one centre,
+    or two arrays of the same length for pairwise distances.
+    returns numpy array of distances in meters"""
+    if FAI_SPHERE:
+        lat1, lon1, lat2, lon2 = np.broadcast_arrays(*(np.asarray(c, dtype=float) for c in (lat1, lon1, lat2, lon2)))
+        return haversine_vector(
+            np.column_stack((lat1.ravel(), lon1.ravel())),
+            np.column_stack((lat2.ravel(), lon2.ravel())),
+            unit=Unit.METERS,
+        ).reshape(lat1.shape)
+    return fast_andoyer_array(lat1, lon1, lat2, lon2)
+
+
+def distances_to_point(lats, lons, point):
+    """distances in meters from N positions to a single point (Turnpoint, fix, ...)"""
+    return distance_array(point.lat, point.lon, lats, lons)
+
+
+def consecutive_distances(lats, lons):
+    """distances in meters between consecutive positions of a track segment, N-1 elements"""
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    return distance_array(lats[:-1], lons[:-1], lats[1:], lons[1:])
+
+
 def plane_normal(c1, c2):
     # Find the normal to the plane created by the two points ..
     # Normal n = u X v =
@@ -474,6 +522,16 @@ def tp_made_civl(fix, next, tp, tolerance, min_tol_m):
     return condition
 
 
+def tp_made_civl_array(fixes, lats, lons, tp, tolerance, min_tol_m):
+    """Vectorised version of tp_made_civl, for each couple of consecutive fixes of a track.
+    returns numpy boolean array, element j is tp_made_civl(fixes[j], fixes[j+1], tp, tolerance, min_tol_m)"""
+
+    inner = tp.in_radius_array(lats, lons, -tolerance, -min_tol_m, fixes)
+    outer = tp.in_radius_array(lats, lons, tolerance, min_tol_m, fixes)
+
+    return (~inner[:-1] & outer[1:]) | (~inner[1:] & outer[:-1])
+
+
 def tp_time_civl(fix, next, tp):
     """return correct time of achieving a turnpoint based on CIVL rules"""
 
@@ -588,6 +646,18 @@ def distance_flown(fix, i, short_route, wpt, distances_to_go):
     return dist_flown
 
 
+def distances_flown(lats, lons, i, short_route, wpt, distances_to_go):
+    """Vectorised version of distance_flown, for a track segment with the same next waypoint"""
+
+    if wpt.how == 'entry' or wpt.shape == 'line':
+        dist_to_next = distances_to_point(lats, lons, short_route[i])
+    else:
+        dist_to_center = distances_to_point(lats, lons, wpt)
+        dist_to_next = np.maximum(wpt.radius - dist_to_center, 0)
+
+    return distances_to_go[0] - (dist_to_next + distances_to_go[i])
+
+
 def fast_andoyer(p1, p2):
     flattening = f  # ELLIPSOIDS['WGS-84'][2]
     semi_major_axis = a  # ELLIPSOIDS['WGS-84'][0] * 1000
@@ -635,6 +705,45 @@ def fast_andoyer(p1, p2):
     return semi_major_axis * (d + dd)
 
 
+def fast_andoyer_array(lat1, lon1, lat2, lon2):
+    """Vectorised version of fast_andoyer.
+    Coordinates in degrees, numpy arrays or scalars that broadcast together.
+    returns numpy array of distances in meters"""
+    flattening = f
+    semi_major_axis = a
+
+    lat1r = np.radians(np.asarray(lat1, dtype=float))
+    lon1r = np.radians(np.asarray(lon1, dtype=float))
+    lat2r = np.radians(np.asarray(lat2, dtype=float))
+    lon2r = np.radians(np.asarray(lon2, dtype=float))
+
+    cos_dlon = np.cos(lon2r - lon1r)
+    sin_lat1 = np.sin(lat1r)
+    cos_lat1 = np.cos(lat1r)
+    sin_lat2 = np.sin(lat2r)
+    cos_lat2 = np.cos(lat2r)
+
+    cos_d = np.clip(sin_lat1 * sin_lat2 + cos_lat1 * cos_lat2 * cos_dlon, -1, 1)
+
+    d = np.arccos(cos_d)
+    sin_d = np.sin(d)
+
+    diffsinlat = sin_lat1 - sin_lat2
+    sumsinlat = sin_lat1 + sin_lat2
+    K = diffsinlat * diffsinlat
+    L = sumsinlat * sumsinlat
+    three_sin_d = 3 * sin_d
+
+    one_minus_cos_d = 1 - cos_d
+    one_plus_cos_d = 1 + cos_d
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        H = np.where(one_minus_cos_d == 0, 0, (d + three_sin_d) / one_minus_cos_d)
+        G = np.where(one_plus_cos_d == 0, 0, (d - three_sin_d) / one_plus_cos_d)
+    dd = -(flattening / 4.0) * (H * K + G * L)
+    return semi_major_axis * (d + dd)
+
+
 def calcBearing(lat1, lon1, lat2, lon2):
     return Geodesic.WGS84.Inverse(lat1, lon1, lat2, lon2)['azi1']
 
@@ -798,6 +907,100 @@ def get_line(turnpoints: list, optimised_turnpoints: list = None, tol: float = 0
     ]
 
 
+"""
+Cache of optimised routes
+Optimised paths are stored by hash of their input (projection, projected route and its starting fixes),
+so tasks with the same route version share the same result.
+"""
+
+
+class RouteCache:
+    """LRU cache of JSON serializable route results, keyed by content hash.
+    If a Redis url is given, results are also shared through Redis among processes.
+    size:       max number of results kept in process memory
+    redis_url:  STR Redis url, i.e. 'redis://redis:6379/1', or None"""
+
+    prefix = 'route:'
+
+    def __init__(self, size: int = 128, redis_url: str = None):
+        from collections import OrderedDict
+
+        self.size = size
+        self.redis_url = redis_url
+        self.items = OrderedDict()
+        self._redis = None
+
+    @staticmethod
+    def key(*args) -> str:
+        import hashlib
+        import json
+
+        return hashlib.blake2b(json.dumps(args, default=str).encode(), digest_size=16).hexdigest()
+
+    @property
+    def redis(self):
+        if self.redis_url and self._redis is None:
+            try:
+                import redis
+
+                self._redis = redis.Redis.from_url(self.redis_url)
+            except Exception as e:
+                print(f'Route cache: Redis is not available ({e}), using memory only')
+                self.redis_url = None
+        return self._redis
+
+    def get(self, key: str):
+        import json
+
+        if key in self.items:
+            self.items.move_to_end(key)
+            return self.items[key]
+        if self.redis:
+            try:
+                value = self.redis.get(self.prefix + key)
+            except Exception as e:
+                print(f'Route cache: error reading from Redis ({e}), using memory only')
+                self.redis_url, self._redis, value = None, None, None
+            if value is not None:
+                value = json.loads(value)
+                self._store(key, value)
+                return value
+        return None
+
+    def set(self, key: str, value):
+        import json
+
+        self._store(key, value)
+        if self.redis:
+            try:
+                self.redis.set(self.prefix + key, json.dumps(value))
+            except Exception as e:
+                print(f'Route cache: error writing to Redis ({e}), using memory only')
+                self.redis_url, self._redis = None, None
+
+    def clear(self):
+        self.items.clear()
+
+    def _store(self, key: str, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+
+_route_cache = None
+
+
+def get_route_cache() -> RouteCache:
+    """returns the process route cache, created from configuration on first use"""
+    global _route_cache
+    if _route_cache is None:
+        from Defines import ROUTE_CACHE_REDIS, ROUTE_CACHE_SIZE
+
+        _route_cache = RouteCache(ROUTE_CACHE_SIZE, ROUTE_CACHE_REDIS)
+    return _route_cache
+
+
 """
 Procedures for Task Short Distance Calculation
 Using John Stevenson's Algorithm
@@ -826,11 +1029,36 @@ def get_shortest_path(task, ss_distance=False) -> list:
     else:
         ESS_index = None
 
+    '''optimisation starts from points fixes, and leaves them on the optimised path, so they are part of the key'''
+    cache = get_route_cache()
+    key = cache.key(
+        'shortest_path',
+        task.geo.proj.srs,
+        [(p.x, p.y, p.fx, p.fy, p.radius, p.type) for p in points],
+        [(p.x, p.y, p.fx, p.fy, p.radius, p.type) for p in line],
+        ESS_index,
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        for p, (fx, fy) in zip(points + line, cached['fixes']):
+            p.fx, p.fy = fx, fy
+        return [
+            Turnpoint(lat=lat, lon=lon, type='optimised', radius=0, shape='optimised', how='optimised')
+            for lat, lon in cached['optimised']
+        ]
+
     planar_dist, points = calculate_optimised_path(points, ESS_index, line)
 
     '''create optimised points positions on earth model (lat, lon)'''
     optimised = revert_opt_points(points, task.geo)
 
+    cache.set(
+        key,
+        dict(
+            fixes=[(p.fx, p.fy) for p in points + line],
+            optimised=[(tp.lat, tp.lon) for tp in optimised],
+        ),
+    )
     return optimised
 
 
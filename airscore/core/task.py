@@ -29,7 +29,7 @@ from calcUtils import decimal_to_seconds, get_date, json
 from ranking import create_rankings
 from db.conn import db_session
 from db.tables import TblTask
-from Defines import MAPOBJDIR, RESULTDIR, TRACKDIR
+from Defines import AIRSPACEDIR, IGCPARSINGCONFIG, MAPOBJDIR, RESULTDIR, TRACKDIR
 from formula import TaskFormula
 from geo import Geo
 from igc_lib import defaultdict
@@ -167,7 +167,7 @@ class Task(object):
     def __setattr__(self, attr, value):
         import datetime
 
-        property_names = [p for p in dir(Task) if isinstance(getattr(Task, p), property)]
+        property_names = Task._property_names
         if attr == 'date':
             if type(value) is str:
                 value = get_date(value)
@@ -177,6 +177,9 @@ class Task(object):
             value = value.lower()
         if attr not in property_names:
             self.__dict__[attr] = value
+            if attr in ('pilots', 'formula'):
+                '''statistics snapshot is not valid anymore'''
+                self.__dict__.pop('_stats', None)
             if attr == 'task_id' and hasattr(self, 'formula') and isinstance(self.formula, TaskFormula):
                 self.formula.__dict__[attr] = value
 
@@ -324,6 +327,13 @@ class Task(object):
     @property
     def distances_to_go(self):
         """calculates a list of distances from turnpoint to goal (assumes goal is the last turnpoint)"""
+        from route import get_route_cache
+
+        cache = get_route_cache()
+        key = cache.key('distances_to_go', [(p.lat, p.lon) for p in self.optimised_turnpoints])
+        distances_to_go = cache.get(key)
+        if distances_to_go is not None:
+            return list(distances_to_go)
         t = len(self.optimised_turnpoints) - 1
         d = 0
         distances_to_go = [0]
@@ -331,7 +341,8 @@ class Task(object):
             d += distance(self.optimised_turnpoints[t], self.optimised_turnpoints[t - 1])
             distances_to_go.insert(0, d)
             t -= 1
-        return distances_to_go
+        cache.set(key, distances_to_go)
+        return list(distances_to_go)
 
     @property
     def duration(self):
@@ -391,37 +402,82 @@ class Task(object):
 
     ''' * Statistic Properties *'''
 
+    def _statistic(self, name: str, attributes: tuple, func):
+        """Returns a statistic from the task statistics snapshot.
+        Statistics are calculated when needed, and calculated again only if pilots list, formula minimum distance,
+        or any pilot result attribute they depend on has changed,
+        so that formula libraries can read them for each pilot.
+        name:       statistic name
+        attributes: FlightResult attributes statistic depends on
+        func:       function calculating statistic"""
+        from pilot.flightresult import FlightResult
+
+        versions = FlightResult._stats_versions
+        key = (len(self.pilots), getattr(self.formula, 'min_dist', None), *(versions[a] for a in attributes))
+        stats = self.__dict__.setdefault('_stats', {})
+        if name not in stats or stats[name][0] != key:
+            stats[name] = (key, func())
+        return stats[name][1]
+
+    def _results_lists(self) -> dict:
+        """lists of present pilots' results, created in one pass"""
+        lists = dict(valid=[], sss=[], ess=[], goal=[], lo=[])
+        for pilot in self.pilots:
+            if pilot.result_type in ('abs', 'dnf', 'nyp'):
+                continue
+            lists['valid'].append(pilot)
+            if pilot.SSS_time and pilot.SSS_time > 0:
+                lists['sss'].append(pilot)
+            if pilot.ESS_time and pilot.ESS_time > 0:
+                lists['ess'].append(pilot)
+            if pilot.goal_time and pilot.goal_time > 0:
+                lists['goal'].append(pilot)
+            if not pilot.result_type == 'goal':
+                lists['lo'].append(pilot)
+        return lists
+
+    _lists_attributes = ('result_type', 'SSS_time', 'ESS_time', 'goal_time')
+
+    def _results_list(self, name: str) -> list:
+        return list(self._statistic('results_lists', self._lists_attributes, self._results_lists)[name])
+
     ''' list of present pilots' results'''
 
     @property
     def valid_results(self):
-        return [pilot for pilot in self.pilots if pilot.result_type not in ('abs', 'dnf', 'nyp')]
+        return self._results_list('valid')
 
     @property
     def results_with_SSS_time(self):
-        return [pilot for pilot in self.valid_results if pilot.SSS_time and pilot.SSS_time > 0]
+        return self._results_list('sss')
 
     @property
     def results_with_ESS_time(self):
-        return [pilot for pilot in self.valid_results if pilot.ESS_time and pilot.ESS_time > 0]
+        return self._results_list('ess')
 
     @property
     def results_in_goal(self):
-        return [pilot for pilot in self.valid_results if pilot.goal_time and pilot.goal_time > 0]
+        return self._results_list('goal')
 
     @property
     def results_landed_out(self):
-        return [pilot for pilot in self.valid_results if not pilot.result_type == 'goal']
+        return self._results_list('lo')
 
     ''' pilots stats'''
 
     @property
     def pilots_present(self):
-        return len([p for p in self.pilots if p.result_type != 'abs'])
+        return self._statistic(
+            'pilots_present', ('result_type',), lambda: len([p for p in self.pilots if p.result_type != 'abs'])
+        )
 
     @property
     def pilots_launched(self):
-        return len([p for p in self.pilots if p.result_type not in ('abs', 'dnf')])
+        return self._statistic(
+            'pilots_launched',
+            ('result_type',),
+            lambda: len([p for p in self.pilots if p.result_type not in ('abs', 'dnf')]),
+        )
 
     @property
     def pilots_ss(self):
@@ -442,93 +498,160 @@ class Task(object):
     # pilots already landed at task deadline / stop time
     @property
     def pilots_landed(self):
-        return len([p for p in self.valid_results if not p.still_flying_at_deadline])
+        return self._statistic(
+            'pilots_landed',
+            (*self._lists_attributes, 'still_flying_at_deadline'),
+            lambda: len([p for p in self.valid_results if not p.still_flying_at_deadline]),
+        )
 
     ''' distance stats'''
 
     @property
     def tot_dist_flown(self):
-        if self.formula:
-            if self.formula.min_dist and self.pilots_launched > 0:
-                return sum([p.distance_flown for p in self.valid_results if p.distance_flown])
-        return 0
+        def calculate():
+            if self.formula:
+                if self.formula.min_dist and self.pilots_launched > 0:
+                    return sum([p.distance_flown for p in self.valid_results if p.distance_flown])
+            return 0
+
+        return self._statistic('tot_dist_flown', (*self._lists_attributes, 'distance_flown'), calculate)
 
     @property
     def tot_dist_over_min(self):
-        if self.formula:
-            if self.formula.min_dist and self.pilots_launched > 0:
-                return sum([max(p.distance_flown - self.formula.min_dist, 0) for p in self.valid_results])
-        return 0
+        def calculate():
+            if self.formula:
+                if self.formula.min_dist and self.pilots_launched > 0:
+                    return sum([max(p.distance_flown - self.formula.min_dist, 0) for p in self.valid_results])
+            return 0
+
+        return self._statistic('tot_dist_over_min', (*self._lists_attributes, 'distance_flown'), calculate)
 
     @property
     def std_dev_dist(self):
         from statistics import StatisticsError, stdev
 
-        try:
-            return stdev([max(p.distance_flown, self.formula.min_dist) for p in self.valid_results])
-        except (StatisticsError, IndexError, AttributeError, Exception):
-            return 0
+        def calculate():
+            try:
+                return stdev([max(p.distance_flown, self.formula.min_dist) for p in self.valid_results])
+            except (StatisticsError, IndexError, AttributeError, Exception):
+                return 0
+
+        return self._statistic('std_dev_dist', (*self._lists_attributes, 'distance_flown'), calculate)
 
     @property
     def max_distance_flown(self):
-        if self.formula:
-            return max(max((p.distance_flown for p in self.valid_results), default=0), self.formula.min_dist or 0)
-        return 0
+        def calculate():
+            if self.formula:
+                return max(max((p.distance_flown for p in self.valid_results), default=0), self.formula.min_dist or 0)
+            return 0
+
+        return self._statistic('max_distance_flown', (*self._lists_attributes, 'distance_flown'), calculate)
 
     @property
     def max_distance(self):
-        if self.formula:
-            # FlightResult.distance = max(distance_flown, total_distance)
-            return max(max((p.distance for p in self.valid_results), default=0), self.formula.min_dist or 0)
-        return 0
+        def calculate():
+            if self.formula:
+                # FlightResult.distance = max(distance_flown, total_distance)
+                return max(max((p.distance for p in self.valid_results), default=0), self.formula.min_dist or 0)
+            return 0
+
+        return self._statistic(
+            'max_distance', (*self._lists_attributes, 'distance_flown', 'total_distance'), calculate
+        )
 
     '''time stats'''
 
     @property
     def min_dept_time(self):
-        return min((p.real_start_time for p in self.results_with_SSS_time), default=None)
+        return self._statistic(
+            'min_dept_time',
+            (*self._lists_attributes, 'real_start_time'),
+            lambda: min((p.real_start_time for p in self.results_with_SSS_time), default=None),
+        )
 
     @property
     def max_dept_time(self):
-        return max((p.real_start_time for p in self.results_with_SSS_time), default=None)
+        return self._statistic(
+            'max_dept_time',
+            (*self._lists_attributes, 'real_start_time'),
+            lambda: max((p.real_start_time for p in self.results_with_SSS_time), default=None),
+        )
 
     @property
     def min_ss_time(self):
-        return min((p.SSS_time for p in self.results_with_SSS_time), default=None)
+        return self._statistic(
+            'min_ss_time',
+            self._lists_attributes,
+            lambda: min((p.SSS_time for p in self.results_with_SSS_time), default=None),
+        )
 
     @property
     def max_ss_time(self):
-        return max((p.SSS_time for p in self.results_with_SSS_time), default=None)
+        return self._statistic(
+            'max_ss_time',
+            self._lists_attributes,
+            lambda: max((p.SSS_time for p in self.results_with_SSS_time), default=None),
+        )
 
     @property
     def min_ess_time(self):
-        return min((p.ESS_time for p in self.results_with_ESS_time), default=None)
+        return self._statistic(
+            'min_ess_time',
+            self._lists_attributes,
+            lambda: min((p.ESS_time for p in self.results_with_ESS_time), default=None),
+        )
 
     @property
     def max_ess_time(self):
-        return max((p.ESS_time for p in self.results_with_ESS_time), default=None)
+        return self._statistic(
+            'max_ess_time',
+            self._lists_attributes,
+            lambda: max((p.ESS_time for p in self.results_with_ESS_time), default=None),
+        )
 
     @property
     def min_goal_time(self):
-        return min((p.goal_time for p in self.results_in_goal), default=None)
+        return self._statistic(
+            'min_goal_time',
+            self._lists_attributes,
+            lambda: min((p.goal_time for p in self.results_in_goal), default=None),
+        )
 
     @property
     def fastest(self):
-        return min((p.ss_time for p in self.results_with_ESS_time), default=None)
+        return self._statistic(
+            'fastest',
+            self._lists_attributes,
+            lambda: min((p.ss_time for p in self.results_with_ESS_time), default=None),
+        )
 
     @property
     def fastest_in_goal(self):
-        return min((p.ss_time for p in self.results_in_goal), default=None)
+        return self._statistic(
+            'fastest_in_goal',
+            self._lists_attributes,
+            lambda: min((p.ss_time for p in self.results_in_goal), default=None),
+        )
 
     @property
     def last_landing_time(self):
         """ Landing time of last pilot in flight"""
-        return max(((p.landing_time or p.last_time or 0) for p in self.valid_results), default=None)
+        return self._statistic(
+            'last_landing_time',
+            (*self._lists_attributes, 'landing_time', 'last_time'),
+            lambda: max(((p.landing_time or p.last_time or 0) for p in self.valid_results), default=None),
+        )
 
     @property
     def last_landout_time(self):
         """ Landing time of last pilot landed out"""
-        return max(((p.landing_time or p.last_time or 0) for p in self.valid_results if not p.ESS_time), default=None)
+        return self._statistic(
+            'last_landout_time',
+            (*self._lists_attributes, 'landing_time', 'last_time'),
+            lambda: max(
+                ((p.landing_time or p.last_time or 0) for p in self.valid_results if not p.ESS_time), default=None
+            ),
+        )
 
     @property
     def max_time(self):
@@ -545,20 +668,33 @@ class Task(object):
 
     @property
     def tot_flight_time(self):
-        if self.pilots_launched:
-            return sum([p.flight_time for p in self.valid_results if p.flight_time])
-        else:
-            return None
+        def calculate():
+            if self.pilots_launched:
+                return sum([p.flight_time for p in self.valid_results if p.flight_time])
+            else:
+                return None
+
+        return self._statistic(
+            'tot_flight_time', (*self._lists_attributes, 'first_time', 'landing_time', 'last_time'), calculate
+        )
 
     ''' scoring stats'''
 
     @property
     def min_lead_coeff(self):
-        return min((p.lead_coeff for p in self.results_with_SSS_time), default=None)
+        return self._statistic(
+            'min_lead_coeff',
+            (*self._lists_attributes, 'lead_coeff'),
+            lambda: min((p.lead_coeff for p in self.results_with_SSS_time), default=None),
+        )
 
     @property
     def max_score(self):
-        return max((p.score for p in self.valid_results if p.score is not None), default=None)
+        return self._statistic(
+            'max_score',
+            (*self._lists_attributes, 'score'),
+            lambda: max((p.score for p in self.valid_results if p.score is not None), default=None),
+        )
 
     @classmethod
     def read(cls, task_id: int):
@@ -753,6 +889,44 @@ class Task(object):
             return False
         return True
 
+    def check_hash(self) -> str:
+        """ returns hash of task route, formula and airspace parameters used to check tracks.
+            Tracks checked with the same hash and unchanged file do not need to be checked again.
+            Lead factor is only used in scoring, and formula library only changes fixed LC,
+            that is calculated again from Leading Coefficient series stored with track series."""
+        import hashlib
+        import json
+
+        params = dict(
+            task={
+                x: getattr(self, x)
+                for x in (
+                    'date', 'comp_class', 'task_type', 'window_open_time', 'window_close_time', 'start_time',
+                    'start_close_time', 'start_iteration', 'SS_interval', 'task_deadline', 'stopped_time',
+                    'check_launch', 'QNH', 'airspace_check', 'openair_file', 'igc_config_file'
+                )
+            },
+            route=[[tp.lat, tp.lon, tp.radius, tp.type, tp.shape, tp.how, tp.altitude] for tp in self.turnpoints],
+            formula={
+                x: getattr(self.formula, x, None)
+                for x in (
+                    'formula_departure', 'max_JTG', 'JTG_penalty_per_sec', 'score_back_time', 'glide_bonus',
+                    'tolerance', 'min_tolerance', 'scoring_altitude'
+                )
+            },
+            airspace=None,
+        )
+        '''IGC parsing config and openair files can be edited keeping the same name'''
+        if self.igc_config_file:
+            params['igc_config'] = file_digest(Path(IGCPARSINGCONFIG, f'{self.igc_config_file}.yaml'))
+        if self.airspace_check and self.openair_file:
+            from airspace import get_airspace_check_parameters
+
+            params['airspace'] = get_airspace_check_parameters(self.comp_id, self.task_id)
+            params['openair'] = file_digest(Path(AIRSPACEDIR, self.openair_file))
+        data = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
     def check_all_tracks(self, lib=None, airspace=None, print=print):
         """ checks all igc files against Task and creates results """
 
@@ -828,8 +1002,8 @@ class Task(object):
                 verify_all_tracks(self, lib, airspace, print=print)
                 adjust_flight_results(self, lib)
         else:
-            '''get all results for the task'''
-            verify_all_tracks(self, lib, airspace, print=print)
+            '''check tracks that changed since last check, get stored results for the others'''
+            verify_all_tracks(self, lib, airspace, print=print, reuse_unchanged=True)
         '''store results to database'''
         print(f"updating database with new results...")
         update_all_results(self.pilots, self.task_id)
@@ -1082,17 +1256,18 @@ class Task(object):
         return task
 
     @staticmethod
-    def create_from_json(task_id: int, filename=None):
+    def create_from_json(task_id: int, filename=None, data: dict = None):
         """Creates Task from JSON task file.
         If filename is empty, it gets the active one
         Inputs:
             task_id     int: task ID
             filename    str: (opt.) json filename
+            data        dict: (opt.) json file content, if already read
         """
         from pilot.flightresult import FlightResult
         from result import open_json_file
 
-        t = open_json_file(filename or get_task_json_filename(task_id))
+        t = data or open_json_file(filename or get_task_json_filename(task_id))
         if not t:
             print(f"There's no active json file for task {task_id}, or given filename does not exists")
             return None
@@ -1614,6 +1789,10 @@ class Task(object):
         return task_coords, turnpoints, short_route, goal_line, tolerance, bbox
 
 
+'''property names are listed once, as attributes are set many times'''
+Task._property_names = frozenset(p for p in dir(Task) if isinstance(getattr(Task, p), property))
+
+
 def delete_task(task_id, files=False):
     import shutil
 
@@ -1790,22 +1969,50 @@ def get_task_json_by_filename(filename):
 
 
 def need_full_rescore(task_id: int):
-    """Checks if Task need to be rescored, re checking all tracks:
-    - If not all tracks have been submitted or edited later than last task update or formula update
-    - if task have been stopped (but anyway task is edited to be stopped so same as first case)"""
-    from db.tables import TblForComp as F
-    from db.tables import TblTask as T
+    """Checks if Task need to be rescored, re checking tracks:
+    - if any track has been checked with different task route, formula or airspace parameters
+      (task stopped or edited, formula changed)
+    - if any track has no fingerprint, as it was checked before fingerprints were stored"""
     from db.tables import TblTaskResult as R
 
+    from db.tables import TaskObjectView as T
+    from db.tables import TblTaskWaypoint as W
+
+    '''only parameters used in check hash are read, without creating task projection and path'''
+    row = T.get_by_id(task_id)
+    if not row:
+        return False
+    task = row.populate(Task(task_id=task_id))
+    task.turnpoints = [tp.populate(Turnpoint()) for tp in W.from_task_id(task_id)]
+    task_hash = task.check_hash()
     with db_session() as db:
-        task = db.query(T).filter_by(task_id=task_id).one_or_none()
-        if task:
-            formula_last_update = db.query(F.last_update).filter_by(comp_id=task.comp_id).scalar()
-            tracks = db.query(R.last_update, R.result_type).filter_by(task_id=task_id).all()
-            min_track_update = min(t.last_update for t in tracks if t.result_type not in ['nyp', 'abs', 'dnf'])
-            if min_track_update < max(formula_last_update, task.last_update):
-                return True
-    return False
+        tracks = (
+            db.query(R.fingerprint, R.result_type).filter_by(task_id=task_id).filter(R.track_file.isnot(None)).all()
+        )
+    return any(
+        not (t.fingerprint and t.fingerprint.startswith(task_hash))
+        for t in tracks
+        if t.result_type not in ['nyp', 'abs', 'dnf']
+    )
+
+
+_file_digests = {}
+
+
+def file_digest(filename: Path) -> str or None:
+    """returns hash of file content, None if file does not exist.
+    Digests are kept by file modification time and size, so unchanged files are not read again"""
+    from pilot.flightresult import track_file_hash
+
+    try:
+        stat = filename.stat()
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _file_digests.get(filename)
+    if cached is None or cached[0] != key:
+        cached = _file_digests[filename] = key, track_file_hash(filename)
+    return cached[1]
 
 
 def need_new_scoring(task_id: int):
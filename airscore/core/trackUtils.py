@@ -12,9 +12,9 @@ from os import fsdecode, listdir
 from pathlib import Path
 from airspace import AirspaceCheck
 from db.conn import db_session
-from Defines import MAPOBJDIR, TRACKDIR, track_formats, track_sources, IGCPARSINGCONFIG
+from Defines import MAPOBJDIR, TRACKDIR, track_formats, track_sources, IGCPARSINGCONFIG, G_RECORD_VALIDATION_THREADS
 from pilot.track import Track, FlightParsingConfig
-from pilot.flightresult import FlightResult, save_track
+from pilot.flightresult import FlightResult, save_track, track_fingerprint
 from sqlalchemy import and_
 
 
@@ -46,6 +46,47 @@ def extract_tracks(file, folder):
     return error
 
 
+class ArchiveTrack:
+    """Track file in a zip archive. It is read from the archive when needed, without extracting it.
+    Has the Path attributes and methods used by the tracks import procedure"""
+
+    def __init__(self, archive, info):
+        self.archive = archive  # ZipFile obj.
+        self.info = info  # ZipInfo obj.
+        self.name = Path(info.filename).name
+        self.suffix = Path(info.filename).suffix
+
+    def __str__(self):
+        return self.info.filename
+
+    def open(self, mode='rb'):
+        return self.archive.open(self.info)
+
+    def read_bytes(self) -> bytes:
+        return self.archive.read(self.info)
+
+
+def get_zip_tracks(archive) -> list:
+    """Checks files in a zip archive and returns what appear to be tracks, without extracting them
+    archive:    ZipFile obj."""
+
+    files = []
+
+    print(f"Looking for files \n")
+
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        file = Path(info.filename)
+        if not any(el.startswith(('_', '.')) for el in file.parts) and file.suffix.strip('.').lower() in track_formats:
+            """file is a valid track"""
+            print(f"{file} is a valid track")
+            files.append(ArchiveTrack(archive, info))
+        else:
+            print(f"{file} is NOT a valid track")
+    return files
+
+
 def get_tracks(directory):
     """Checks files and imports what appear to be tracks"""
 
@@ -69,8 +110,12 @@ def get_tracks(directory):
 
 
 def assign_and_import_tracks(files, task, track_source=None, user=None, check_g_record=False, print=print):
-    """Find pilots to associate with tracks"""
+    """Find pilots to associate with tracks
+    files:  list of track files, Path or ArchiveTrack obj.
+    Tracks are matched to pilots first, and G-Record of matched tracks is validated in parallel
+    while tracks are processed in files order. All results are saved to database at the end."""
     import importlib
+    from concurrent.futures import ThreadPoolExecutor
     from functools import partial
     from frontendUtils import print_to_sse, track_result_output
     from pilot.flightresult import update_all_results
@@ -90,11 +135,15 @@ def assign_and_import_tracks(files, task, track_source=None, user=None, check_g_
         return
 
     pilots_to_save = []
+    matcher = None
     if track_source:
         ''' Use Live server filename format to get pilot '''
         lib = importlib.import_module('.'.join(['sources', track_source]))
+        get_pilot = partial(lib.get_pilot_from_list, pilots=pilot_list)
     else:
-        lib = importlib.import_module('trackUtils')
+        '''pilots are indexed once for all files'''
+        matcher = PilotMatcher(pilot_list)
+        get_pilot = matcher.match
 
     tracks_processed = 0
     number_of_tracks = len(files)
@@ -104,26 +153,49 @@ def assign_and_import_tracks(files, task, track_source=None, user=None, check_g_
 
     FlightParsingConfig = igc_parsing_config_from_yaml(task.igc_config_file)
     airspace = None if not task.airspace_check else AirspaceCheck.from_task(task)
+    task_hash = task.check_hash()
+
+    """check filenames to find pilots, and start G-Record validation of matched tracks"""
+    candidates = [get_pilot(file.name) for file in files]
+    assigned = set()
+    executor = ThreadPoolExecutor(max_workers=G_RECORD_VALIDATION_THREADS) if check_g_record else None
+    validations = {
+        idx: executor.submit(validate_G_record, file) for idx, file in enumerate(files) if executor and candidates[idx]
+    }
 
-    for file in files:
+    for idx, file in enumerate(files):
         filename = file.name
 
+        print(f'filename {filename}, {type(filename)}')
+        pilot = candidates[idx]
+        if pilot and pilot.par_id in assigned:
+            '''candidate pilot already got a track, check again against remaining pilots'''
+            pilot = get_pilot(filename)
+        if not pilot:
+            print(f'No pilot to associate with {filename}, or pilot already has a track.')
+            continue
+
         '''check igc file is correct'''
-        mytrack, error = import_igc_file(file, task, parsing_config=FlightParsingConfig, check_g_record=check_g_record)
+        if check_g_record and idx not in validations:
+            validations[idx] = executor.submit(validate_G_record, file)
+        mytrack, error = import_igc_file(
+            file,
+            task,
+            parsing_config=FlightParsingConfig,
+            check_g_record=check_g_record,
+            validation=validations[idx].result() if check_g_record else None,
+        )
         if error:
             '''error importing igc file'''
             print(f'Error: {filename} - {error}')
             continue
 
-        print(f'filename {filename}, {type(filename)}')
-        """check filenames to find pilots"""
-        pilot = lib.get_pilot_from_list(filename, pilot_list)
-        if not pilot:
-            print(f'No pilot to associate with {filename}, or pilot already has a track.')
-            continue
-
         """found a pilot for the track file. dropping pilot from list and creating track obj"""
-        pilot_list[:] = [d for d in pilot_list if d.par_id != pilot.par_id]
+        assigned.add(pilot.par_id)
+        if matcher:
+            matcher.remove(pilot)
+        else:
+            pilot_list[:] = [d for d in pilot_list if d.par_id != pilot.par_id]
 
         """pilot is registered and has no valid track yet
         moving file to correct folder and adding to the list of valid tracks"""
@@ -137,7 +209,8 @@ def assign_and_import_tracks(files, task, track_source=None, user=None, check_g_
             print('***************START*******************')
         else:
             pilot_print = print
-        check_flight(pilot, mytrack, task, airspace, print=pilot_print)
+        fingerprint = track_fingerprint(task_hash, Path(task.file_path, pilot.track_file))
+        check_flight(pilot, mytrack, task, airspace, print=pilot_print, fingerprint=fingerprint)
         if pilot.notifications:
             print(f"NOTES:<br /> {'<br />'.join(n.comment for n in pilot.notifications)}")
 
@@ -149,6 +222,11 @@ def assign_and_import_tracks(files, task, track_source=None, user=None, check_g_
         if tracks_processed > number_of_pilots:
             '''all pilots have a track'''
             break
+    if executor:
+        '''validations of tracks not imported are not needed'''
+        for future in validations.values():
+            future.cancel()
+        executor.shutdown(wait=False)
     print("*******************processed all tracks**********************")
 
     '''save all successfully processed pilots to database'''
@@ -209,16 +287,49 @@ def get_pil_track(par_id: int, task_id: int):
 def read_tracklog_map_result_file(par_id: int, task_id: int):
     """create task and track objects"""
     from pathlib import Path
-    import jsonpickle
+    from mapUtils import map_file_exists, read_map_file
 
     res_path = Path(MAPOBJDIR, 'tracks', str(task_id))
     filename = f'{par_id}.track'
     fullname = Path(res_path, filename)
     # if the file does not exist
-    if not Path(fullname).is_file():
+    if not map_file_exists(fullname):
         create_tracklog_map_result_file(par_id, task_id)
-    with open(fullname, 'r') as f:
-        return jsonpickle.decode(f.read())
+    return read_map_file(fullname)
+
+
+def read_track_lod_file(par_id: int, task_id: int):
+    """reads pilot's tracklog level of detail pyramid, creating it if missing"""
+    from pathlib import Path
+    from mapUtils import map_file_exists, read_map_file
+
+    fullname = Path(MAPOBJDIR, 'tracks', str(task_id), f'{par_id}.lod')
+    if not map_file_exists(fullname):
+        create_track_lod_file(par_id, task_id)
+    return read_map_file(fullname)
+
+
+def create_track_lod_file(par_id: int, task_id: int):
+    """creates pilot's tracklog level of detail pyramid, from stored track series or track file.
+    Turnpoints and infringements times are read from tracklog map file, that is created if missing"""
+    from pathlib import Path
+    from mapUtils import create_track_lod, save_map_file
+    from pilot.flightresult import load_track
+    from task import Task
+
+    data = read_tracklog_map_result_file(par_id, task_id)
+    pilot = FlightResult.read(par_id, task_id)
+    if not (data and pilot.track_file):
+        return None
+    task = Task.read(task_id)
+    flight, _ = load_track(task, pilot.track_file)
+    if not flight:
+        return None
+    event_times = {int(wp[4]) for wp in data['waypoint_achieved']}
+    event_times.update(int(el[6]) for el in data['infringements'])
+    SSS_time = task.start_time if not pilot.SSS_time else pilot.SSS_time
+    fullname = Path(MAPOBJDIR, 'tracks', str(task_id), f'{par_id}.lod')
+    return save_map_file(fullname, create_track_lod(flight, event_times, SSS_time, pilot.goal_time))
 
 
 def create_tracklog_map_result_file(par_id: int, task_id: int):
@@ -269,77 +380,132 @@ def get_unscored_pilots(task_id: int, track_source=None):
     return pilot_list
 
 
-def get_pilot_from_list(filename: str, pilots: list):
-    """check filename against a list of Pilot Obj.
-    Looks for different information in filename
+'''filename fields check, used to match track filenames to accepted formats'''
+FILENAME_FIELDS_CHECK = dict(
+    name=re.compile(r"[a-zA-Z']+"),
+    id=re.compile(r'[\d]+'),
+    fai=re.compile(r'[\da-zA-Z]+'),
+    civl=re.compile(r'[\d]+'),
+    live=re.compile(r'[\da-zA-Z]+'),
+    other=re.compile(r"[a-zA-Z0-9']+"),
+)
+FILENAME_ELEMENTS = re.compile(r"[\d]+|[a-zA-Z']+")
+
+
+def get_filename_formats(formats: list = None) -> dict:
+    """returns accepted filename formats as lists of fields, grouped by number of fields"""
+    from Defines import filename_formats
+
+    result = {}
+    for el in formats or filename_formats:
+        fields = re.findall(r'[\da-zA-Z]+', el)
+        result.setdefault(len(fields), []).append(fields)
+    return result
+
+
+class PilotMatcher:
+    """Matches track filenames against a list of Pilot Obj.
+    Pilots are indexed once by ID, civl_id, live_id, fai_id and name tokens, so that each filename is matched
+    without scanning the whole list. Pilots removed from matcher are not returned anymore.
 
-    filename:   STR file name
     pilots:     LIST Participants Obj.
     """
-    from Defines import filename_formats
 
-    '''prepare filename formats'''
-    # name = r'[a-zA-Z]+'
-    # id = r'[\d]+'
-    # fai = r'[\da-zA-Z]+'
-    # civl = r'[0-9]+'
-    # live = r'[\d]+'
-    # other = r'[\da-zA-Z]+'
-    filename_check = dict(
-        name=r"[a-zA-Z']+", id=r'[\d]+', fai=r'[\da-zA-Z]+', civl=r'[\d]+', live=r'[\da-zA-Z]+', other=r"[a-zA-Z0-9']+"
-    )
-    format_list = [re.findall(r'[\da-zA-Z]+', el) for el in filename_formats]
-
-    string = Path(filename).stem
-    '''testing before against preferred format: Pilot ID as last element, string.ID.igc'''
-    if string.split('.')[-1].isdigit():
-        pilot = next((p for p in pilots if p.ID == int(string.split('.')[-1])), None)
-        if pilot:
-            print(f'found {pilot.ID} {pilot.name} using ID in filename')
-            return pilot
-    '''Get string'''
-    elements = re.findall(r"[\d]+|[a-zA-Z']+", string)
-    num_of_el = len(elements)
-    if any(el for el in format_list if len(el) == num_of_el):
-        '''we have a match in number of elements between filename and accepted formats'''
-        for f in [el for el in format_list if len(el) == num_of_el]:
-            if all(re.match(filename_check[val], elements[idx]) for idx, val in enumerate(f)):
+    index_attributes = ('ID', 'civl_id', 'live_id', 'fai_id')
+    field_attributes = dict(id='ID', civl='civl_id', live='live_id', fai='fai_id')
+
+    def __init__(self, pilots: list, formats: list = None):
+        self.pilots = list(pilots)
+        self.formats = get_filename_formats(formats)
+        self.removed = set()
+        self.indexes = {a: {} for a in self.index_attributes}
+        self.names = {}
+        for idx, p in enumerate(self.pilots):
+            for a in self.index_attributes:
+                v = getattr(p, a, None)
+                if v is not None:
+                    self.indexes[a].setdefault(v, []).append(idx)
+            for n in set((p.name or '').lower().split()):
+                self.names.setdefault(n, []).append(idx)
+
+    def remove(self, pilot):
+        """drops pilot from matcher, i.e. when he already got a track"""
+        self.removed.add(pilot.par_id)
+
+    def get(self, attr: str, value):
+        """returns first pilot in list with attribute value"""
+        idx = next((i for i in self.indexes[attr].get(value, []) if self.pilots[i].par_id not in self.removed), None)
+        return None if idx is None else self.pilots[idx]
+
+    def get_by_names(self, names: list):
+        """returns first pilot in list having all names in his name"""
+        if not names:
+            idx = next((i for i, p in enumerate(self.pilots) if p.par_id not in self.removed), None)
+        else:
+            others = [set(self.names.get(n, [])) for n in names[1:]]
+            idx = next(
+                (
+                    i
+                    for i in self.names.get(names[0], [])
+                    if self.pilots[i].par_id not in self.removed and all(i in el for el in others)
+                ),
+                None,
+            )
+        return None if idx is None else self.pilots[idx]
+
+    def match(self, filename: str):
+        """check filename against pilots list.
+        Looks for different information in filename
+
+        filename:   STR file name
+        """
+        string = Path(filename).stem
+        '''testing before against preferred format: Pilot ID as last element, string.ID.igc'''
+        if string.split('.')[-1].isdigit():
+            pilot = self.get('ID', int(string.split('.')[-1]))
+            if pilot:
+                print(f'found {pilot.ID} {pilot.name} using ID in filename')
+                return pilot
+        '''Get string'''
+        elements = FILENAME_ELEMENTS.findall(string)
+        '''formats matching number of elements between filename and accepted formats'''
+        for f in self.formats.get(len(elements), []):
+            if all(FILENAME_FIELDS_CHECK[val].match(elements[idx]) for idx, val in enumerate(f)):
                 '''we have a match between filename and accepted formats'''
                 print(f'{f}')
                 print(f'{elements}')
-                if any(k for k in f if k in ['id', 'live', 'civl', 'fai']):
+                if any(k for k in f if k in self.field_attributes):
                     '''unique id, each should find the exact pilot'''
                     for idx, val in enumerate(f):
-                        print(f'{val}, {elements[idx]}')
-                        if val in ['other', 'name']:
+                        if val not in self.field_attributes:
                             continue
-                        elif val == 'id':
-                            v = int(elements[idx])
-                            a = 'ID'
-                        elif val == 'civl':
-                            v = int(elements[idx])
-                            a = 'civl_id'
-                        elif val == 'live':
-                            v = elements[idx]
-                            a = 'live_id'
-                        elif val == 'fai':
-                            v = elements[idx]
-                            a = 'fai_id'
-                        else:
-                            continue
-                        pilot = next((p for p in pilots if getattr(p, a) == v), None)
+                        print(f'{val}, {elements[idx]}')
+                        a = self.field_attributes[val]
+                        v = int(elements[idx]) if val in ('id', 'civl') else elements[idx]
+                        pilot = self.get(a, v)
                         if pilot:
                             print(f'{a}, found {pilot.name}')
                             return pilot
                 else:
                     '''no unique id in filename, using name'''
                     names = [str(elements[idx]).lower() for idx, val in enumerate(f) if val == 'name']
-                    pilot = next((p for p in pilots if all(n in p.name.lower().split() for n in names)), None)
+                    pilot = self.get_by_names(names)
                     if pilot:
                         print(f'using name, found {pilot.name}')
                         '''we found a pilot'''
                         return pilot
-    return None
+        return None
+
+
+def get_pilot_from_list(filename: str, pilots: list):
+    """check filename against a list of Pilot Obj.
+    Looks for different information in filename.
+    To match many filenames against the same list, use a PilotMatcher.
+
+    filename:   STR file name
+    pilots:     LIST Participants Obj.
+    """
+    return PilotMatcher(pilots).match(filename)
 
 
 def validate_G_record(igc_filename):
@@ -350,8 +516,10 @@ def validate_G_record(igc_filename):
     from Defines import G_Record_validation_Server
     from requests import post
 
+    if isinstance(igc_filename, str):
+        igc_filename = Path(igc_filename)
     try:
-        with open(igc_filename, 'rb') as igc:
+        with igc_filename.open('rb') as igc:
             file = {'igcfile': igc}
             r = post(G_Record_validation_Server, files=file)
             if r.json()['result'] in ('PASSED', 'FAILED'):
@@ -425,11 +593,12 @@ def create_igc_filename(file_path: str, date, pilot_name: str, pilot_id: int = N
     return fullname
 
 
-def import_igc_file(file, task, parsing_config, check_g_record=False) -> Track or str:
+def import_igc_file(file, task, parsing_config, check_g_record=False, validation: str = None) -> Track or str:
+    """validation: result of G-Record validation if already done, PASSED, FAILED or ERROR"""
     from calcUtils import epoch_to_date
     if check_g_record:
         print('Checking G-Record...')
-        validation = validate_G_record(file)
+        validation = validation or validate_G_record(file)
         if validation == 'FAILED':
             return False, {'code': 'g_record_fail', 'text': f'G-Record not valid'}
         elif validation == 'ERROR':
@@ -456,12 +625,30 @@ def import_igc_file(file, task, parsing_config, check_g_record=False) -> Track o
     return flight, None
 
 
-def check_flight(result: FlightResult, track: Track, task, airspace=None, print=print):
+def check_flight(
+    result: FlightResult,
+    track: Track,
+    task,
+    airspace=None,
+    print=print,
+    fingerprint: str = None,
+    deadline: int = None,
+    series=None,
+):
     if task.airspace_check and not airspace:
         print(f'should not be here')
         airspace = AirspaceCheck.from_task(task)
     '''check flight against task'''
-    result.check_flight(track, task, airspace_obj=airspace, print=print)
+    result.check_flight(track, task, airspace_obj=airspace, deadline=deadline, print=print, series=series)
+    '''store fingerprint of checked track and task parameters'''
+    if fingerprint:
+        result.fingerprint = fingerprint
+    elif result.track_file and Path(task.file_path, result.track_file).is_file():
+        result.fingerprint = track_fingerprint(task.check_hash(), Path(task.file_path, result.track_file))
+    '''store track series with crossings, distances and Leading Coefficient series calculated during check'''
+    if series is not None:
+        series.set_lc_key(result.fingerprint)
+        series.save()
     '''create map file'''
     result.save_tracklog_map_file(task, track)
     # '''save to database'''
@@ -473,6 +660,8 @@ def save_igc_file(file, task_path: str, task_date, pilot_name, pid: int = None)
     fullname = create_igc_filename(task_path, task_date, pilot_name, pid)
     if isinstance(file, (Path, str)):
         copyfile(file, fullname)
+    elif isinstance(file, ArchiveTrack):
+        Path(fullname).write_bytes(file.read_bytes())
     else:
         file.save(fullname)
     return Path(fullname).name
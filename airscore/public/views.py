@@ -484,13 +484,10 @@ def ext_competition(compid: int):
 
 @blueprint.route('/ext_task_result/<int:taskid>')
 def ext_task_result(taskid: int):
-    from task import get_task_json
-    from result import open_json_file
-    if 'file' in request.args:
-        file = open_json_file(request.args.get('file'))
-    else:
-        file = get_task_json(taskid)
-    result_file = frontendUtils.get_pretty_data(file)
+    from task import get_task_json_filename
+    from result import get_pretty_result
+    filename = request.args.get('file') if 'file' in request.args else get_task_json_filename(taskid)
+    result_file = get_pretty_result(filename)
     if result_file == 'error':
         return render_template('404.html')
 
@@ -501,13 +498,10 @@ def ext_task_result(taskid: int):
 
 @blueprint.route('/task_result/<int:taskid>')
 def task_result(taskid: int):
-    from task import get_task_json
-    from result import open_json_file
-    if 'file' in request.args:
-        file = open_json_file(request.args.get('file'))
-    else:
-        file = get_task_json(taskid)
-    result_file = frontendUtils.get_pretty_data(file)
+    from task import get_task_json_filename
+    from result import get_pretty_result
+    filename = request.args.get('file') if 'file' in request.args else get_task_json_filename(taskid)
+    result_file = get_pretty_result(filename)
     if result_file == 'error':
         return render_template('404.html')
 
@@ -518,9 +512,9 @@ def task_result(taskid: int):
 
 @blueprint.route('/ext_comp_result/<int:compid>')
 def ext_comp_result(compid: int):
-    from compUtils import get_comp_json
-    content = get_comp_json(compid)
-    result_file = frontendUtils.get_pretty_data(content)
+    from compUtils import get_comp_json_filename
+    from result import get_pretty_result
+    result_file = get_pretty_result(get_comp_json_filename(compid))
     if result_file == 'error':
         return render_template('404.html')
 
@@ -533,13 +527,10 @@ def ext_comp_result(compid: int):
 
 @blueprint.route('/comp_result/<int:compid>')
 def comp_result(compid: int):
-    from compUtils import get_comp_json
-    from result import open_json_file
-    if 'file' in request.args:
-        file = open_json_file(request.args.get('file'))
-    else:
-        file = get_comp_json(compid)
-    result_file = frontendUtils.get_pretty_data(file)
+    from compUtils import get_comp_json_filename
+    from result import get_pretty_result
+    filename = request.args.get('file') if 'file' in request.args else get_comp_json_filename(compid)
+    result_file = get_pretty_result(filename)
     if result_file == 'error':
         return render_template('404.html')
 
@@ -641,6 +632,19 @@ def map(paridtaskid):
                            full_tracklog=full_tracklog)
 
 
+@blueprint.route('/_get_track_segment/<int:taskid>/<int:parid>', methods=['GET'])
+def _get_track_segment(taskid: int, parid: int):
+    """returns pilot's tracklog simplified for map zoom level, optionally between start and end rawtimes"""
+    from trackUtils import read_track_lod_file
+    zoom = request.args.get('zoom', 0, type=int)
+    start = request.args.get('start', None, type=int)
+    end = request.args.get('end', None, type=int)
+    lod = read_track_lod_file(parid, taskid)
+    if not lod:
+        return render_template('404.html')
+    return jsonify(mapUtils.track_lod_segment(lod, zoom, start, end))
+
+
 @blueprint.route('/regions/')
 @blueprint.route('/regions')
 def regions():
@@ -0,0 +1,16 @@
+USE airscore
+
+--
+-- Upgrade of databases created from a previous version of airscore.sql.
+-- New databases created from airscore.sql already have these changes.
+-- Each statement needs to be run only once.
+--
+
+-- --------------------------------------------------------
+
+--
+-- Track fingerprint: hash of task parameters used to check track, followed by hash of track file.
+-- Tracks with no fingerprint are checked again at next full rescore.
+--
+ALTER TABLE `tblTaskResult`
+  ADD COLUMN `fingerprint` char(64) DEFAULT NULL AFTER `fixed_LC`;
@@ -0,0 +1,139 @@
+import pickle
+from pathlib import Path
+
+import pytest
+
+from airspace import AirspaceCheck, AirspaceIndex, CheckParams
+from airspaceUtils import in_bbox
+from geo import Geo
+from igc_lib import GNSSFix
+from pilot.track import Track
+
+
+def check_params(notification_distance=100, function='linear'):
+    """default parameters: 70m outer limit, 0.1 penalty at border, full penalty 30m inside"""
+    return CheckParams(
+        notification_distance, function, 70, 0, 0.1, -30, 1.0, 70, 0, 0.1, -30, 1.0,
+        h_outer_band=70, h_inner_band=30, h_total_band=100,
+        v_outer_band=70, v_inner_band=30, v_total_band=100,
+        h_outer_penalty_per_m=0.1 / 70, h_inner_penalty_per_m=0.9 / 30,
+        v_outer_penalty_per_m=0.1 / 70, v_inner_penalty_per_m=0.9 / 30,
+    )
+
+
+def polygon(name, lat1, lon1, lat2, lon2, floor, ceiling):
+    return dict(
+        name=name, shape='polygon', floor=floor, ceiling=ceiling, floor_unit='m', ceiling_unit='m',
+        locations=[[lat1, lon1], [lat1, lon2], [lat2, lon2], [lat2, lon1]],
+    )
+
+
+def circle(name, lat, lon, radius, floor, ceiling):
+    return dict(
+        name=name, shape='circle', floor=floor, ceiling=ceiling, floor_unit='m', ceiling_unit='m',
+        location=[lat, lon], radius=radius,
+    )
+
+
+def airspace_check(spaces):
+    lats = [pt[0] for s in spaces for pt in s.get('locations', [s.get('location')])]
+    lons = [pt[1] for s in spaces for pt in s.get('locations', [s.get('location')])]
+    control_area = dict(spaces=spaces, bbox=[[min(lats), min(lons)], [max(lats), max(lons)]])
+    airspace = AirspaceCheck(control_area, check_params(), Geo.from_coords(45.75, 9.9))
+    airspace.get_airspace_details()
+    return airspace
+
+
+def test_index_candidates_at_cell_borders():
+    '''spaces crossing cell borders at 45.8 N and 9.9 E'''
+    airspace = airspace_check(
+        [
+            polygon('EDGE', 45.79, 9.89, 45.81, 9.91, 0, 1000),
+            circle('CORNER', 45.8, 9.9, 500, 500, 2000),
+            polygon('FAR', 45.5, 9.5, 45.52, 9.52, 0, 1000),
+        ]
+    )
+    index = airspace.index
+    assert not index.large
+    steps = [-0.0201, -0.0101, -0.0011, -1e-9, 0, 1e-9, 0.0011, 0.0101, 0.0201]
+    for d_lat in steps:
+        for d_lon in steps:
+            fix = GNSSFix(0, 45.8 + d_lat, 9.9 + d_lon, 'A', 0, 0, 0, '')
+            candidates = index.candidates(fix.lat, fix.lon)
+            assert list(candidates) == sorted(candidates)
+            '''every space whose bbox contains the position is a candidate'''
+            assert all(i in candidates for i, s in enumerate(airspace.spaces) if in_bbox(s['bbox'], fix))
+            assert 2 not in candidates
+    '''cells not covered by any bbox have no candidates'''
+    assert index.candidates(45.95, 9.95) == ()
+    assert index.candidates(45.7, 9.7) == ()
+
+
+def test_index_large_spaces():
+    '''a space covering more than max_cells cells is a candidate everywhere, without filling the grid'''
+    airspace = airspace_check(
+        [
+            polygon('SMALL', 45.79, 9.89, 45.81, 9.91, 0, 1000),
+            polygon('LARGE', 44.0, 8.0, 47.0, 11.0, 1700, 3000),
+        ]
+    )
+    index = airspace.index
+    (lat1, lon1), (lat2, lon2) = airspace.spaces[1]['bbox']
+    rows = index.cell(lat2) - index.cell(lat1) + 1
+    cols = index.cell(lon2) - index.cell(lon1) + 1
+    assert rows * cols > AirspaceIndex.max_cells
+    assert index.large == [1]
+    assert all(1 not in cell for cell in index.cells.values())
+    assert index.candidates(45.8, 9.9) == (0, 1)
+    assert index.candidates(45.0, 9.0) == (1,)
+    assert index.candidates(-33.0, 151.0) == (1,)
+
+
+def test_airspace_check_pickle():
+    '''prepared geometries cannot be pickled, unpickled object creates the index again'''
+    airspace = airspace_check(
+        [
+            polygon('P1', 45.73, 9.94, 45.75, 9.96, 0, 1500),
+            circle('C1', 45.784, 9.791, 1000, 0, 1000),
+        ]
+    )
+    fixes = [GNSSFix(0, 45.74, 9.95, 'A', 1400, 1400, 0, ''), GNSSFix(1, 45.784, 9.795, 'A', 980, 980, 1, '')]
+    unpickled = pickle.loads(pickle.dumps(airspace))
+    assert unpickled._index is None
+    index = unpickled.index
+    assert isinstance(index, AirspaceIndex)
+    assert index.cells == airspace.index.cells
+    assert [unpickled.check_fix(fix) for fix in fixes] == [airspace.check_fix(fix) for fix in fixes]
+    assert all(result[0] for result in unpickled.check_track(fixes))
+
+
+@pytest.mark.parametrize('vectorised', [True, False])
+def test_check_track(monkeypatch, vectorised):
+    '''overlapping polygons and circles crossed by track, one covering the whole track'''
+    spaces = [
+        polygon('P1', 45.73, 9.94, 45.75, 9.96, 0, 1500),
+        polygon('P2', 45.735, 9.93, 45.76, 9.97, 1400, 3000),
+        circle('C1', 45.784, 9.791, 1000, 0, 1000),
+        circle('C2', 45.80, 9.90, 3000, 1350, 5000),
+        polygon('LARGE', 44.0, 8.0, 47.0, 11.0, 1700, 3000),
+    ]
+    flight = Track.create_from_file(Path('/app/tests/data/test_igc_2.igc'))
+    alts = [fix.press_alt if fix.rawtime % 2 else None for fix in flight.fixes]
+
+    '''fix by fix, checking every space of control area'''
+    monkeypatch.setattr(AirspaceIndex, 'max_cells', 0)
+    airspace = airspace_check(spaces)
+    assert airspace.index.large == [0, 1, 2, 3, 4]
+    expected = [airspace.check_fix(fix, alt) for fix, alt in zip(flight.fixes, alts)]
+    infringements = {(plot[2], plot[3]) for plot, penalty in expected if plot}
+    assert {x[1] for x in infringements} == {'warning', 'penalty', 'full penalty'}
+    assert {x[0] for x in infringements} == {s['name'] for s in spaces}
+    monkeypatch.undo()
+
+    if not vectorised:
+        '''shapely < 2.0'''
+        monkeypatch.delattr('shapely.contains_xy')
+    airspace = airspace_check(spaces)
+    assert [airspace.check_fix(fix, alt) for fix, alt in zip(flight.fixes, alts)] == expected
+    assert airspace.check_track(flight.fixes, alts) == expected
+    assert airspace.check_track([]) == []
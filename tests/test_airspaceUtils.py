@@ -1,7 +1,7 @@
 import airspaceUtils
 import pytest
 # from mock import patch
-from pilot.track import GNSSFix
+from igc_lib import GNSSFix
 
 
 # def test_read_openair():
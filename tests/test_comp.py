@@ -33,4 +33,87 @@ class TestComp:
     # @patch('comp.create_comp_path', autospec=True, spec_set=True)
     # def test_create_path(self, mock_db, mock_path):
     #     self.comp.create_path()
-    #     assert self.comp.pa
\ No newline at end of file
+    #     assert self.comp.pa
+
+@patch('task.TaskFormula.read', return_value=None)
+def test_task_scores(mock_formula):
+    import json
+    from comp import TaskScores
+    from result import CompResult
+    from task import Task
+
+    with open('/app/tests/data/test_results.json') as f:
+        data = json.load(f)
+    task = Task.create_from_json(task_id=149, data=json.loads(json.dumps(data)))
+    scores = TaskScores.from_json_data(149, data)
+    for key in CompResult.task_list + TaskScores.stats_list:
+        assert getattr(scores, key) == getattr(task, key)
+    assert scores.is_valid() == task.is_valid()
+    assert scores.scores == {p.par_id: p.score or 0 for p in task.pilots}
+
+
+def reference_final_scores(comp, cd=0):
+    """per pilot implementation of Comp.get_final_scores, used to check matrix implementation"""
+    from calcUtils import c_round
+
+    val = comp.formula.overall_validity
+    param = comp.formula.validity_param
+    avail_validity = comp.avail_validity
+    td = comp.formula.task_result_decimal
+    for pil in comp.results:
+        pil['score'] = 0
+        if not ((val == 'all') or (val == 'round' and comp.dropped_tasks == 0) or (len(comp.tasks) < 2)):
+            sorted_results = sorted(pil['results'].items(), key=lambda x: (x[1]['perf'], x[1]['pre']), reverse=True)
+            if val == 'round' and len(comp.tasks) >= param:
+                for i in range(comp.dropped_tasks):
+                    idx = sorted_results.pop()[0]
+                    pil['results'][idx]['score'] = 0
+            elif val == 'ftv' and len(comp.tasks) > 1:
+                pval = avail_validity
+                for idx, s in sorted_results:
+                    if not (pval > 0):
+                        pil['results'][idx]['score'] = 0
+                    else:
+                        tval = next(t.ftv_validity for t in comp.tasks if t.task_code == idx)
+                        if pval > tval:
+                            pval -= tval
+                        else:
+                            pil['results'][idx]['score'] = c_round(pil['results'][idx]['score'] * (pval / tval), td)
+                            pval = 0
+        pil['score'] = c_round(sum(pil['results'][x]['score'] for x in pil['results'].keys()), cd)
+    comp.results = sorted(comp.results, key=lambda x: x['score'], reverse=True)
+
+
+def test_get_final_scores():
+    import copy
+    import random
+    from calcUtils import c_round
+    from comp import Comp, TaskScores
+    from formula import Formula
+
+    rnd = random.Random(7)
+    for case in range(120):
+        comp = Comp(comp_id=1)
+        comp.formula = Formula(comp_id=1)
+        comp.formula.overall_validity = ['all', 'round', 'ftv'][case % 3]
+        comp.formula.validity_param = [2, 3, 0.6, 0.8, 1][case % 5] if case % 3 == 2 else [2, 3, 4][case % 3]
+        comp.formula.task_result_decimal = td = case % 2
+        num_tasks = rnd.randint(1, 9)
+        comp.tasks = [
+            TaskScores(idx, task_code=f'T{idx}', ftv_validity=rnd.choice([1.0, 0.9512, rnd.random()]))
+            for idx in range(1, num_tasks + 1)
+        ]
+        for idx in range(rnd.randint(1, 40)):
+            results = {}
+            for t in comp.tasks:
+                '''many equal results, to check order of ties'''
+                s = c_round(rnd.choice([0, 1000 * t.ftv_validity, rnd.random() * 1000 * t.ftv_validity]), td)
+                results[t.task_code] = {'pre': s, 'perf': c_round(s / (t.ftv_validity * 1000), td + 3), 'score': s}
+            if idx % 10 == 9:
+                results.pop('T1')
+            comp.results.append(dict(par_id=idx, results=results))
+        reference = copy.deepcopy(comp)
+        reference_final_scores(reference, case % 2)
+        comp.get_final_scores(case % 2)
+        assert comp.results == reference.results
+        assert [type(p['score']) for p in comp.results] == [type(p['score']) for p in reference.results]
@@ -114,4 +114,27 @@ def test_get_admin_comps(monkeypatch):
 # @patch.object()
 # def test_get_comp():
 #     comp = compUtils.get_comp(1)
-#     assert comp.comp_id == 1
\ No newline at end of file
+#     assert comp.comp_id == 1
+
+def test_find_orphan_pilots():
+    def pilot(pil_id, par_id, comp_id, name, civl_id=None):
+        return dict(comp_ids=[comp_id], par_ids=[par_id], pil_id=pil_id, civl_id=civl_id, name=name, results=[])
+
+    def orphan(par_id, comp_id, name, civl_id=None):
+        return dict(par_id=par_id, comp_id=comp_id, pil_id=None, name=name, civl_id=civl_id)
+
+    pilots = [pilot(1, 10, 1, 'John Smith'), pilot(2, 20, 1, 'Jane Doe', 1234)]
+    orphans = [orphan(11, 2, 'John Smith'), orphan(21, 2, 'J. Doe', 1234), orphan(30, 2, 'Mark Black')]
+    '''previous guesses are used without looking for pilots in database'''
+    matches = {30: None}
+    pilots_list, still_orphans = frontendUtils.find_orphan_pilots(pilots, orphans, matches)
+    assert pilots_list[0]['par_ids'] == [10, 11]
+    assert pilots_list[1]['par_ids'] == [20, 21]
+    assert [p['par_id'] for p in still_orphans] == [30]
+    assert matches == {11: 1, 21: 2, 30: None}
+
+    pilots = [pilot(1, 10, 1, 'John Smith'), pilot(2, 20, 1, 'Jane Doe', 1234)]
+    orphans = [orphan(11, 2, 'Johnny Smith'), orphan(30, 2, 'Mark Black')]
+    pilots_list, still_orphans = frontendUtils.find_orphan_pilots(pilots, orphans, matches)
+    assert pilots_list[0]['par_ids'] == [10, 11]
+    assert [p['par_id'] for p in still_orphans] == [30]
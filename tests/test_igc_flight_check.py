@@ -38,3 +38,233 @@ def test_track_flight_check():
     assert achieved.altitude == 1445.0
     assert math.isclose(float(achieved.lat), 45.8145667, abs_tol=0.0000001)  # ~0.01 meters
     assert math.isclose(float(achieved.lon), 9.7707167, abs_tol=0.0000001)  # ~0.01 meters
+
+
+def test_track_fingerprint():
+    from pilot.flightresult import track_fingerprint
+
+    task = factory_objects.test_task()
+    file = Path('/app/tests/data/test_igc_2.igc')
+    fingerprint = track_fingerprint(task.check_hash(), file)
+    assert len(fingerprint) == 64
+    assert fingerprint == track_fingerprint(task.check_hash(), file)
+    assert fingerprint.startswith(task.check_hash())
+    assert fingerprint[32:] != track_fingerprint(task.check_hash(), Path('/app/tests/data/test_igc_1.igc'))[32:]
+    task.turnpoints[1].radius += 100
+    assert not fingerprint.startswith(task.check_hash())
+
+
+def test_check_hash_config_file_content(tmp_path, monkeypatch):
+    import os
+
+    monkeypatch.setattr('task.IGCPARSINGCONFIG', str(tmp_path))
+    config_file = Path(tmp_path, 'custom.yaml')
+    config_file.write_text('min_fixes: 50\n')
+    task = factory_objects.test_task()
+    task.igc_config_file = 'custom'
+    task_hash = task.check_hash()
+    assert task_hash == task.check_hash()
+    '''config file edited keeping the same name'''
+    config_file.write_text('min_fixes: 20\n')
+    os.utime(config_file, ns=(0, 0))
+    assert task.check_hash() != task_hash
+
+
+def test_lead_coeff_from_series():
+    from flightcheck.flightcheck import check_fixes
+    from flightcheck.flightpointer import FlightPointer
+    from formulas.libs.leadcoeff import LeadCoeff
+
+    test_track = Track.create_from_file(Path('/app/tests/data/test_igc_2.igc'))
+    '''landed out before ESS'''
+    test_track.fixes = test_track.fixes[: len(test_track.fixes) * 4 // 5]
+    tasks = {}
+    fixed_lc = {}
+    for comp_class in ('HG', 'PG'):
+        task = factory_objects.test_task()
+        task.formula.formula_name = 'GAP2020'
+        task.comp_class = comp_class
+        test_result = FlightResult()
+        test_result.check_flight(flight=test_track, task=task, print=lambda *args, **kwargs: None)
+        tasks[comp_class], fixed_lc[comp_class] = task, test_result.fixed_LC
+    assert 0 < fixed_lc['PG'] < fixed_lc['HG']
+
+    test_result = FlightResult(first_time=test_track.fixes[0].rawtime)
+    lead_coeff = LeadCoeff(tasks['HG'])
+    check_fixes(
+        test_result, test_track.fixes, tasks['HG'], FlightPointer(tasks['HG']), lead_coeff, print=lambda *args: None
+    )
+    assert lead_coeff.summing == fixed_lc['HG']
+    assert lead_coeff.best_dist_to_ess_m > 0
+    '''LC with a different formula, from recorded series'''
+    assert LeadCoeff.from_series(tasks['PG'], lead_coeff.series).summing == fixed_lc['PG']
+
+
+def test_track_series(tmp_path, monkeypatch):
+    from shutil import copyfile
+    from unittest import mock
+
+    from flightcheck.trackseries import TrackSeries
+    from igc_lib import FlightParsingConfig
+
+    task = factory_objects.test_task()
+    task.comp_path, task.task_path = 'comp', 'task'
+    monkeypatch.setattr('task.TRACKDIR', str(tmp_path))
+    Path(task.file_path).mkdir(parents=True)
+    copyfile('/app/tests/data/test_igc_2.igc', Path(task.file_path, 'test_igc_2.igc'))
+    test_track = Track.create_from_file(Path(task.file_path, 'test_igc_2.igc'))
+    attributes = ('distance_flown', 'SSS_time', 'ESS_time', 'real_start_time', 'best_distance_time', 'fixed_LC')
+
+    test_result = FlightResult()
+    test_result.check_flight(flight=test_track, task=task, print=lambda *args: None)
+    assert TrackSeries.read(task, 'test_igc_2.igc') is None
+    series = TrackSeries.from_flight(task, 'test_igc_2.igc', test_track)
+    series_result = FlightResult()
+    series_result.check_flight(flight=test_track, task=task, print=lambda *args: None, series=series)
+    series.save()
+
+    '''check again from stored series, without calculating distances'''
+    series = TrackSeries.read(task, 'test_igc_2.igc')
+    assert len(series) == len(test_track.fixes)
+    with mock.patch('route.get_fix_dist_to_goal', side_effect=AssertionError):
+        stored_result = FlightResult()
+        stored_result.check_flight(flight=series.flight(), task=task, print=lambda *args: None, series=series)
+    assert not series.changed
+    for result in (series_result, stored_result):
+        assert all(getattr(result, x) == getattr(test_result, x) for x in attributes)
+        assert [w.rawtime for w in result.waypoints_achieved] == [w.rawtime for w in test_result.waypoints_achieved]
+
+    '''crossings calculated checking stored series are stored'''
+    removed = max(series.crossings)
+    del series.crossings[removed]
+    FlightResult().check_flight(flight=series.flight(), task=task, print=lambda *args: None, series=series)
+    assert series.changed
+    series.save()
+    assert removed in TrackSeries.read(task, 'test_igc_2.igc').crossings
+
+    '''series are not valid with different IGC parsing parameters, or a different route'''
+    config = FlightParsingConfig()
+    config.min_gsp_flight += 1
+    assert TrackSeries.read(task, 'test_igc_2.igc', config) is None
+    task.turnpoints[1].radius += 100
+    assert TrackSeries.read(task, 'test_igc_2.igc') is None
+
+
+def test_fixed_lc_from_stored_series(tmp_path, monkeypatch):
+    from shutil import copyfile
+
+    from flightcheck.trackseries import TrackSeries
+    from pilot.flightresult import track_fingerprint, update_fixed_lc
+
+    task = factory_objects.test_task()
+    task.comp_path, task.task_path = 'comp', 'task'
+    monkeypatch.setattr('task.TRACKDIR', str(tmp_path))
+    Path(task.file_path).mkdir(parents=True)
+    file = Path(task.file_path, 'test_igc_2.igc')
+    copyfile('/app/tests/data/test_igc_2.igc', file)
+    test_track = Track.create_from_file(file)
+
+    '''check with classic LC, and store Leading Coefficient series with check fingerprint'''
+    series = TrackSeries.from_flight(task, 'test_igc_2.igc', test_track)
+    test_result = FlightResult(track_file='test_igc_2.igc')
+    test_result.check_flight(flight=test_track, task=task, print=lambda *args: None, series=series)
+    fingerprint = track_fingerprint(task.check_hash(), file)
+    series.set_lc_key(fingerprint)
+    series.save()
+
+    '''formula library and lead factor changes do not need tracks to be checked again'''
+    task.formula.formula_name = 'GAP2020'
+    task.formula.lead_factor = 2.0
+    assert track_fingerprint(task.check_hash(), file) == fingerprint
+    checked = FlightResult()
+    checked.check_flight(flight=test_track, task=task, print=lambda *args: None)
+    assert checked.fixed_LC != test_result.fixed_LC
+    test_result.fingerprint = fingerprint
+    assert update_fixed_lc(task, test_result)
+    assert test_result.fixed_LC == checked.fixed_LC
+
+    '''series recorded with a different check are not used'''
+    test_result.fingerprint = 'x' * 64
+    assert not update_fixed_lc(task, test_result)
+
+
+def test_verify_all_tracks_workers(tmp_path, monkeypatch):
+    from shutil import copyfile, rmtree
+
+    import jsonpickle
+    import numpy as np
+
+    from mapUtils import read_map_file
+    from pilot.flightresult import verify_all_tracks
+
+    monkeypatch.setattr('task.TRACKDIR', str(Path(tmp_path, 'tracks')))
+    monkeypatch.setattr('Defines.MAPOBJDIR', str(Path(tmp_path, 'map')))
+    checked = {}
+    for workers in (1, 2):
+        task = factory_objects.test_task()
+        task.comp_path, task.task_path, task.igc_config_file = 'comp', 'task', 'standard'
+        Path(task.file_path).mkdir(parents=True)
+        task.pilots = []
+        for par_id, track_file in enumerate(('test_igc_1.igc', 'test_igc_2.igc'), 1):
+            copyfile(f'/app/tests/data/{track_file}', Path(task.file_path, track_file))
+            task.pilots.append(FlightResult(par_id=par_id, ID=par_id, name=f'pilot {par_id}', track_file=track_file))
+        messages = []
+        verify_all_tracks(
+            task, task.formula.get_lib(), print=lambda *args: messages.append(' '.join(map(str, args))), workers=workers
+        )
+        series = {}
+        for file in sorted(Path(task.file_path).glob('*.series.npz')):
+            with np.load(file) as data:
+                series[file.name] = {x: data[x] for x in data.files}
+        map_path = Path(tmp_path, 'map', 'tracks', str(task.id))
+        map_files = {
+            file.name: read_map_file(Path(map_path, file.stem) if file.suffix in ('.gz', '.br') else file)
+            for file in sorted(map_path.iterdir())
+        }
+        checked[workers] = (jsonpickle.encode(task.pilots, unpicklable=False), messages, series, map_files)
+        rmtree(tmp_path / 'tracks')
+        rmtree(tmp_path / 'map')
+
+    serial, parallel = checked[1], checked[2]
+    assert len(serial[2]) == 2 and len(serial[3]) == 2
+    assert '2/2|track_counter' in serial[1]
+    assert serial[0] == parallel[0]
+    assert serial[1] == parallel[1]
+    np.testing.assert_equal(serial[2], parallel[2])
+    assert serial[3] == parallel[3]
+
+
+def test_track_lod_file_created_on_request(tmp_path, monkeypatch):
+    from shutil import copyfile
+    from unittest import mock
+
+    from flightcheck.trackseries import TrackSeries
+    from mapUtils import map_file_exists
+    from trackUtils import check_flight, read_track_lod_file
+
+    task = factory_objects.test_task()
+    task.comp_path, task.task_path = 'comp', 'task'
+    monkeypatch.setattr('task.TRACKDIR', str(tmp_path))
+    monkeypatch.setattr('Defines.MAPOBJDIR', str(tmp_path))
+    monkeypatch.setattr('trackUtils.MAPOBJDIR', str(tmp_path))
+    Path(task.file_path).mkdir(parents=True)
+    copyfile('/app/tests/data/test_igc_2.igc', Path(task.file_path, 'test_igc_2.igc'))
+    test_track = Track.create_from_file(Path(task.file_path, 'test_igc_2.igc'))
+    result = FlightResult(par_id=1, ID=1, name='pilot', track_file='test_igc_2.igc')
+    series = TrackSeries.from_flight(task, 'test_igc_2.igc', test_track)
+    check_flight(result, test_track, task, print=lambda *args: None, series=series)
+    lod_file = Path(tmp_path, 'tracks', str(task.id), '1.lod')
+    assert not map_file_exists(lod_file)
+
+    '''level of detail file is created from stored series when first requested'''
+    monkeypatch.setattr('task.Task.read', lambda task_id: task)
+    monkeypatch.setattr('pilot.flightresult.FlightResult.read', lambda par_id, task_id: result)
+    with mock.patch('pilot.track.Track.process', side_effect=AssertionError):
+        lod = read_track_lod_file(1, task.id)
+    assert map_file_exists(lod_file)
+    assert lod['SSS_time'] == result.SSS_time
+    assert all(wp.rawtime in level['rawtime'] for level in lod['levels'] for wp in result.waypoints_achieved)
+
+    '''checking track again removes level of detail file'''
+    check_flight(result, test_track, task, print=lambda *args: None)
+    assert not map_file_exists(lod_file)
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import unquote
+
+import factory_objects
+import pytest
+from livetracking import CycleTimer, get_livetracks, get_session, run_concurrently
+
+
+class MockFlymasterHandler(BaseHTTPRequestHandler):
+    """answers getLiveData requests with 100 fixes for each requested tracker, flying north from test task launch"""
+
+    delay = 0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        trackers = json.loads(unquote(self.path.split('trackers=', 1)[1]))
+        response = {
+            live: [
+                dict(d=int(t) + i, ai=2742774 + 10 * i, oi=596216, h=961, c=920, s=500, b=0, v=30)
+                for i in range(100)
+            ]
+            for live, t in trackers.items()
+        }
+        content = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockFlymasterServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        """client closed connection after timeout"""
+        pass
+
+
+@pytest.fixture
+def flymaster_server(monkeypatch):
+    server = MockFlymasterServer(('127.0.0.1', 0), MockFlymasterHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr('Defines.FM_LIVE', f'http://127.0.0.1:{server.server_port}/getLiveData.php?trackers=')
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def live_task_and_pilots(number):
+    task = SimpleNamespace(track_source='flymaster', date=date(2020, 7, 18), window_open_time=36000)
+    pilots = [SimpleNamespace(live_id=str(1000 + i), first_time=None, last_time=None) for i in range(number)]
+    return task, pilots
+
+
+def test_get_livetracks(flymaster_server):
+    task, pilots = live_task_and_pilots(200)
+    timestamp = int(time.time())
+    response = get_livetracks(task, pilots, timestamp, 60, session=get_session(), timeout=(1, 5))
+    assert len(response) == 200
+    assert all(len(fixes) == 100 for fixes in response.values())
+    assert response['1000'][0]['d'] == timestamp - 60
+
+
+def test_get_livetracks_timeout(flymaster_server, monkeypatch):
+    monkeypatch.setattr(MockFlymasterHandler, 'delay', 1)
+    task, pilots = live_task_and_pilots(2)
+    started = time.perf_counter()
+    assert get_livetracks(task, pilots, int(time.time()), 60, session=get_session(), timeout=(1, 0.2)) is None
+    assert time.perf_counter() - started < 1
+
+
+def test_run_concurrently():
+    '''checks run concurrently: each one waits for the others of its group to start'''
+    barrier = threading.Barrier(4, timeout=5)
+
+    def check(item):
+        barrier.wait()
+        return item * 2
+
+    timer = CycleTimer(10)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results, deferred = asyncio.run(run_concurrently(list(range(8)), check, timer, executor, workers=4))
+    assert results == [i * 2 for i in range(8)]
+    assert deferred == []
+
+    '''checks not started when budget is over are deferred'''
+    barrier = threading.Barrier(2, timeout=5)
+
+    def check_over_budget(item):
+        barrier.wait()
+        timer.budget = 0
+        return item * 2
+
+    timer = CycleTimer(10)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results, deferred = asyncio.run(
+            run_concurrently(list(range(8)), check_over_budget, timer, executor, workers=2)
+        )
+    assert results == [0, 2] + [None] * 6
+    assert deferred == list(range(2, 8))
+    timer.lap('check')
+    assert 'check' in timer.stages
+
+
+@pytest.fixture
+def live_tracking(tmp_path, monkeypatch):
+    from livetracking import LiveResult, LiveTracking, create_igc_file
+
+    monkeypatch.setattr('task.TRACKDIR', str(Path(tmp_path, 'tracks')))
+    monkeypatch.setattr('livetracking.LIVETRACKDIR', str(tmp_path))
+    monkeypatch.setattr('livetracking.Logger', lambda *args: None)
+    task = factory_objects.test_task()
+    task.comp_path, task.task_path, task.track_source = 'comp', 'task', 'flymaster'
+    Path(task.file_path).mkdir(parents=True)
+    task.calculate_task_length()
+    task.calculate_optimised_task_length()
+    task.pilots = [LiveResult(par_id=i, ID=i, name=f'pilot {i}', live_id=str(1000 + i)) for i in range(1, 4)]
+    for p in task.pilots:
+        create_igc_file(p, task)
+        p.result_type = 'lo'
+    '''test mode, cycle time is 30 minutes after start'''
+    init_timestamp = int(time.time()) - (task.start_time + 1800 - task.window_open_time)
+    livetrack = LiveTracking(task, None, test=True, init_timestamp=init_timestamp)
+    livetrack.create_result()
+    return livetrack
+
+
+def read_live_json(livetrack):
+    return json.loads(livetrack.filename.read_text())
+
+
+def test_run_cycle(flymaster_server, live_tracking, monkeypatch):
+    import livetracking
+
+    livetrack = live_tracking
+    track_files = [Path(livetrack.task.file_path, p.track_file) for p in livetrack.pilots]
+    headers = [file.read_text() for file in track_files]
+
+    '''budget is over before checks: fixes are fetched, and checks are deferred without consuming them'''
+    monkeypatch.setattr(livetracking, 'CYCLE_BUDGET', 0)
+    assert asyncio.run(livetrack.run_cycle(60)) == []
+    result = read_live_json(livetrack)
+    assert list(result['file_stats']['cycle_timing']) == ['read', 'fetch', 'associate', 'check']
+    assert all(not p.livetrack for p in livetrack.pilots)
+    assert all(not d['first_time'] and not d['last_time'] for d in result['data'])
+    assert [file.read_text() for file in track_files] == headers
+
+    '''fixes are associated to pilots, checked in worker processes, and appended to track files'''
+    monkeypatch.setattr(livetracking, 'CYCLE_BUDGET', 0.8)
+    assert asyncio.run(livetrack.run_cycle(60)) == []
+    result = read_live_json(livetrack)
+    '''fixes are between cycle start time minus interval, and now'''
+    first_fix, now = livetrack.task.start_time + 1800 - 60, livetrack.now - livetrack.unix_date
+    assert list(result['file_stats']['cycle_timing']) == ['read', 'fetch', 'associate', 'check']
+    for p, d, file, header in zip(livetrack.pilots, result['data'], track_files, headers):
+        assert d['par_id'] == p.par_id
+        assert len(p.livetrack) > livetracking.config.min_fixes
+        assert first_fix <= d['first_time'] <= d['last_time'] <= now
+        assert d['last_time'] == p.last_time == p.livetrack[-1].rawtime
+        lines = file.read_text()[len(header):].splitlines()
+        assert len(lines) == len(p.livetrack)
+        assert all(line.startswith('B') for line in lines)
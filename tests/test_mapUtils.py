@@ -0,0 +1,91 @@
+from mapUtils import (
+    decimated_fixes,
+    simplified_fixes,
+    save_map_file,
+    read_map_file,
+    map_file_exists,
+    track_lod_segment,
+    result_to_geojson,
+    create_track_lod,
+    delete_map_file,
+)
+import numpy as np
+from pathlib import Path
+
+
+def test_decimated_fixes():
+    rawtimes = [100, 101, 102, 104, 105, 106, 107, 110, 111, 113, 118]
+    '''one fix every 5 seconds, plus event fixes, interval restarts from last kept fix'''
+    assert decimated_fixes(rawtimes, 5, set()) == [4, 7, 10]
+    assert decimated_fixes(rawtimes, 5, {102, 113}) == [2, 6, 9, 10]
+    assert decimated_fixes(rawtimes, 1, set()) == list(range(1, len(rawtimes)))
+
+
+def test_simplified_fixes():
+    '''straight line with one spike'''
+    lats = np.full(11, 45.0)
+    lons = np.linspace(10.0, 10.01, 11)
+    lats[5] += 0.001
+    rawtimes = list(range(11))
+    assert simplified_fixes(lats, lons, 10, rawtimes, set()) == [0, 4, 5, 6, 10]
+    assert simplified_fixes(lats, lons, 200, rawtimes, {2}) == [0, 2, 10]
+
+
+def test_save_map_file(tmp_path):
+    data = {'tracklog': [[10.1, 45.2, 1000, 990]], 'bounds': [[45.1, 10.0], [45.3, 10.2]]}
+    fullname = tmp_path / '1.track'
+    assert save_map_file(fullname, data, 'gzip') == tmp_path / '1.track.gz'
+    assert map_file_exists(fullname)
+    assert read_map_file(fullname) == data
+    '''saving again uncompressed replaces compressed file'''
+    assert save_map_file(fullname, data, 'none') == fullname
+    assert not (tmp_path / '1.track.gz').is_file()
+    assert read_map_file(fullname) == data
+    delete_map_file(fullname)
+    assert not map_file_exists(fullname)
+
+
+def test_track_lod_segment():
+    def level(tolerance, rawtimes):
+        return {'tolerance': tolerance, 'rawtime': rawtimes, 'lat': [45.0] * len(rawtimes),
+                'lon': [10.0] * len(rawtimes), 'alt': [1000] * len(rawtimes)}
+
+    lod = {'SSS_time': 100, 'goal_time': None,
+           'levels': [level(1000, [0, 50, 100]), level(50, [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100])]}
+    '''coarse level when zoomed out, finest level when zoomed in'''
+    assert track_lod_segment(lod, 5)['tolerance'] == 1000
+    assert track_lod_segment(lod, 12)['tolerance'] == 50
+    assert track_lod_segment(lod, 18)['tolerance'] == 50
+    '''time range includes one fix before and after to link segments'''
+    segment = track_lod_segment(lod, 12, 35, 55)
+    assert segment['rawtime'] == [30, 40, 50, 60]
+    assert len(segment['lat']) == len(segment['lon']) == len(segment['alt']) == 4
+    assert segment['SSS_time'] == 100
+
+
+def test_result_to_geojson_coordinates():
+    import factory_objects
+    from pilot.flightresult import FlightResult
+    from pilot.track import Track
+
+    task = factory_objects.test_task()
+    flight = Track.create_from_file(Path('/app/tests/data/test_igc_2.igc'))
+    result = FlightResult()
+    result.check_flight(flight=flight, task=task, print=lambda *args: None)
+    tracklog = result_to_geojson(result, task, flight)[0]
+    coords = [c for feature in tracklog['features'] for line in feature['geometry']['coordinates'] for c in line]
+    assert len(coords) > len(flight.fixes) / 6
+    assert all(round(lon, 6) == lon and round(lat, 6) == lat for lon, lat, gnss_alt, press_alt in coords)
+    assert all(isinstance(gnss_alt, int) and isinstance(press_alt, int) for lon, lat, gnss_alt, press_alt in coords)
+
+
+def test_create_track_lod():
+    from pilot.track import Track
+
+    flight = Track.create_from_file(Path('/app/tests/data/test_igc_2.igc'))
+    event_time = flight.fixes[5001].rawtime
+    lod = create_track_lod(flight, {event_time}, 45000, None)
+    assert lod['SSS_time'] == 45000 and lod['goal_time'] is None
+    sizes = [len(level['rawtime']) for level in lod['levels']]
+    assert sizes == sorted(sizes) and sizes[-1] < len(flight.fixes)
+    assert all(event_time in level['rawtime'] for level in lod['levels'])
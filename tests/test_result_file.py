@@ -41,3 +41,31 @@ def test_result_file(task=test_task):
                 if hasattr(el, key):
                     assert pilot[key] == getattr(el, key)
 
+
+@patch('task.TaskFormula.read', return_value=None)
+def test_result_store(mock_formula, tmp_path, monkeypatch):
+    import json
+    import result
+    from frontendUtils import get_pretty_data
+
+    monkeypatch.setattr(result, 'RESULTDIR', str(tmp_path))
+    with open('/app/tests/data/test_results.json') as f:
+        content = json.load(f)
+    content['file_stats']['result_type'] = 'task'
+    content['rankings'] = [dict(rank_id=1, rank_name='Overall', rank_type='overall', description='')]
+    with open(tmp_path / 'test_results.json', 'w') as f:
+        json.dump(content, f)
+    assert result.read_result_store('test_results.json') is None
+    '''store is created when formatted results are requested'''
+    pretty = result.get_pretty_result('test_results.json')
+    assert pretty['results'][0]['name'] == "<a class='sex-M' href='/map/1249-149'><b>Markus Baisch</b></a>"
+    assert pretty == get_pretty_data(json.loads(json.dumps(content)))
+    assert result.read_result_store('test_results.json', 'pretty') == pretty
+    assert result.open_json_file('test_results.json') == content
+    assert result.read_result_store('test_results.json', 'comp').scores[1249] == content['results'][0]['score']
+    '''store is not used once json file is modified'''
+    content['info']['task_name'] = 'changed'
+    with open(tmp_path / 'test_results.json', 'w') as f:
+        json.dump(content, f)
+    assert result.read_result_store('test_results.json') is None
+    assert result.get_pretty_result('test_results.json')['info']['task_name'] == 'changed'
@@ -1,7 +1,7 @@
 from route import in_goal_sector, cPoint, get_shortest_path, distance
 from obj_factories import TurnpointFactory, TaskFactory
 import math
-from pilot.track import GNSSFix
+from igc_lib import GNSSFix
 from geo import Geo
 import factory_objects
 
@@ -73,3 +73,78 @@ def test_in_goal_sector():
     assert in_goal_sector(test_task, line) is True
     assert in_goal_sector(test_task, meter_short_of_tolerance) is False
     assert in_goal_sector(test_task, short_but_tolerance) is True
+
+
+def test_distance_array():
+    from route import distance_array, distances_to_point, consecutive_distances
+    import numpy as np
+
+    lats = np.array([t.lat for t in turnpoints] + [short.lat, inside.lat, 41.348])
+    lons = np.array([t.lon for t in turnpoints] + [short.lon, inside.lon, 21.3042])
+    # N fixes to one centre
+    centre = turnpoints[2]
+    for d, lat, lon in zip(distances_to_point(lats, lons, centre), lats, lons):
+        fix = TurnpointFactory(lat=lat, lon=lon)
+        assert math.isclose(d, distance(centre, fix), abs_tol=0.001)
+    # pairwise consecutive
+    for i, d in enumerate(consecutive_distances(lats, lons)):
+        p1 = TurnpointFactory(lat=lats[i], lon=lons[i])
+        p2 = TurnpointFactory(lat=lats[i + 1], lon=lons[i + 1])
+        assert math.isclose(d, distance(p1, p2), abs_tol=0.001)
+    assert distance_array(41.348, 21.3042, 41.348, 21.3042) == 0
+
+
+def test_check_in_radius_array():
+    import numpy as np
+
+    fixes = [short, inside, after_and_out, line]
+    lats = np.array([f.lat for f in fixes])
+    lons = np.array([f.lon for f in fixes])
+    assert goal_tp.in_radius_array(lats, lons, 0, 0).tolist() == [goal_tp.in_radius(f, 0, 0) for f in fixes]
+
+
+def test_tp_made_civl_array():
+    import numpy as np
+    from route import tp_made_civl, tp_made_civl_array
+
+    fixes = [short, inside, after_and_out, line, inside, short]
+    lats = np.array([f.lat for f in fixes])
+    lons = np.array([f.lon for f in fixes])
+    made = tp_made_civl_array(fixes, lats, lons, goal_tp, 0.001, 5).tolist()
+    assert made == [tp_made_civl(a, b, goal_tp, 0.001, 5) for a, b in zip(fixes, fixes[1:])]
+    assert any(made)
+
+
+def test_shortest_path_cache():
+    from route import get_route_cache
+
+    cache = get_route_cache()
+    cache.clear()
+    results = []
+    for _ in range(2):
+        task = factory_objects.test_task()
+        task.create_projection()
+        task.calculate_optimised_task_length()
+        results.append(
+            (
+                task.opt_dist,
+                task.SS_distance,
+                [(p.lat, p.lon) for p in task.optimised_turnpoints],
+                [(p.fx, p.fy) for p in task.projected_turnpoints],
+                task.distances_to_go,
+            )
+        )
+    assert results[0] == results[1]
+    assert len(cache.items) == 3
+
+
+def test_route_cache_lru():
+    from route import RouteCache
+
+    cache = RouteCache(size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
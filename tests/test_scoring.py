@@ -90,6 +90,11 @@ def test_diff_calc():
     assert len(diff) == kmx10r
     assert diff[kmx10 + 1].diff_score == 0.5
     assert diff[kmx10 - 1].diff_score < 0.5
+    '''slots are read from difficulty arrays'''
+    assert [(s.dist_x10, s.diff, s.diff_score) for s in diff] == list(
+        zip(range(len(diff)), diff.diff.tolist(), diff.diff_score.tolist())
+    )
+    assert all(a <= b for a, b in zip(diff.diff_score, diff.diff_score[1:]))
 
     '''max distance shorter than min_dist'''
     short = [p for p in pilots if 0 < p.distance < test_task.formula.min_dist]
@@ -175,6 +180,107 @@ def test_score_calculation():
     assert math.isclose(test_task.min_lead_coeff, stats.get('min_lead_coeff'), abs_tol=0.0001)
 
 
+def test_task_statistics_snapshot():
+    """statistics are kept between readings, and calculated again when pilots results change"""
+    from unittest.mock import patch
 
+    test_task, pilots, _ = read_test_results()
+    test_task.pilots = pilots
+    lib = test_task.formula.get_lib()
+    lib.calculate_results(test_task)
+
+    def reference():
+        valid = [p for p in pilots if p.result_type not in ('abs', 'dnf', 'nyp')]
+        ess = [p for p in valid if p.ESS_time and p.ESS_time > 0]
+        return dict(
+            pilots_launched=len([p for p in pilots if p.result_type not in ('abs', 'dnf')]),
+            pilots_ess=len(ess),
+            pilots_goal=len([p for p in valid if p.goal_time and p.goal_time > 0]),
+            fastest=min((p.ss_time for p in ess), default=None),
+            max_distance=max(max((p.distance for p in valid), default=0), test_task.formula.min_dist or 0),
+            min_lead_coeff=min((p.lead_coeff for p in valid if p.SSS_time and p.SSS_time > 0), default=None),
+            max_score=max((p.score for p in valid if p.score is not None), default=None),
+        )
+
+    assert {k: getattr(test_task, k) for k in reference()} == reference()
+
+    '''statistics are read from snapshot while results do not change'''
+    with patch.object(type(test_task), '_results_lists', side_effect=AssertionError) as lists:
+        for _ in pilots:
+            _ = test_task.fastest, test_task.max_distance, test_task.pilots_ess
+        '''changing attributes not used in statistics'''
+        pilots[0].distance_score = 1
+        pilots[0].goal_time = pilots[0].goal_time or 0
+        _ = test_task.valid_results
+    lists.assert_not_called()
+
+    '''changing results'''
+    fastest = next(p for p in pilots if p.ESS_time and p.ss_time == test_task.fastest)
+    fastest.ESS_time += 3600
+    winner = max((p for p in pilots if p.score is not None), key=lambda p: p.score)
+    winner.score += 100
+    best = max((p for p in pilots if p.result_type not in ('abs', 'dnf', 'nyp')), key=lambda p: p.distance)
+    best.distance_flown = best.distance + 1000
+    last = next(p for p in pilots if p.result_type not in ('abs', 'dnf'))
+    last.result_type = 'dnf'
+    assert {k: getattr(test_task, k) for k in reference()} == reference()
+    '''changing pilots list'''
+    test_task.pilots = pilots = pilots[:10]
+    assert {k: getattr(test_task, k) for k in reference()} == reference()
 
 
+def test_batch_points_allocation():
+    """scores allocated to all pilots at once are the same of scores allocated to each pilot"""
+    from formulas.libs.allocation import allocate_points, formula_sweep
+
+    attributes = ('distance_score', 'time_score', 'arrival_score', 'departure_score', 'penalty', 'score', 'goal_time')
+    variants = [
+        {},
+        {'formula_distance': 'on', 'formula_arrival': 'time', 'no_goal_penalty': 1.0},
+        {'formula_arrival': 'off', 'formula_departure': 'off', 'no_goal_penalty': 0.0},
+    ]
+    for name in ('GAP2016', 'GAP2018', 'GAP2020', 'GAP2021', 'GAP2022', 'PWC2016', 'PWC2017', 'PWC2019'):
+        for variant in variants:
+            test_task, pilots, _ = read_test_results()
+            test_task.formula.as_dict().update(dict(formula_name=name, **variant))
+            valid = [p for p in pilots if p.result_type not in ('abs', 'dnf', 'nyp')]
+            first_ess = min(p.ESS_time for p in valid if p.ESS_time)
+            for p in valid:
+                p.time_after = p.ESS_time - first_ess if p.ESS_time else None
+            '''penalties and bonuses'''
+            for p, (notification_type, flat, perc) in zip(
+                valid[::5], [('jtg', 120, 0), ('custom', 50, 0), ('custom', -30, 0), ('auto', 0, 0.2), ('jtg', 900, 0)]
+            ):
+                p.notifications = [
+                    obj_factories.NotificationFactory(
+                        notification_type=notification_type, flat_penalty=flat, percentage_penalty=perc
+                    )
+                ]
+            test_task.pilots = pilots
+            lib = test_task.formula.get_lib()
+            lib.calculate_results(test_task)
+            lib.points_allocation(test_task, batch=False)
+            expected = [[getattr(p, a) for a in attributes] for p in valid]
+
+            assert allocate_points(test_task, lib, lib.calculate_min_dist_score(test_task))
+            assert [[getattr(p, a) for a in attributes] for p in valid] == expected, (name, variant)
+
+    '''formula sweep'''
+    test_task, pilots, _ = read_test_results()
+    test_task.pilots = pilots
+    lib = test_task.formula.get_lib()
+    lib.calculate_results(test_task)
+    scores = [p.score for p in test_task.valid_results]
+    day_quality = test_task.day_quality
+    sweep = formula_sweep(
+        test_task, [{}, {'no_goal_penalty': 1.0}, {'formula_arrival': 'off'}, {'nominal_dist': 20000}]
+    )
+    assert sweep[0]['score'].tolist() == scores
+    assert sweep[0]['day_quality'] == day_quality
+    assert sweep[1]['score'].sum() < sweep[0]['score'].sum()
+    assert not sweep[2]['arrival_score'].any()
+    assert sweep[3]['day_quality'] != day_quality
+    '''task is not changed'''
+    assert test_task.day_quality == day_quality
+    assert test_task.formula.no_goal_penalty == 0.2
+    assert [p.score for p in test_task.valid_results] == scores
@@ -46,3 +46,68 @@ def test_validate_G_record_error(monkeypatch):
 
     result = validate_G_record('/app/tests/data/non_existant.igc')
     assert result == "ERROR"
+
+
+def test_zip_tracks(tmp_path):
+    from pathlib import Path
+    from zipfile import ZipFile
+    from pilot.track import Track
+    from trackUtils import get_zip_tracks
+
+    archive = tmp_path / 'tracks.zip'
+    with ZipFile(archive, 'w') as z:
+        z.write('/app/tests/data/test_igc_2.igc', 'folder/pilot.123.igc')
+        z.write('/app/tests/data/test_igc_2.igc', '__MACOSX/folder/._pilot.123.igc')
+        z.writestr('readme.txt', 'not a track')
+    with ZipFile(archive) as z:
+        tracks = get_zip_tracks(z)
+        assert [t.name for t in tracks] == ['pilot.123.igc']
+        track = Track.create_from_file(tracks[0])
+    reference = Track.create_from_file(Path('/app/tests/data/test_igc_2.igc'))
+    assert [(f.rawtime, f.lat, f.lon, f.gnss_alt) for f in track.fixes] == [
+        (f.rawtime, f.lat, f.lon, f.gnss_alt) for f in reference.fixes
+    ]
+
+
+def test_validate_G_record_archive(monkeypatch, tmp_path):
+    from zipfile import ZipFile
+    from trackUtils import get_zip_tracks
+
+    def mock_post(*args, **kwargs):
+        assert kwargs['files']['igcfile'].read()
+        return MockResponsePASS()
+
+    monkeypatch.setattr(requests, "post", mock_post)
+    archive = tmp_path / 'tracks.zip'
+    with ZipFile(archive, 'w') as z:
+        z.write('/app/tests/data/test_G_record_PASS.igc', 'test_G_record_PASS.igc')
+    with ZipFile(archive) as z:
+        assert validate_G_record(get_zip_tracks(z)[0]) == "PASSED"
+
+
+def test_pilot_matcher():
+    from types import SimpleNamespace
+    from trackUtils import PilotMatcher, get_pilot_from_list
+
+    def pilot(par_id, ID, name, civl_id=None, live_id=None, fai_id=None):
+        return SimpleNamespace(par_id=par_id, ID=ID, name=name, civl_id=civl_id, live_id=live_id, fai_id=fai_id)
+
+    pilots = [
+        pilot(1, 10, 'John Smith', civl_id=1234),
+        pilot(2, 20, 'Jane Doe', live_id='361951', fai_id='ABC12'),
+        pilot(3, 30, 'John Black'),
+        pilot(4, 40, 'Mark Smith'),
+    ]
+    matcher = PilotMatcher(pilots)
+    assert matcher.match('track.30.igc').par_id == 3
+    assert matcher.match('30.igc').par_id == 3
+    assert matcher.match('LiveTrack Jane Doe.361951.20190717-113625.5836.99.igc').par_id == 2
+    assert matcher.match('smith_john.igc').par_id == 1
+    assert matcher.match('Smith_Mark.igc').par_id == 4
+    assert matcher.match('white_john.igc') is None
+    assert matcher.match('unknown.igc') is None
+    assert matcher.match('unknown.igc') == get_pilot_from_list('unknown.igc', pilots)
+    '''removed pilots are not returned'''
+    matcher.remove(pilots[0])
+    assert matcher.match('smith_john.igc') is None
+    assert matcher.match('john_smith_30.igc').par_id == 3